@@ -0,0 +1,689 @@
+"""
+Benchmark driver for the sequential, OpenMP, MPI, hybrid and out-of-core
+implementations (and the NumPy, mpi4py and shared memory kernels of
+pytranspose).
+
+For every configuration of the sweep (matrix size n, number of threads and/or
+processes p) the binary is launched once and repeats the measurement
+internally (--reps), so the launch cost (and MPI_Init) is paid once per
+configuration instead of once per sample. The timings are read line by line
+from the pipe of the binary and the rows of every configuration are appended
+to the results CSV in a single write once it is done, in the same format
+written by the PBS jobs, so an interrupted campaign never leaves half a
+configuration behind. Every finished configuration is then recorded in a
+<results>_checkpoint.csv file, with the sizes of the results and samples
+files once its rows were written: with --resume a new run skips the recorded
+configurations and first drops the rows written after the last checkpoint (a
+configuration killed between the two writes, or before the first checkpoint),
+since that configuration is measured again.
+
+With --adaptive the samples of every configuration are taken in batches until
+the confidence interval of the median of every kernel is narrow enough (or the
+time budget of the configuration is spent), so the cheap and noisy small
+sizes get more samples than the large and stable ones; the samples taken by
+every configuration are written to a <results>_samples.csv file.
+
+With --bind the threads (OMP_PLACES/OMP_PROC_BIND) and the processes (the
+binding arguments of the launcher) are pinned by one of the policies of
+BINDINGS, and the omp, mpi, mpi4py and hybrid results record it in their
+binding column, so that the placements can be compared in the same campaign.
+
+It only needs the Python standard library, and works both inside a PBS job
+and on a local machine with mpich or openmpi:
+    python3 bench.py mpi --workers 1,2,4 --reps 20 --mpi-args="--oversubscribe"
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import subprocess
+import sys
+import time
+
+# Hardware counters printed by the seq, omp and mpi binaries after the other
+# columns, for each kernel (see perf.h); nan unless they run with --perf
+PERF_EVENTS = ["cycles", "instructions", "l1d_misses", "llc_misses", "dtlb_misses"]
+PERF_COLUMNS = [f"{kernel}_{event}" for kernel in ("checksym", "transpose") for event in PERF_EVENTS]
+
+# Smallest, mean and largest time the threads/processes spend checking their
+# rows in the symmetry check, printed by the omp and mpi binaries before the
+# hardware counters: their spread is the load imbalance of the partition
+WORK_COLUMNS = ["checksym_work_min", "checksym_work_mean", "checksym_work_max"]
+
+# Smallest, mean and largest time the MPI processes spend in every phase of a
+# repetition, printed by the mpi binary after the work columns (see mpi.cpp)
+PHASES = ["distribute", "compute", "pack", "communicate", "unpack", "reduce"]
+PHASE_COLUMNS = [f"phase_{phase}_{stat}" for phase in PHASES for stat in ("min", "mean", "max")]
+
+# Command, results file, worker columns and columns printed by the binary (one
+# line per repetition) of every implementation
+BACKENDS = {
+    "seq": {
+        "binary": ["./matrix_transpose_seq_time"],
+        "results": "sequential_results.csv",
+        "workers_columns": [],
+        "output": ["checksym_time", "transpose_time", "tile", "sym"] + PERF_COLUMNS,
+    },
+    "omp": {
+        "binary": ["./matrix_transp_omp_time"],
+        "results": "omp_results.csv",
+        "workers_columns": ["n_threads"],
+        "output": ["checksym_time", "transpose_time", "tile", "sym", "schedule", "partition", "init"] + WORK_COLUMNS
+                  + PERF_COLUMNS,
+    },
+    "mpi": {
+        "binary": ["./matrix_transpose_mpi_time"],
+        "results": "mpi_results.csv",
+        "workers_columns": ["n_processes"],
+        "output": ["checksym_time", "transpose_time", "io_time", "sym", "mode", "pack", "partition"] + WORK_COLUMNS
+                  + PHASE_COLUMNS + PERF_COLUMNS,
+    },
+    "hybrid": {
+        "binary": ["./matrix_transpose_hybrid_time"],
+        "results": "hybrid_results.csv",
+        "workers_columns": ["n_processes", "n_threads"],
+        "output": ["checksym_time", "transpose_time"],
+    },
+    "ooc": {
+        "binary": ["./matrix_transpose_ooc_time"],
+        "results": "ooc_results.csv",
+        "workers_columns": [],
+        "output": ["checksym_time", "transpose_time", "tile"],
+    },
+    "numpy": {
+        "binary": [sys.executable, "-m", "pytranspose.seq"],
+        "results": "numpy_results.csv",
+        "workers_columns": [],
+        "output": ["checksym_time", "transpose_time", "tile", "sym"],
+    },
+    "mpi4py": {
+        "binary": [sys.executable, "-m", "pytranspose.mpi_backend"],
+        "results": "mpi4py_results.csv",
+        "workers_columns": ["n_processes"],
+        "output": ["checksym_time", "transpose_time", "io_time", "sym", "mode", "pack", "partition"] + WORK_COLUMNS
+                  + PHASE_COLUMNS + PERF_COLUMNS,
+    },
+    "shm": {
+        "binary": [sys.executable, "-m", "pytranspose.shm_backend"],
+        "results": "shm_results.csv",
+        "workers_columns": ["n_threads"],
+        "output": ["checksym_time", "transpose_time", "tile", "sym", "schedule", "partition", "init"] + WORK_COLUMNS
+                  + PERF_COLUMNS,
+    },
+}
+
+# Backends whose binaries read the hardware counters (--perf)
+PERF_BACKENDS = ("seq", "omp", "mpi")
+
+# Options of the binaries that can be swept, by output column:
+# tile = tile size of the blocked transpose, sym = symmetry check variant,
+# mode = data layout of the MPI implementation, pack = how MPI sends the transpose,
+# schedule = OpenMP schedule of the loops (kind[:chunk]),
+# partition = sharing of the rows of the full symmetry check among the workers,
+# init = placement of the pages of the matrices (serial or parallel first touch)
+SWEEP_OPTIONS = {
+    "tile": "--tile",
+    "sym": "--sym",
+    "mode": "--mode",
+    "pack": "--pack",
+    "schedule": "--schedule",
+    "partition": "--partition",
+    "init": "--init",
+}
+SYM_MODES = ("full", "blocked", "early")
+SCHEDULE_KINDS = ("static", "dynamic", "guided", "auto")
+MPI_MODES = ("replicated", "distributed")
+PACK_MODES = ("manual", "datatype")
+PARTITIONS = ("rows", "triangular", "paired")
+INITS = ("serial", "first-touch")
+
+# Placement of the threads and processes (--bind): the OpenMP variables of the
+# threads and the arguments of the launcher for the processes (the same for
+# mpich and Open MPI); default leaves both to the environment and the launcher.
+# socket and numa bind every process of the hybrid backend to a socket or a
+# NUMA domain, and its threads to consecutive cores inside it
+BINDINGS = {
+    "default": ({}, []),
+    "none": ({"OMP_PROC_BIND": "false"}, ["-bind-to", "none"]),
+    "close": ({"OMP_PLACES": "cores", "OMP_PROC_BIND": "close"}, ["-bind-to", "core", "-map-by", "core"]),
+    "spread": ({"OMP_PLACES": "cores", "OMP_PROC_BIND": "spread"}, ["-bind-to", "core", "-map-by", "socket"]),
+    "socket": ({"OMP_PLACES": "cores", "OMP_PROC_BIND": "close"}, ["-bind-to", "socket", "-map-by", "socket"]),
+    "numa": ({"OMP_PLACES": "cores", "OMP_PROC_BIND": "close"}, ["-bind-to", "numa", "-map-by", "numa"]),
+}
+
+# Bindings of every backend whose results record it, in a column after the
+# workers: close and spread bind every process to one core, so all the threads
+# of a hybrid process would share it
+BIND_BACKENDS = {
+    "omp": ("default", "none", "close", "spread"),
+    "mpi": ("default", "none", "close", "spread"),
+    "mpi4py": ("default", "none", "close", "spread"),
+    "hybrid": ("default", "none", "socket", "numa"),
+}
+
+# Sweep of the PBS jobs: n = 2^4 ... 2^12, p = 1 ... 32
+DEFAULT_SIZES = [2 ** p for p in range(4, 13)]
+DEFAULT_WORKERS = [1, 2, 4, 8, 16, 32]
+DEFAULT_THREADS = [1, 2, 4, 8]
+
+
+def parse_list(text):
+    """
+    Parses a comma separated list of integers ("16,32,64").
+    """
+    try:
+        return [int(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' is not a comma separated list of integers")
+
+
+def parse_choices(choices):
+    """
+    Returns the parser of a comma separated list of values among choices
+    ("full,early").
+    """
+    def parse(text):
+        values = [v.strip() for v in text.split(",") if v.strip()]
+        for value in values:
+            if value not in choices:
+                raise argparse.ArgumentTypeError(f"'{value}' is not one of {', '.join(choices)}")
+        return values
+    return parse
+
+
+def parse_tiles(text):
+    """
+    Parses a comma separated list of tile sizes, where "auto" is the default
+    tile size chosen by the binary ("0,32,auto").
+    """
+    tiles = [v.strip() for v in text.split(",") if v.strip()]
+    for tile in tiles:
+        if tile != "auto" and not tile.isdigit():
+            raise argparse.ArgumentTypeError(f"'{tile}' is not a tile size")
+    return tiles
+
+
+def parse_schedules(text):
+    """
+    Parses a comma separated list of OpenMP schedules written as kind[:chunk]
+    ("static,dynamic:16").
+    """
+    schedules = [v.strip() for v in text.split(",") if v.strip()]
+    for schedule in schedules:
+        kind, _, chunk = schedule.partition(":")
+        if kind not in SCHEDULE_KINDS or (chunk and not chunk.isdigit()):
+            raise argparse.ArgumentTypeError(f"'{schedule}' is not a schedule (kind[:chunk], kind among {', '.join(SCHEDULE_KINDS)})")
+    return schedules
+
+
+def lead_columns(backend):
+    """
+    Returns the columns written by bench.py before the matrix size: the
+    workers and, when the backend records it, the binding.
+    """
+    columns = BACKENDS[backend]["workers_columns"]
+    return columns + (["binding"] if backend in BIND_BACKENDS else [])
+
+
+def header(backend):
+    """
+    Returns the column names of the results CSV of a backend.
+    """
+    return lead_columns(backend) + ["n_matrix", "iteration"] + BACKENDS[backend]["output"]
+
+
+def samples_header(backend):
+    """
+    Returns the column names of the samples CSV of a backend (adaptive runs):
+    the configuration, the number of samples taken, the largest relative
+    width of the confidence intervals of the medians, whether it reached the
+    target and the seconds spent on the configuration.
+    """
+    config = [c for c in BACKENDS[backend]["output"] if c in SWEEP_OPTIONS]
+    return lead_columns(backend) + ["n_matrix"] + config + ["samples", "ci_width", "converged", "elapsed"]
+
+
+def samples_path(output):
+    """
+    Returns the path of the samples CSV next to a results CSV.
+    """
+    return os.path.splitext(output)[0] + "_samples.csv"
+
+
+def checkpoint_header(backend):
+    """
+    Returns the column names of the checkpoint CSV of a backend: the
+    configuration as requested (options holds the swept options, e.g.
+    "sym=full;tile=auto"), the number of rows it wrote and the size in bytes
+    of the results and samples files once they were written (0 for a samples
+    file that does not exist).
+    """
+    return BACKENDS[backend]["workers_columns"] + ["n_matrix", "options", "rows", "end", "samples_end"]
+
+
+def checkpoint_path(output):
+    """
+    Returns the path of the checkpoint CSV next to a results CSV.
+    """
+    return os.path.splitext(output)[0] + "_checkpoint.csv"
+
+
+def checkpoint_key(p, n, options):
+    """
+    Returns the key of a configuration in the checkpoint CSV.
+    """
+    return tuple(str(count) for count in p) + (str(n), ";".join(f"{k}={v}" for k, v in sorted(options.items())))
+
+
+def completed(path, backend):
+    """
+    Returns the keys of the configurations recorded in a checkpoint CSV and
+    the sizes (end, samples_end) of the results and samples files at the last
+    one: None when the checkpoint does not exist, (None, None) when it
+    records no configuration. Exits when it has other columns.
+    """
+    if not os.path.exists(path):
+        return set(), None
+    check_columns(path, checkpoint_header(backend))
+    with open(path, newline="") as f:
+        rows = [row for row in list(csv.reader(f))[1:] if row]
+    if not rows:
+        return set(), (None, None)
+    return {tuple(row[:-3]) for row in rows}, (int(rows[-1][-2]), int(rows[-1][-1]))
+
+
+def header_size(path):
+    """
+    Returns the size in bytes of the header line of a CSV (0 when it does
+    not exist or is empty).
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        return len(f.readline())
+
+
+def drop_unrecorded(path, end):
+    """
+    Truncates a CSV to the size recorded by the last checkpoint, so that the
+    rows of a configuration killed after writing them but before its
+    checkpoint are not kept twice once it is measured again. Returns the
+    number of rows dropped.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) <= end:
+        return 0
+    with open(path, "r+b") as f:
+        f.seek(end)
+        dropped = f.read().count(b"\n")
+        f.truncate(end)
+        os.fsync(f.fileno())
+    return dropped
+
+
+def median_ci(values, confidence=0.95):
+    """
+    Returns the distribution-free confidence interval of the median of values:
+    the order statistics x(l) and x(n + 1 - l) (1-based), with the largest l
+    such that the binomial(n, 1/2) probability of fewer than l values below
+    the median is at most (1 - confidence) / 2. Returns None when there are
+    too few values for the confidence (e.g. n < 6 at 95%).
+    """
+    x = sorted(values)
+    n = len(x)
+    alpha = (1 - confidence) / 2
+    total = 2 ** n
+    cdf = 0
+    choose = 1
+    l = 0
+    for k in range(n + 1):
+        cdf += choose
+        if cdf / total > alpha:
+            break
+        l = k + 1
+        choose = choose * (n - k) // (k + 1)
+    if l == 0:
+        return None
+    return x[l - 1], x[n - l]
+
+
+def ci_width(samples, confidence):
+    """
+    Returns the largest width of the confidence intervals of the medians of
+    the timing columns, relative to the median (inf when one cannot be
+    computed yet). samples holds one list of timings per row; NaN timings
+    (kernels not measured by the run) are left out.
+    """
+    width = 0.0
+    for column in zip(*samples):
+        values = [v for v in column if not math.isnan(v)]
+        if not values:
+            continue
+        ci = median_ci(values, confidence)
+        median = sorted(values)[len(values) // 2]
+        if ci is None or median <= 0:
+            return math.inf
+        width = max(width, (ci[1] - ci[0]) / median)
+    return width
+
+
+def next_batch(args, samples, elapsed):
+    """
+    Returns the number of samples of the next launch of a configuration that
+    already has the given samples and took elapsed seconds (0 = done). Without
+    --adaptive all the --reps samples are taken by one launch. With it, the
+    first launch takes --min-reps samples, every other one doubles the samples
+    (within the time left of --budget, at the speed measured so far) until the
+    target width of the confidence intervals is reached.
+    """
+    done = len(samples)
+    left = args.reps - done
+    if not args.adaptive:
+        return 1 if args.launch_per_rep and left > 0 else left
+    if left <= 0 or (args.budget is not None and elapsed >= args.budget):
+        return 0
+    if done >= args.min_reps and ci_width(samples, args.confidence) <= args.target_ci:
+        return 0
+    batch = min(left, max(args.min_reps - done, done, 1))
+    if args.budget is not None and done > 0:
+        batch = min(batch, max(1, int((args.budget - elapsed) * done / elapsed)))
+    return 1 if args.launch_per_rep else batch
+
+
+def append(out, lines):
+    """
+    Appends the lines to a CSV opened by open_csv with a single write, and
+    waits for them to reach the disk.
+    """
+    out.write("".join(line + "\n" for line in lines))
+    out.flush()
+    os.fsync(out.fileno())
+
+
+def check_columns(path, columns):
+    """
+    Exits when a CSV exists, is not empty and has other columns.
+    """
+    columns = ",".join(columns)
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path) as f:
+            existing = f.readline().strip()
+        if existing != columns:
+            sys.exit(f"{path} has columns '{existing}' instead of '{columns}': use --new or another --output")
+
+
+def open_csv(path, columns, new):
+    """
+    Opens a CSV for appending (or a new one), writing the header when it is
+    empty. Exits when an existing file has other columns.
+    """
+    if not new:
+        check_columns(path, columns)
+    out = open(path, "w" if new else "a")
+    if out.tell() == 0:
+        out.write(",".join(columns) + "\n")
+    return out
+
+
+def configurations(backend, sizes, workers, threads, sweeps, max_cores=None):
+    """
+    Yields the (p, n, options) triples of the sweep, where p holds one count
+    per worker column of the backend (processes from workers, threads from
+    workers or, for the hybrid backend, from threads) and options maps the
+    swept columns (see SWEEP_OPTIONS) to their value in this configuration.
+    The sequential backend always runs with one worker, MPI only when n is a
+    multiple of the processes (required by mpi.cpp and hybrid.cpp), and no
+    configuration uses more than max_cores processes x threads. The
+    distributed MPI layout has only the full symmetry check, so it is not
+    combined with the other ones, and the partitions other than rows only
+    apply to the full check of the replicated layout.
+    """
+    columns = BACKENDS[backend]["workers_columns"]
+    counts = [workers, threads][: len(columns)]
+    for n in sizes:
+        for p in itertools.product(*counts):
+            if "n_processes" in columns and (n < p[0] or n % p[0] != 0):
+                continue
+            cores = 1
+            for count in p:
+                cores *= count
+            if max_cores is not None and cores > max_cores:
+                continue
+            for values in itertools.product(*sweeps.values()):
+                options = dict(zip(sweeps, values))
+                if options.get("mode") == "distributed" and options.get("sym", "full") != "full":
+                    continue
+                if options.get("partition", "rows") != "rows" and (options.get("sym", "full") != "full"
+                                                                   or options.get("mode") == "distributed"):
+                    continue
+                yield p, n, options
+
+
+def command(args, p, n, options, reps):
+    """
+    Returns the command line and the environment launching one configuration.
+    The binding is applied to the threads and to the processes, when the
+    configuration has them.
+    """
+    cmd = ([args.binary] if args.binary else BACKENDS[args.backend]["binary"]) + [str(n)]
+    if reps is not None:
+        cmd += ["--reps", str(reps), "--warmup", str(args.warmup)]
+    for column, value in options.items():
+        if column in SWEEP_OPTIONS:
+            cmd += [SWEEP_OPTIONS[column], value]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    if args.perf:
+        cmd += ["--perf"]
+    cmd += args.binary_args.split()
+
+    counts = dict(zip(BACKENDS[args.backend]["workers_columns"], p))
+    variables, launcher_args = BINDINGS[options.get("binding", "default")]
+    env = dict(os.environ)
+    if "n_threads" in counts:
+        env["OMP_NUM_THREADS"] = str(counts["n_threads"])
+        # Needed by the early exit of the symmetry check (omp cancel)
+        env.setdefault("OMP_CANCELLATION", "true")
+        env.update(variables)
+    if "n_processes" in counts:
+        cmd = [args.launcher, "-np", str(counts["n_processes"])] + launcher_args + args.mpi_args.split() + cmd
+    return cmd, env
+
+
+def run(cmd, env, columns):
+    """
+    Launches the binary and yields its output lines as lists of strings, one
+    per column; lines that do not match the columns (or whose timings are not
+    numbers) are skipped. Raises RuntimeError when the binary fails.
+    """
+    timings = [i for i, c in enumerate(columns) if c.endswith("_time")]
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        for line in proc.stdout:
+            fields = [f.strip() for f in line.split(",")]
+            if len(fields) != len(columns):
+                continue
+            try:
+                [float(fields[i]) for i in timings]
+            except ValueError:
+                continue
+            yield fields
+    finally:
+        proc.stdout.close()
+        code = proc.wait()
+    if code != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited with code {code}")
+
+
+def measure(args, p, n, options, out, samples_out=None):
+    """
+    Runs one configuration and appends its rows to the results file, all at
+    once at the end, and returns their number. A failed or truncated run is
+    completed with ERROR rows, as the PBS jobs did (an adaptive run stops
+    there). The launches are planned by next_batch; with samples_out, the
+    summary of the samples is appended to it.
+    """
+    backend = BACKENDS[args.backend]
+    columns = backend["output"]
+    timings = [i for i, c in enumerate(columns) if c.endswith("_time")]
+    prefix = [str(count) for count in p]
+    if args.backend in BIND_BACKENDS:
+        prefix.append(options.get("binding", "default"))
+    error = ["ERROR"] * len(columns)
+    for column, value in options.items():
+        if column in columns and value != "auto":
+            error[columns.index(column)] = value
+
+    rows = []
+    samples = []
+    config = error
+    iteration = 0
+    start = time.monotonic()
+    while True:
+        expected = next_batch(args, samples, time.monotonic() - start)
+        if expected == 0:
+            break
+        cmd, env = command(args, p, n, options, None if args.launch_per_rep else expected)
+        got = 0
+        try:
+            for fields in run(cmd, env, columns):
+                if got == expected:
+                    continue
+                got += 1
+                iteration += 1
+                rows.append(",".join(prefix + [str(n), str(iteration)] + fields))
+                samples.append([float(fields[i]) for i in timings])
+                config = fields
+        except (OSError, RuntimeError) as e:
+            print(f"p={'x'.join(str(count) for count in p) or 1} n={n}: {e}", file=sys.stderr)
+        for _ in range(expected - got):
+            iteration += 1
+            rows.append(",".join(prefix + [str(n), str(iteration)] + error))
+        if args.adaptive and got < expected:
+            break
+        if not args.adaptive and iteration >= args.reps:
+            break
+
+    append(out, rows)
+    if samples_out is not None:
+        width = ci_width(samples, args.confidence) if samples else math.inf
+        values = [config[columns.index(c)] for c in columns if c in SWEEP_OPTIONS]
+        summary = [str(len(samples)), f"{width:.6g}", str(int(width <= args.target_ci)), f"{time.monotonic() - start:.3f}"]
+        append(samples_out, [",".join(prefix + [str(n)] + values + summary)])
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a benchmark sweep and append the timings to the results CSV.")
+    parser.add_argument("backend", choices=sorted(BACKENDS))
+    parser.add_argument("--sizes", type=parse_list, default=DEFAULT_SIZES, help="matrix sizes (default: 16,...,4096)")
+    parser.add_argument("--workers", type=parse_list, default=DEFAULT_WORKERS, help="threads/processes (default: 1,...,32)")
+    parser.add_argument("--threads", type=parse_list, default=DEFAULT_THREADS,
+                        help="threads per process of the hybrid backend (default: 1,2,4,8)")
+    parser.add_argument("--max-cores", type=int, help="skip the configurations with more processes x threads")
+    parser.add_argument("--reps", type=int, default=100, help="samples per configuration (maximum with --adaptive)")
+    parser.add_argument("--warmup", type=int, default=0, help="discarded runs before the samples")
+    parser.add_argument("--tiles", type=parse_tiles,
+                        help="tile sizes of the blocked transpose, e.g. 0,16,32,64,auto (seq and omp only)")
+    parser.add_argument("--sym", type=parse_choices(SYM_MODES),
+                        help="symmetry check variants among full, blocked, early (default: full)")
+    parser.add_argument("--mode", type=parse_choices(MPI_MODES),
+                        help="MPI data layouts among replicated, distributed (default: replicated)")
+    parser.add_argument("--pack", type=parse_choices(PACK_MODES),
+                        help="MPI transpose packing among manual, datatype (default: manual)")
+    parser.add_argument("--schedule", type=parse_schedules,
+                        help="OpenMP schedules of the loops, e.g. static,dynamic:16,guided (omp only, default: static)")
+    parser.add_argument("--partition", type=parse_choices(PARTITIONS),
+                        help="row partitions of the full symmetry check among rows, triangular, paired (omp, mpi and "
+                             "mpi4py, default: rows)")
+    parser.add_argument("--init", type=parse_choices(INITS),
+                        help="placement of the pages of the matrices among serial, first-touch (omp only, default: serial)")
+    parser.add_argument("--bind", type=parse_choices(BINDINGS),
+                        help="placement of the threads/processes among default, none, close, spread (omp, mpi and "
+                             "mpi4py) or default, none, socket, numa (hybrid), recorded in the binding column "
+                             "(default: default)")
+    parser.add_argument("--seed", type=int,
+                        help="seed of the input matrix: every backend and run gets the same matrix (default: random)")
+    parser.add_argument("--perf", action="store_true",
+                        help="read the hardware counters of the kernels with perf_event_open (seq, omp and mpi only)")
+    parser.add_argument("--binary", help="path of the binary (default: the name used by the PBS jobs)")
+    parser.add_argument("--binary-args", default="",
+                        help="extra arguments of the binary, e.g. --binary-args=\"--dir /scratch\" for ooc")
+    parser.add_argument("--output", help="results CSV (default: the name used by the PBS jobs)")
+    parser.add_argument("--new", action="store_true", help="start new results (and checkpoint) files instead of appending")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip the configurations already recorded in the checkpoint of the results file")
+    parser.add_argument("--launcher", default="mpirun", help="MPI launcher (mpirun, mpiexec, ...)")
+    parser.add_argument("--mpi-args", default="", help="extra arguments of the MPI launcher")
+    parser.add_argument("--launch-per-rep", action="store_true",
+                        help="launch the binary once per sample (cold runs, like the old PBS loops)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample every configuration until the confidence intervals of the medians are narrow enough")
+    parser.add_argument("--min-reps", type=int, default=10, help="first samples of an adaptive configuration")
+    parser.add_argument("--target-ci", type=float, default=0.05,
+                        help="width of the confidence intervals relative to the median that stops the sampling")
+    parser.add_argument("--confidence", type=float, default=0.95, help="level of the confidence intervals")
+    parser.add_argument("--budget", type=float, help="seconds of sampling of an adaptive configuration")
+    args = parser.parse_args(argv)
+
+    if args.reps < 1 or args.warmup < 0 or (args.seed is not None and args.seed < 0):
+        parser.error("--reps must be positive, --warmup and --seed not negative")
+    if args.adaptive and not (1 <= args.min_reps <= args.reps and args.target_ci > 0 and 0 < args.confidence < 1):
+        parser.error("--min-reps must be between 1 and --reps, --target-ci positive and --confidence between 0 and 1")
+    if args.budget is not None and args.budget <= 0:
+        parser.error("--budget must be positive")
+    if args.new and args.resume:
+        parser.error("--new and --resume cannot be used together")
+    if args.perf and args.backend not in PERF_BACKENDS:
+        parser.error(f"--perf is not supported by the {args.backend} backend")
+    sweeps = {}
+    for column, values in (("tile", args.tiles), ("sym", args.sym), ("mode", args.mode), ("pack", args.pack),
+                           ("schedule", args.schedule), ("partition", args.partition), ("init", args.init),
+                           ("binding", args.bind)):
+        if values is None:
+            continue
+        if column not in header(args.backend):
+            parser.error(f"{SWEEP_OPTIONS.get(column, '--bind')} is not supported by the {args.backend} backend")
+        if column == "binding" and any(v not in BIND_BACKENDS[args.backend] for v in values):
+            parser.error(f"the {args.backend} backend supports the bindings {', '.join(BIND_BACKENDS[args.backend])}")
+        sweeps[column] = values
+
+    output = args.output or BACKENDS[args.backend]["results"]
+    done, ends = completed(checkpoint_path(output), args.backend) if args.resume else (set(), None)
+    if ends is not None:
+        # Every file is checked before any of them is truncated; without a
+        # recorded configuration only their headers are kept
+        results_files = [(output, header(args.backend)), (samples_path(output), samples_header(args.backend))]
+        for path, columns in results_files:
+            check_columns(path, columns)
+        for (path, _), end in zip(results_files, ends):
+            dropped = drop_unrecorded(path, header_size(path) if end is None else end)
+            if dropped:
+                print(f"Dropped {dropped} rows of {path} written after its last checkpoint", file=sys.stderr)
+    out = open_csv(output, header(args.backend), args.new)
+    samples_out = open_csv(samples_path(output), samples_header(args.backend), args.new) if args.adaptive else None
+    checkpoint = open_csv(checkpoint_path(output), checkpoint_header(args.backend), args.new)
+    skipped = 0
+    try:
+        for p, n, options in configurations(args.backend, args.sizes, args.workers, args.threads, sweeps, args.max_cores):
+            key = checkpoint_key(p, n, options)
+            if key in done:
+                skipped += 1
+                continue
+            # A configuration interrupted before its checkpoint is measured
+            # again, its rows dropped by the next --resume (see drop_unrecorded)
+            rows = measure(args, p, n, options, out, samples_out)
+            samples = samples_path(output)
+            samples_end = os.path.getsize(samples) if os.path.exists(samples) else 0
+            append(checkpoint, [",".join(key + (str(rows), str(os.fstat(out.fileno()).st_size), str(samples_end)))])
+    finally:
+        out.close()
+        checkpoint.close()
+        if samples_out is not None:
+            samples_out.close()
+    if skipped:
+        print(f"Skipped {skipped} configurations already in {checkpoint_path(output)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
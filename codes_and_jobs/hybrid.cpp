@@ -0,0 +1,193 @@
+#include <mpi.h>
+#include <omp.h>
+#include <iostream>
+#include <algorithm>
+#include <cstdint>
+#include <string>
+#include <utility>
+
+#include "matrix.h"
+
+// Hybrid implementation: MPI between the ranks, with the distributed layout of
+// mpi.cpp (every rank owns rows [rank * rpp, (rank + 1) * rpp), rpp = n / size,
+// seen as size square blocks of rpp x rpp), and OpenMP threads inside every
+// rank for the local work. Only the master thread calls MPI.
+
+// Function to send block c of the local rows to rank c, transposed or not, with
+// a single MPI_Alltoall; the threads share the packing of the blocks. The
+// received blocks are stacked in a (size * rpp) x rpp matrix: block r comes
+// from rank r
+Matrix exchangeBlocksHybrid(const Matrix &local_rows, int size, bool transposeBlocks) {
+    int rpp = local_rows.rows();
+    Matrix send_blocks(size * rpp, rpp);
+    Matrix recv_blocks(size * rpp, rpp);
+
+    #pragma omp parallel for collapse(2)
+    for (int c = 0; c < size; c++){
+        for (int i = 0; i<rpp; i++){
+            float *block_row = send_blocks.row(c * rpp + i);
+            for (int j = 0; j<rpp; j++){
+                block_row[j] = transposeBlocks ? local_rows(j, c * rpp + i) : local_rows(i, c * rpp + j);
+            }
+        }
+    }
+
+    MPI_Alltoall(send_blocks.data(), rpp * rpp, MPI_FLOAT, recv_blocks.data(), rpp * rpp, MPI_FLOAT, MPI_COMM_WORLD);
+    return recv_blocks;
+}
+
+// Function to check the symmetry: rank r receives the blocks (c, r) of the
+// other ranks and its threads compare them with the mirror blocks (r, c)
+bool checkSymHybrid(const Matrix &local_rows, int rank, int size) {
+    int rpp = local_rows.rows();
+    Matrix blocks = exchangeBlocksHybrid(local_rows, size, false);
+    bool localSymmetric = true;
+
+    // Blocks below the diagonal are checked by the rank owning their mirror
+    #pragma omp parallel for collapse(2) reduction(&&: localSymmetric)
+    for (int c = rank; c < size; c++){
+        for (int i = 0; i<rpp; i++){
+            const float *block_row = blocks.row(c * rpp + i);
+            for (int j = (c == rank) ? i + 1 : 0; j<rpp; j++){
+                if (block_row[j] != local_rows(j, c * rpp + i)) {
+                    localSymmetric = false;
+                }
+            }
+        }
+    }
+
+    int localSym = localSymmetric ? 1 : 0;
+    int globalSym;
+    MPI_Allreduce(&localSym, &globalSym, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+
+    return globalSym == 1;
+}
+
+// Function to transpose the distributed matrix: the result stays distributed,
+// with the same rows of the transpose on every rank as of the input
+Matrix matTransposeHybrid(const Matrix &local_rows, int size) {
+    int rpp = local_rows.rows();
+    int n = local_rows.cols();
+    Matrix blocks = exchangeBlocksHybrid(local_rows, size, true);
+
+    // block r, already transposed by rank r, is the column block r of our rows
+    Matrix local_transposed(rpp, n);
+    #pragma omp parallel for collapse(2)
+    for (int i = 0; i<rpp; i++){
+        for (int r = 0; r < size; r++){
+            const float *block_row = blocks.row(r * rpp + i);
+            std::copy(block_row, block_row + rpp, local_transposed.row(i) + r * rpp);
+        }
+    }
+    return local_transposed;
+}
+
+// Function to parse the command line:
+//   <matrix_size> [--reps N] [--warmup W] [--seed S]
+// the threads of every rank are set with OMP_NUM_THREADS; with a seed every
+// rank generates its own rows of the seeded matrix (see matrix.h)
+bool parseArgs(int argc, char *argv[], int &n, int &reps, int &warmup, long long &seed) {
+    if (argc < 2) {
+        return false;
+    }
+    reps = 1;
+    warmup = 0;
+    seed = -1;
+    try {
+        n = std::stoi(argv[1]);
+        for (int i = 2; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--reps" && i + 1 < argc) {
+                reps = std::stoi(argv[++i]);
+            } else if (arg == "--warmup" && i + 1 < argc) {
+                warmup = std::stoi(argv[++i]);
+            } else if (arg == "--seed" && i + 1 < argc) {
+                seed = std::stoll(argv[++i]);
+                if (seed < 0) {
+                    return false;
+                }
+            } else {
+                return false;
+            }
+        }
+    } catch (const std::exception &) {
+        return false;
+    }
+    return n > 0 && reps > 0 && warmup >= 0;
+}
+
+int main(int argc, char *argv[]) {
+    int provided;
+    MPI_Init_thread(&argc, &argv, MPI_THREAD_FUNNELED, &provided);
+
+    int rank, size;
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+
+    int n, reps, warmup;
+    long long seed;
+    if (!parseArgs(argc, argv, n, reps, warmup, seed)) {
+        if (rank == 0) {
+            std::cerr << "Usage: " << argv[0] << " <matrix_size> [--reps N] [--warmup W] [--seed S]\n";
+        }
+        MPI_Finalize();
+        return 1;
+    }
+
+    if (n % size != 0) {
+        if (rank == 0) {
+            std::cerr << "Matrix size must be divisible by the number of processes.\n";
+        }
+        MPI_Finalize();
+        return 1;
+    }
+
+    if (provided < MPI_THREAD_FUNNELED && rank == 0) {
+        std::cerr << "Warning: the MPI library does not support threads (MPI_THREAD_FUNNELED)\n";
+    }
+
+    int rows_per_process = n / size;
+    Matrix local_matrix;
+
+    if (seed >= 0) {
+        // Every rank generates only its own rows of the seeded matrix
+        local_matrix = Matrix(rows_per_process, n);
+        fillSeeded(local_matrix, rank * rows_per_process, std::uint64_t(seed));
+    } else {
+        if (rank == 0) {
+            // Initialize the matrix in rank 0
+            local_matrix = initializeMatrix(n);
+        }
+
+        // Scatter the row blocks; rank 0 frees the whole matrix afterwards
+        Matrix local_rows(rows_per_process, n);
+        MPI_Scatter(local_matrix.data(), rows_per_process * n, MPI_FLOAT, local_rows.data(), rows_per_process * n, MPI_FLOAT, 0, MPI_COMM_WORLD);
+        local_matrix = std::move(local_rows);
+    }
+
+    // The first warmup repetitions are run but not printed
+    for (int r = 0; r < warmup + reps; ++r) {
+        // Start every repetition together
+        MPI_Barrier(MPI_COMM_WORLD);
+
+        // Measure symmetry check time
+        auto start = MPI_Wtime();
+        bool isSymmetric = checkSymHybrid(local_matrix, rank, size);
+        auto end = MPI_Wtime();
+        double checkSymTime = end - start;
+
+        // Measure transpose time
+        start = MPI_Wtime();
+        auto transposed_matrix = matTransposeHybrid(local_matrix, size);
+        end = MPI_Wtime();
+        double transposeTime = end - start;
+
+        // One CSV line per repetition: checksym_time,transpose_time
+        if (rank == 0 && r >= warmup) {
+            std::cout << checkSymTime << "," << transposeTime << std::endl;
+        }
+    }
+
+    MPI_Finalize();
+    return 0;
+}
@@ -0,0 +1,138 @@
+#ifndef MATIO_H
+#define MATIO_H
+
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+
+#include "matrix.h"
+
+// Binary matrix file: a 64-byte header followed by the elements, row-major.
+// The payload starts at a multiple of MATRIX_ALIGNMENT, so a mapping of the
+// whole file (which starts on a page) gives an aligned matrix without copies.
+// All the fields are little-endian; the same format is read and written by
+// pytranspose/matio.py.
+struct MatrixFileHeader {
+    char magic[8];            // "PARCOMAT"
+    std::uint32_t version;    // MATRIX_FILE_VERSION
+    std::uint32_t dtype;      // MATRIX_DTYPE_FLOAT32
+    std::uint64_t rows;
+    std::uint64_t cols;
+    std::uint32_t layout;     // MATRIX_LAYOUT_ROW_MAJOR
+    std::uint32_t offset;     // byte offset of the payload
+    std::uint64_t checksum;   // matrixChecksum of the payload
+    char reserved[16];
+};
+static_assert(sizeof(MatrixFileHeader) == 64, "the matrix file header must be 64 bytes");
+
+const char MATRIX_MAGIC[8] = {'P', 'A', 'R', 'C', 'O', 'M', 'A', 'T'};
+const std::uint32_t MATRIX_FILE_VERSION = 1;
+const std::uint32_t MATRIX_DTYPE_FLOAT32 = 1;
+const std::uint32_t MATRIX_LAYOUT_ROW_MAJOR = 0;
+
+// Function to compute the checksum of count elements, the first of which is
+// element number first of the payload: the sum of (index + 1) * bits of every
+// element, modulo 2^64. The sum is linear, so the checksums of disjoint parts
+// (e.g. the row blocks of the MPI ranks) add up to the one of the whole payload
+inline std::uint64_t matrixChecksum(const float *data, std::size_t count, std::uint64_t first = 0) {
+    std::uint64_t sum = 0;
+    for (std::size_t k = 0; k < count; ++k) {
+        std::uint32_t bits;
+        std::memcpy(&bits, data + k, sizeof(bits));
+        sum += (first + k + 1) * std::uint64_t(bits);
+    }
+    return sum;
+}
+
+// Function to read and validate the header of a matrix file
+inline MatrixFileHeader readMatrixHeader(const std::string &path) {
+    FILE *file = std::fopen(path.c_str(), "rb");
+    if (file == nullptr) {
+        throw std::runtime_error("cannot open " + path);
+    }
+    MatrixFileHeader header;
+    std::size_t got = std::fread(&header, sizeof(header), 1, file);
+    std::fclose(file);
+
+    if (got != 1 || std::memcmp(header.magic, MATRIX_MAGIC, sizeof(MATRIX_MAGIC)) != 0) {
+        throw std::runtime_error(path + " is not a matrix file");
+    }
+    if (header.version != MATRIX_FILE_VERSION || header.dtype != MATRIX_DTYPE_FLOAT32 ||
+        header.layout != MATRIX_LAYOUT_ROW_MAJOR || header.offset < sizeof(MatrixFileHeader)) {
+        throw std::runtime_error(path + ": unsupported version, dtype or layout");
+    }
+    return header;
+}
+
+// Function to read a matrix file, checking its checksum
+inline Matrix readMatrixFile(const std::string &path) {
+    MatrixFileHeader header = readMatrixHeader(path);
+    Matrix matrix(int(header.rows), int(header.cols));
+
+    FILE *file = std::fopen(path.c_str(), "rb");
+    if (file == nullptr) {
+        throw std::runtime_error("cannot open " + path);
+    }
+    bool ok = std::fseek(file, long(header.offset), SEEK_SET) == 0 &&
+              std::fread(matrix.data(), sizeof(float), matrix.count(), file) == matrix.count();
+    std::fclose(file);
+
+    if (!ok) {
+        throw std::runtime_error(path + " is truncated");
+    }
+    if (matrixChecksum(matrix.data(), matrix.count()) != header.checksum) {
+        throw std::runtime_error(path + ": wrong checksum");
+    }
+    return matrix;
+}
+
+// Function to fill the header of a rows x cols matrix file
+inline MatrixFileHeader makeMatrixHeader(std::uint64_t rows, std::uint64_t cols, std::uint64_t checksum) {
+    MatrixFileHeader header;
+    std::memset(&header, 0, sizeof(header));
+    std::memcpy(header.magic, MATRIX_MAGIC, sizeof(MATRIX_MAGIC));
+    header.version = MATRIX_FILE_VERSION;
+    header.dtype = MATRIX_DTYPE_FLOAT32;
+    header.rows = rows;
+    header.cols = cols;
+    header.layout = MATRIX_LAYOUT_ROW_MAJOR;
+    header.offset = sizeof(MatrixFileHeader);
+    header.checksum = checksum;
+    return header;
+}
+
+// Function to write a matrix file
+inline void writeMatrixFile(const std::string &path, const Matrix &matrix) {
+    MatrixFileHeader header = makeMatrixHeader(matrix.rows(), matrix.cols(), matrixChecksum(matrix.data(), matrix.count()));
+
+    FILE *file = std::fopen(path.c_str(), "wb");
+    if (file == nullptr) {
+        throw std::runtime_error("cannot create " + path);
+    }
+    bool ok = std::fwrite(&header, sizeof(header), 1, file) == 1 &&
+              std::fwrite(matrix.data(), sizeof(float), matrix.count(), file) == matrix.count();
+    if (std::fclose(file) != 0 || !ok) {
+        throw std::runtime_error("cannot write " + path);
+    }
+}
+
+// Function to get the input matrix of a benchmark: read from the input file
+// when there is one (it must be n x n), else the seeded random matrix when
+// seed is not negative, else a new random matrix
+inline Matrix loadMatrix(int n, const std::string &input, long long seed) {
+    if (!input.empty()) {
+        Matrix matrix = readMatrixFile(input);
+        if (matrix.rows() != n || matrix.cols() != n) {
+            throw std::runtime_error(input + " is not a " + std::to_string(n) + " x " + std::to_string(n) + " matrix");
+        }
+        return matrix;
+    }
+    if (seed >= 0) {
+        return initializeMatrix(n, std::uint64_t(seed));
+    }
+    return initializeMatrix(n);
+}
+
+#endif
@@ -0,0 +1,231 @@
+#ifndef MATRIX_H
+#define MATRIX_H
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <cstdlib>
+#include <new>
+#include <random>
+#include <string>
+#include <unistd.h>
+
+// Alignment of the matrix buffer: one cache line, enough for any vector load
+const std::size_t MATRIX_ALIGNMENT = 64;
+
+// Matrix of floats stored in a single contiguous, aligned, row-major buffer:
+// element (i, j) is at data()[i * cols() + j]. The buffer can be handed
+// directly to MPI, and the kernels walk it with unit stride.
+class Matrix {
+public:
+    Matrix() : rows_(0), cols_(0), data_(nullptr) {}
+    explicit Matrix(int n) : Matrix(n, n) {}
+    Matrix(int rows, int cols) : rows_(rows), cols_(cols), data_(allocate(std::size_t(rows) * cols)) {}
+    ~Matrix() { std::free(data_); }
+
+    Matrix(const Matrix &) = delete;
+    Matrix &operator=(const Matrix &) = delete;
+
+    Matrix(Matrix &&other) noexcept : rows_(other.rows_), cols_(other.cols_), data_(other.data_) {
+        other.rows_ = other.cols_ = 0;
+        other.data_ = nullptr;
+    }
+
+    Matrix &operator=(Matrix &&other) noexcept {
+        if (this != &other) {
+            std::free(data_);
+            rows_ = other.rows_;
+            cols_ = other.cols_;
+            data_ = other.data_;
+            other.rows_ = other.cols_ = 0;
+            other.data_ = nullptr;
+        }
+        return *this;
+    }
+
+    // Number of rows (n for the square matrices)
+    int size() const { return rows_; }
+    int rows() const { return rows_; }
+    int cols() const { return cols_; }
+    std::size_t count() const { return std::size_t(rows_) * cols_; }
+
+    float *data() { return data_; }
+    const float *data() const { return data_; }
+
+    float *row(int i) { return data_ + std::size_t(i) * cols_; }
+    const float *row(int i) const { return data_ + std::size_t(i) * cols_; }
+
+    float &operator()(int i, int j) { return data_[std::size_t(i) * cols_ + j]; }
+    const float &operator()(int i, int j) const { return data_[std::size_t(i) * cols_ + j]; }
+
+private:
+    static float *allocate(std::size_t count) {
+        if (count == 0) {
+            return nullptr;
+        }
+        void *ptr = nullptr;
+        if (posix_memalign(&ptr, MATRIX_ALIGNMENT, count * sizeof(float)) != 0) {
+            throw std::bad_alloc();
+        }
+        return static_cast<float *>(ptr);
+    }
+
+    int rows_;
+    int cols_;
+    float *data_;
+};
+
+// Function to initialize a random n x n matrix
+inline Matrix initializeMatrix(int n) {
+    Matrix matrix(n);
+    std::random_device rd;
+    std::mt19937 gen(rd());
+    std::uniform_real_distribution<float> dist(0.0, 100.0);
+
+    for (int i = 0; i < n; ++i) {
+        float *row = matrix.row(i);
+        for (int j = 0; j < n; ++j) {
+            row[j] = dist(gen);
+        }
+    }
+    return matrix;
+}
+
+// Function to compute element index (i * cols + j) of the seeded random matrix:
+// a value in [0, 100) that depends only on seed and index (splitmix64 hash),
+// so any row range can be generated independently, in any order, and
+// pytranspose.matrix.initialize(n, seed) produces the same floats
+inline float seededValue(std::uint64_t seed, std::uint64_t index) {
+    std::uint64_t z = seed + (index + 1) * 0x9E3779B97F4A7C15ULL;
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    z = z ^ (z >> 31);
+    // 24 random bits: exact in a float
+    return float(z >> 40) * (1.0f / 16777216.0f) * 100.0f;
+}
+
+// Function to fill the rows of matrix with the rows [firstRow, firstRow +
+// matrix.rows()) of the seeded n x n random matrix (n = matrix.cols())
+inline void fillSeeded(Matrix &matrix, int firstRow, std::uint64_t seed) {
+    std::uint64_t n = std::uint64_t(matrix.cols());
+    for (int i = 0; i < matrix.rows(); ++i) {
+        float *row = matrix.row(i);
+        std::uint64_t base = std::uint64_t(firstRow + i) * n;
+        for (std::uint64_t j = 0; j < n; ++j) {
+            row[j] = seededValue(seed, base + j);
+        }
+    }
+}
+
+// Function to initialize the seeded random n x n matrix: the same seed gives
+// the same matrix in every implementation
+inline Matrix initializeMatrix(int n, std::uint64_t seed) {
+    Matrix matrix(n);
+    fillSeeded(matrix, 0, seed);
+    return matrix;
+}
+
+// Function to choose the default tile size of the blocked transpose: the
+// largest power of two such that a source and a destination tile fill at most
+// half of the L1 data cache (32 KiB assumed when it cannot be detected)
+inline int defaultTileSize() {
+    long l1 = 32 * 1024;
+#ifdef _SC_LEVEL1_DCACHE_SIZE
+    long detected = sysconf(_SC_LEVEL1_DCACHE_SIZE);
+    if (detected > 0) {
+        l1 = detected;
+    }
+#endif
+    int tile = 8;
+    while (2L * (2 * tile) * (2 * tile) * long(sizeof(float)) <= l1 / 2) {
+        tile *= 2;
+    }
+    return tile;
+}
+
+// Function to compare the rows [ii, iEnd) x columns [jj, jj + tile) of the upper
+// triangle with their mirror tile: both are small enough to stay in cache, so
+// the column-wise reads of the mirror tile do not miss at every element
+inline bool tilePairSymmetric(const Matrix &matrix, int ii, int iEnd, int jj, int tile) {
+    int jEnd = std::min(jj + tile, matrix.size());
+    bool isSymmetric = true;
+    for (int i = ii; i < iEnd; ++i) {
+        const float *row = matrix.row(i);
+        for (int j = std::max(jj, i + 1); j < jEnd; ++j) {
+            if (row[j] != matrix(j, i)) {
+                isSymmetric = false;
+            }
+        }
+    }
+    return isSymmetric;
+}
+
+// Function to check the rows [ii, iEnd) against the matching columns, one tile
+// pair at a time; with earlyExit it stops at the first asymmetric pair
+inline bool rowBlockSymmetric(const Matrix &matrix, int ii, int iEnd, int tile, bool earlyExit) {
+    bool isSymmetric = true;
+    for (int jj = ii; jj < matrix.size(); jj += tile) {
+        if (!tilePairSymmetric(matrix, ii, iEnd, jj, tile)) {
+            isSymmetric = false;
+            if (earlyExit) {
+                break;
+            }
+        }
+    }
+    return isSymmetric;
+}
+
+// Partitions of the rows of the upper triangle among the workers of the
+// element-wise symmetry check (--partition): row i has n - 1 - i pairs, so
+//   - rows gives every worker the same number of rows (the first workers get
+//     most of the pairs);
+//   - triangular gives every worker a contiguous range of rows with the same
+//     number of pairs (see triangleRows);
+//   - paired gives the workers pairs of rows i and n - 1 - i, with n - 1 pairs
+//     together, so any equal split of the pairs of rows is balanced
+inline bool validPartition(const std::string &partition) {
+    return partition == "rows" || partition == "triangular" || partition == "paired";
+}
+
+// Function to return the first row of part k of parts in the triangular
+// partition: the first row r such that the rows before it have at least
+// k / parts of the n (n - 1) / 2 pairs of the upper triangle
+inline int triangleBoundary(int n, int k, int parts) {
+    if (k >= parts) {
+        return n;
+    }
+    double target = double(k) * (double(n) * (n - 1) / 2) / parts;
+    int lo = 0, hi = n;
+    while (lo < hi) {
+        int mid = lo + (hi - lo) / 2;
+        // Pairs in the rows [0, mid)
+        double before = double(mid) * (n - 1) - double(mid) * (mid - 1) / 2;
+        if (before >= target) {
+            hi = mid;
+        } else {
+            lo = mid + 1;
+        }
+    }
+    return lo;
+}
+
+// Function to return the rows [start, end) of part k of parts in the
+// triangular partition of an n x n matrix
+inline void triangleRows(int n, int k, int parts, int &start, int &end) {
+    start = triangleBoundary(n, k, parts);
+    end = triangleBoundary(n, k + 1, parts);
+}
+
+// Function to compare row i of the upper triangle with column i
+inline bool rowSymmetric(const Matrix &matrix, int i) {
+    const float *row = matrix.row(i);
+    bool isSymmetric = true;
+    for (int j = i + 1; j < matrix.size(); ++j) {
+        if (row[j] != matrix(j, i)) {
+            isSymmetric = false;
+        }
+    }
+    return isSymmetric;
+}
+
+#endif
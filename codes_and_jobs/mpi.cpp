@@ -1,118 +1,530 @@
 #include <mpi.h>
 #include <iostream>
-#include <vector>
-#include <random>
 #include <chrono>
+#include <limits>
+#include <string>
+#include <utility>
+#include <vector>
 
-// Function to initialize a random n x n matrix
-std::vector<std::vector<float>> initializeMatrix(int n) {
-    std::vector<std::vector<float>> matrix(n, std::vector<float>(n));
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_real_distribution<float> dist(0.0, 100.0);
+#include "matio.h"
+#include "matrix.h"
+#include "perf.h"
 
-    for (int i = 0; i < n; ++i) {
-        for (int j = 0; j < n; ++j) {
-            matrix[i][j] = dist(gen);
+void printMatrix(const Matrix &matrix, const std::string &label) {
+    std::cout << label << ":\n";
+    for (int i = 0; i < matrix.rows(); ++i) {
+        for (int j = 0; j < matrix.cols(); ++j) {
+            std::cout << matrix(i, j) << " ";
         }
+        std::cout << "\n";
     }
-    return matrix;
+    std::cout << "\n";
 }
 
-// Function to flatten a 2D matrix into a 1D vector
-std::vector<float> flattenMatrix(const std::vector<std::vector<float>> &matrix) {
+// Phases of a repetition timed on every rank, in the order of their CSV columns
+// (phase_<name>_min,phase_<name>_mean,phase_<name>_max, see PHASE_NAMES):
+//   - distribute: MPI_Bcast or MPI_Scatter of the matrix, once before the
+//     repetitions (0 when every rank reads or generates its own rows);
+//   - compute: comparisons of the symmetry check;
+//   - pack: copies into the send buffers (creation of the derived datatypes
+//     with --pack datatype, as MPI packs the data itself);
+//   - communicate: MPI_Gather(v) and MPI_Alltoall of the blocks;
+//   - unpack: copies of the received blocks into their place;
+//   - reduce: combination of the symmetry flags of the ranks
+// Every kernel adds the time of its phases to phases[PHASES]
+enum Phase { DISTRIBUTE, COMPUTE, PACK, COMMUNICATE, UNPACK, REDUCE, PHASES };
+const char *const PHASE_NAMES[PHASES] = {"distribute", "compute", "pack", "communicate", "unpack", "reduce"};
+
+// Function to check if the matrix is symmetric. The rows are shared among the
+// ranks by the partition (see validPartition): n / size rows each (rows, the
+// first ranks get most of the pairs), a contiguous range of rows with the same
+// number of pairs (triangular) or a range of the pairs of rows i and n - 1 - i
+// (paired)
+bool checkSymMPI(const Matrix &matrix, int rank, int size, const std::string &partition, double *phases) {
     int n = matrix.size();
-    std::vector<float> flatMatrix(n * n);
-    for (int i = 0; i < n; ++i) {
-        for (int j = 0; j < n; ++j) {
-            flatMatrix[i * n + j] = matrix[i][j];
+    bool localSymmetric = true;
+    double start = MPI_Wtime();
+
+    if (partition == "paired") {
+        // The middle row of an odd n has no pair
+        int pairs = (n + 1) / 2;
+        int startPair = int((long long)rank * pairs / size);
+        int endPair = int((long long)(rank + 1) * pairs / size);
+        for (int i = startPair; i < endPair; ++i) {
+            localSymmetric = rowSymmetric(matrix, i) && localSymmetric;
+            if (n - 1 - i != i) {
+                localSymmetric = rowSymmetric(matrix, n - 1 - i) && localSymmetric;
+            }
+        }
+    } else {
+        // Each process gets a range of rows to check
+        int rowsPerProcess = n / size;
+        int startRow = rank * rowsPerProcess;
+        int endRow  = (rank == size - 1) ? n : startRow + rowsPerProcess;
+        if (partition == "triangular") {
+            triangleRows(n, rank, size, startRow, endRow);
+        }
+        for (int i = startRow; i < endRow; ++i) {
+            localSymmetric = rowSymmetric(matrix, i) && localSymmetric;
         }
     }
-    return flatMatrix;
+    phases[COMPUTE] += MPI_Wtime() - start;
+
+    // Combine results from all processes
+    start = MPI_Wtime();
+    int localSym = localSymmetric ? 1 : 0;
+    int globalSym;
+    MPI_Allreduce(&localSym, &globalSym, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+    phases[REDUCE] += MPI_Wtime() - start;
+
+    return globalSym == 1;
 }
 
-// Function to reconstruct a 2D matrix from a 1D vector
-std::vector<std::vector<float>> reconstructMatrix(const std::vector<float> &flatMatrix, int n) {
-    std::vector<std::vector<float>> matrix(n, std::vector<float>(n));
-    for (int i = 0; i < n; ++i) {
-        for (int j = 0; j < n; ++j) {
-            matrix[i][j] = flatMatrix[i * n + j];
+// Tile-pair symmetry check on the same row ranges as checkSymMPI. Without
+// earlyExit every rank scans all its rows; with earlyExit the rows are checked
+// in blocks of tile rows and after every block the ranks combine their flags
+// with a non-blocking MPI_Iallreduce, which runs while the next block is being
+// checked: as soon as one rank has found an asymmetric pair, all of them stop
+bool checkSymBlockedMPI(const Matrix &matrix, int rank, int size, int tile, bool earlyExit, double *phases) {
+    int n = matrix.size();
+    int rowsPerProcess = n / size;
+    int startRow = rank * rowsPerProcess;
+    int endRow  = (rank == size - 1) ? n : startRow + rowsPerProcess;
+
+    int localFound = 0;
+    int globalFound = 0;
+    double start = MPI_Wtime();
+    if (!earlyExit) {
+        for (int ii = startRow; ii < endRow; ii += tile) {
+            if (!rowBlockSymmetric(matrix, ii, std::min(ii + tile, endRow), tile, false)) {
+                localFound = 1;
+            }
         }
+        phases[COMPUTE] += MPI_Wtime() - start;
+        start = MPI_Wtime();
+        MPI_Allreduce(&localFound, &globalFound, 1, MPI_INT, MPI_LOR, MPI_COMM_WORLD);
+        phases[REDUCE] += MPI_Wtime() - start;
+        return globalFound == 0;
     }
-    return matrix;
+
+    // Every rank takes part in the same number of rounds (the last rank has
+    // the most rows), also when it has no rows left to check
+    int maxRows = rowsPerProcess + n % size;
+    int rounds = (maxRows + tile - 1) / tile;
+    int sentFound = 0;
+    MPI_Request request = MPI_REQUEST_NULL;
+
+    for (int b = 0; b < rounds; ++b) {
+        int ii = startRow + b * tile;
+        if (!localFound && ii < endRow) {
+            start = MPI_Wtime();
+            if (!rowBlockSymmetric(matrix, ii, std::min(ii + tile, endRow), tile, true)) {
+                localFound = 1;
+            }
+            phases[COMPUTE] += MPI_Wtime() - start;
+        }
+
+        // Flags of the previous round: every rank sees the same value and
+        // leaves the loop at the same round
+        start = MPI_Wtime();
+        if (request != MPI_REQUEST_NULL) {
+            MPI_Wait(&request, MPI_STATUS_IGNORE);
+            if (globalFound) {
+                phases[REDUCE] += MPI_Wtime() - start;
+                return false;
+            }
+        }
+        sentFound = localFound;
+        MPI_Iallreduce(&sentFound, &globalFound, 1, MPI_INT, MPI_LOR, MPI_COMM_WORLD, &request);
+        phases[REDUCE] += MPI_Wtime() - start;
+    }
+
+    start = MPI_Wtime();
+    MPI_Wait(&request, MPI_STATUS_IGNORE);
+    phases[REDUCE] += MPI_Wtime() - start;
+    return globalFound == 0;
 }
 
-void printMatrix(const std::vector<std::vector<float>> &matrix, const std::string &label) {
-    std::cout << label << ":\n";
-    for (const auto &row : matrix) {
-        for (const auto &value : row) {
-            std::cout << value << " ";
+Matrix matTransposeMPI(const Matrix &local_matrix, int n, int rank, int size, double *phases) {
+    int rows_per_process = n / size;
+    double start = MPI_Wtime();
+    Matrix local_transposed_chunk(rows_per_process, n);
+
+    // transpose a chunk for every process: rows [rank * rows_per_process, (rank + 1) * rows_per_process) of the result
+    for (int i = 0; i<rows_per_process; i++){
+        float *chunk_row = local_transposed_chunk.row(i);
+        for (int j = 0; j<n; j++){
+            chunk_row[j] = local_matrix(j, i+(rank*rows_per_process));
         }
-        std::cout << "\n";
     }
-    std::cout << "\n";
+    phases[PACK] += MPI_Wtime() - start;
+
+    // the process with rank 0 gathers all the transposed chunks, already in
+    // their final place since both buffers are contiguous and row-major
+    Matrix transpose;
+    if (rank == 0) {
+        transpose = Matrix(n);
+    }
+    start = MPI_Wtime();
+    MPI_Gather(local_transposed_chunk.data(), rows_per_process*n, MPI_FLOAT, transpose.data(), rows_per_process*n, MPI_FLOAT, 0, MPI_COMM_WORLD);
+    phases[COMMUNICATE] += MPI_Wtime() - start;
+
+    return transpose;
 }
 
-// Function to check if the matrix is symmetric
-bool checkSymMPI(const std::vector<std::vector<float>> &matrix, int rank, int size) {
-    int n = matrix.size();
+// Function to transpose with derived datatypes instead of the copy into
+// local_transposed_chunk: every rank sends its column block straight from the
+// matrix and rank 0 receives every element directly in its transposed place
+Matrix matTransposeDatatypeMPI(const Matrix &local_matrix, int n, int rank, int size, double *phases) {
+    int rows_per_process = n / size;
+    double start = MPI_Wtime();
+
+    // column block of this rank: n rows of rows_per_process elements, row stride n
+    MPI_Datatype column_block;
+    MPI_Type_vector(n, rows_per_process, n, MPI_FLOAT, &column_block);
+    MPI_Type_commit(&column_block);
+
+    // a row of the column block, stored as a column of the transpose: stride n,
+    // resized to one float so that the next row lands in the next column
+    MPI_Datatype transposed_row, transposed_row_resized;
+    MPI_Type_vector(rows_per_process, 1, n, MPI_FLOAT, &transposed_row);
+    MPI_Type_create_resized(transposed_row, 0, sizeof(float), &transposed_row_resized);
+    MPI_Type_commit(&transposed_row_resized);
+
+    // rank r fills rows [r * rows_per_process, (r + 1) * rows_per_process) of the result
+    Matrix transpose;
+    std::vector<int> counts, displs;
+    if (rank == 0) {
+        transpose = Matrix(n);
+        for (int r = 0; r < size; r++){
+            counts.push_back(n);
+            displs.push_back(r * rows_per_process * n);
+        }
+    }
+    phases[PACK] += MPI_Wtime() - start;
+    start = MPI_Wtime();
+    MPI_Gatherv(local_matrix.data() + rank * rows_per_process, 1, column_block, transpose.data(), counts.data(), displs.data(), transposed_row_resized, 0, MPI_COMM_WORLD);
+    phases[COMMUNICATE] += MPI_Wtime() - start;
+
+    MPI_Type_free(&column_block);
+    MPI_Type_free(&transposed_row);
+    MPI_Type_free(&transposed_row_resized);
+    return transpose;
+}
+
+// Distributed layout: every rank owns only rows [rank * rpp, (rank + 1) * rpp)
+// of the matrix (rpp = n / size), seen as size square blocks of rpp x rpp.
+// Function to send block c of the local rows to rank c, transposed or not, with
+// a single MPI_Alltoall. The received blocks are stacked in a (size * rpp) x rpp
+// matrix: block r comes from rank r
+Matrix exchangeBlocks(const Matrix &local_rows, int size, bool transposeBlocks, double *phases) {
+    int rpp = local_rows.rows();
+    double start = MPI_Wtime();
+    Matrix send_blocks(size * rpp, rpp);
+    Matrix recv_blocks(size * rpp, rpp);
+
+    for (int c = 0; c < size; c++){
+        for (int i = 0; i<rpp; i++){
+            float *block_row = send_blocks.row(c * rpp + i);
+            for (int j = 0; j<rpp; j++){
+                block_row[j] = transposeBlocks ? local_rows(j, c * rpp + i) : local_rows(i, c * rpp + j);
+            }
+        }
+    }
+    phases[PACK] += MPI_Wtime() - start;
+
+    start = MPI_Wtime();
+    MPI_Alltoall(send_blocks.data(), rpp * rpp, MPI_FLOAT, recv_blocks.data(), rpp * rpp, MPI_FLOAT, MPI_COMM_WORLD);
+    phases[COMMUNICATE] += MPI_Wtime() - start;
+    return recv_blocks;
+}
+
+// Function to check the symmetry of a distributed matrix: rank r receives the
+// blocks (c, r) of the other ranks and compares them with its mirror blocks (r, c)
+bool checkSymDistributedMPI(const Matrix &local_rows, int rank, int size, double *phases) {
+    int rpp = local_rows.rows();
+    Matrix blocks = exchangeBlocks(local_rows, size, false, phases);
     bool localSymmetric = true;
-    
-    // Each process gets a range of rows to check
-    int rowsPerProcess = n / size;
-    int startRow = rank * rowsPerProcess;
-    int endRow  = (rank == size - 1) ? n : startRow + rowsPerProcess;
+    double start = MPI_Wtime();
 
-    for (int i = startRow; i < endRow; ++i) {
-        for (int j = i + 1; j < n; ++j) {
-            if (matrix[i][j] != matrix[j][i]) {
-                localSymmetric = false;
+    // Blocks below the diagonal are checked by the rank owning their mirror
+    for (int c = rank; c < size; c++){
+        for (int i = 0; i<rpp; i++){
+            const float *block_row = blocks.row(c * rpp + i);
+            for (int j = (c == rank) ? i + 1 : 0; j<rpp; j++){
+                if (block_row[j] != local_rows(j, c * rpp + i)) {
+                    localSymmetric = false;
+                }
             }
         }
     }
+    phases[COMPUTE] += MPI_Wtime() - start;
 
-    // Combine results from all processes
+    start = MPI_Wtime();
     int localSym = localSymmetric ? 1 : 0;
     int globalSym;
     MPI_Allreduce(&localSym, &globalSym, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+    phases[REDUCE] += MPI_Wtime() - start;
 
     return globalSym == 1;
 }
 
-std::vector<std::vector<float>> matTransposeMPI(const std::vector<std::vector<float>> &local_matrix, int n, int rank, int size) {
-    int rows_per_process = n / size;
-    std::vector<std::vector<float>> local_transposed_chunk(rows_per_process, std::vector<float>(n));
-    std::vector<std::vector<float>> transpose(n, std::vector<float>(n));
+// Function to transpose a distributed matrix: the result stays distributed,
+// with the same rows of the transpose on every rank as of the input
+Matrix matTransposeDistributedMPI(const Matrix &local_rows, int size, double *phases) {
+    int rpp = local_rows.rows();
+    int n = local_rows.cols();
+    Matrix blocks = exchangeBlocks(local_rows, size, true, phases);
 
-    // transpose a chunk for every process 
-    for (int i = 0; i<rows_per_process; i++){
-        for (int j = 0; j<n; j++){
-            local_transposed_chunk[i][j] = local_matrix[j][i+(rank*rows_per_process)];
+    // block r, already transposed by rank r, is the column block r of our rows
+    double start = MPI_Wtime();
+    Matrix local_transposed(rpp, n);
+    for (int i = 0; i<rpp; i++){
+        float *result_row = local_transposed.row(i);
+        for (int r = 0; r < size; r++){
+            const float *block_row = blocks.row(r * rpp + i);
+            std::copy(block_row, block_row + rpp, result_row + r * rpp);
         }
     }
+    phases[UNPACK] += MPI_Wtime() - start;
+    return local_transposed;
+}
 
-    // flatten the chunk
-    std::vector<float> local_flat_chunk(rows_per_process * n);
-    for (int i = 0; i < rows_per_process; ++i) {
-        for (int j = 0; j < n; ++j) {
-            local_flat_chunk[i * rows_per_process + j] = local_transposed_chunk[i][j];
-        }
+// Function to transpose a distributed matrix with derived datatypes: the blocks
+// are sent straight from the local rows and written transposed at their place
+// in the result, so the MPI library does both the packing and the unpacking
+Matrix matTransposeDistributedDatatypeMPI(const Matrix &local_rows, double *phases) {
+    int rpp = local_rows.rows();
+    int n = local_rows.cols();
+    double start = MPI_Wtime();
+
+    // block c of the local rows: rpp rows of rpp elements, row stride n; the
+    // extent of rpp floats makes block c start at column c * rpp
+    MPI_Datatype block, block_resized;
+    MPI_Type_vector(rpp, rpp, n, MPI_FLOAT, &block);
+    MPI_Type_create_resized(block, 0, rpp * sizeof(float), &block_resized);
+    MPI_Type_commit(&block_resized);
+
+    // the same block with the rows received as columns
+    MPI_Datatype column, column_resized, transposed_block, transposed_block_resized;
+    MPI_Type_vector(rpp, 1, n, MPI_FLOAT, &column);
+    MPI_Type_create_resized(column, 0, sizeof(float), &column_resized);
+    MPI_Type_contiguous(rpp, column_resized, &transposed_block);
+    MPI_Type_create_resized(transposed_block, 0, rpp * sizeof(float), &transposed_block_resized);
+    MPI_Type_commit(&transposed_block_resized);
+
+    Matrix local_transposed(rpp, n);
+    phases[PACK] += MPI_Wtime() - start;
+    start = MPI_Wtime();
+    MPI_Alltoall(local_rows.data(), 1, block_resized, local_transposed.data(), 1, transposed_block_resized, MPI_COMM_WORLD);
+    phases[COMMUNICATE] += MPI_Wtime() - start;
+
+    MPI_Type_free(&block);
+    MPI_Type_free(&block_resized);
+    MPI_Type_free(&column);
+    MPI_Type_free(&column_resized);
+    MPI_Type_free(&transposed_block);
+    MPI_Type_free(&transposed_block_resized);
+    return local_transposed;
+}
+
+// Function to read the row block of this rank from the payload of a matrix
+// file, which starts at byte payload, collectively: the file view of every rank
+// starts at its first row, so all the ranks read from offset 0 of their view
+// with MPI_File_read_at_all and MPI-IO can merge their requests
+bool readRowBlockAllMPI(const std::string &path, MPI_Offset payload, Matrix &local_rows, int rank) {
+    int n = local_rows.cols();
+    int rpp = local_rows.rows();
+
+    MPI_File file;
+    if (MPI_File_open(MPI_COMM_WORLD, path.c_str(), MPI_MODE_RDONLY, MPI_INFO_NULL, &file) != MPI_SUCCESS) {
+        return false;
     }
+    MPI_Offset first = payload + MPI_Offset(rank) * rpp * n * MPI_Offset(sizeof(float));
+    MPI_File_set_view(file, first, MPI_FLOAT, MPI_FLOAT, "native", MPI_INFO_NULL);
+    int ok = (MPI_File_read_at_all(file, 0, local_rows.data(), rpp * n, MPI_FLOAT, MPI_STATUS_IGNORE) == MPI_SUCCESS) ? 1 : 0;
+    MPI_File_close(&file);
 
-    // the process with rank 0 gathers all the transposed chunks
-    std::vector<float> flat_transpose(n * n);
-    MPI_Gather(local_flat_chunk.data(), rows_per_process*n, MPI_FLOAT, flat_transpose.data(), rows_per_process*n, MPI_FLOAT, 0, MPI_COMM_WORLD);
-    
-    // retransform the flat matrix into the 2d matrix
-    if (rank == 0) {
-        for (int i = 0; i < n; ++i) {
-            for (int j = 0; j < n; ++j) {
-                transpose[i][j] = flat_transpose[i * n + j];
+    int allOk;
+    MPI_Allreduce(&ok, &allOk, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+    return allOk == 1;
+}
+
+// Function to read the row block of this rank from a matrix file (see matio.h)
+// with collective MPI-IO, every rank its own rows. The checksum of the file is
+// verified by adding up the checksums of the blocks, and the byte offset of
+// the payload is returned for the next reads. Returns false on every rank when
+// the file is not an n x n matrix file (n = local_rows.cols()) or is corrupt
+bool readRowBlockMPI(const std::string &path, Matrix &local_rows, int rank, MPI_Offset &payload, std::string &error) {
+    int n = local_rows.cols();
+    int rpp = local_rows.rows();
+
+    // Every rank checks the header itself, then they agree before MPI-IO
+    MatrixFileHeader header;
+    int ok = 1;
+    try {
+        header = readMatrixHeader(path);
+        ok = (header.rows == std::uint64_t(n) && header.cols == std::uint64_t(n)) ? 1 : 0;
+    } catch (const std::exception &) {
+        ok = 0;
+    }
+    int allOk;
+    MPI_Allreduce(&ok, &allOk, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+    if (!allOk) {
+        error = path + " is not a readable " + std::to_string(n) + " x " + std::to_string(n) + " matrix file";
+        return false;
+    }
+
+    payload = MPI_Offset(header.offset);
+    if (!readRowBlockAllMPI(path, payload, local_rows, rank)) {
+        error = "cannot read " + path;
+        return false;
+    }
+
+    std::uint64_t localSum = matrixChecksum(local_rows.data(), local_rows.count(), std::uint64_t(rank) * rpp * n);
+    std::uint64_t checksum;
+    MPI_Allreduce(&localSum, &checksum, 1, MPI_UINT64_T, MPI_SUM, MPI_COMM_WORLD);
+    if (checksum != header.checksum) {
+        error = path + ": wrong checksum";
+        return false;
+    }
+    return true;
+}
+
+// Function to write the distributed transpose (the rows of the transpose owned
+// by this rank) to a matrix file with collective MPI-IO: rank 0 writes the
+// header, with the checksum added up from the blocks, and every rank writes
+// its rows through a file view starting at them with MPI_File_write_at_all.
+// Returns false on every rank when the file cannot be written
+bool writeRowBlockMPI(const std::string &path, const Matrix &local_rows, int rank, std::string &error) {
+    int n = local_rows.cols();
+    int rpp = local_rows.rows();
+
+    std::uint64_t localSum = matrixChecksum(local_rows.data(), local_rows.count(), std::uint64_t(rank) * rpp * n);
+    std::uint64_t checksum;
+    MPI_Allreduce(&localSum, &checksum, 1, MPI_UINT64_T, MPI_SUM, MPI_COMM_WORLD);
+    MatrixFileHeader header = makeMatrixHeader(n, n, checksum);
+
+    MPI_File file;
+    if (MPI_File_open(MPI_COMM_WORLD, path.c_str(), MPI_MODE_CREATE | MPI_MODE_WRONLY, MPI_INFO_NULL, &file) != MPI_SUCCESS) {
+        error = "cannot create " + path;
+        return false;
+    }
+    // Drop the tail of a larger file written before
+    MPI_File_set_size(file, MPI_Offset(header.offset) + MPI_Offset(n) * n * MPI_Offset(sizeof(float)));
+
+    int ok = 1;
+    if (rank == 0 && MPI_File_write_at(file, 0, &header, sizeof(header), MPI_BYTE, MPI_STATUS_IGNORE) != MPI_SUCCESS) {
+        ok = 0;
+    }
+    MPI_Offset first = MPI_Offset(header.offset) + MPI_Offset(rank) * rpp * n * MPI_Offset(sizeof(float));
+    MPI_File_set_view(file, first, MPI_FLOAT, MPI_FLOAT, "native", MPI_INFO_NULL);
+    if (MPI_File_write_at_all(file, 0, local_rows.data(), rpp * n, MPI_FLOAT, MPI_STATUS_IGNORE) != MPI_SUCCESS) {
+        ok = 0;
+    }
+    MPI_File_close(&file);
+
+    int allOk;
+    MPI_Allreduce(&ok, &allOk, 1, MPI_INT, MPI_LAND, MPI_COMM_WORLD);
+    if (!allOk) {
+        error = "cannot write " + path;
+        return false;
+    }
+    return true;
+}
+
+// Function to combine count times of every rank into the smallest, mean and
+// largest one on rank 0: stats[3 * i], stats[3 * i + 1] and stats[3 * i + 2]
+void timeStatsMPI(const double *times, int count, int size, double *stats) {
+    std::vector<double> minMax(2 * count), allMinMax(2 * count), sums(count);
+    for (int i = 0; i < count; ++i) {
+        minMax[i] = times[i];
+        minMax[count + i] = -times[i];
+    }
+    MPI_Reduce(minMax.data(), allMinMax.data(), 2 * count, MPI_DOUBLE, MPI_MIN, 0, MPI_COMM_WORLD);
+    MPI_Reduce(times, sums.data(), count, MPI_DOUBLE, MPI_SUM, 0, MPI_COMM_WORLD);
+    for (int i = 0; i < count; ++i) {
+        stats[3 * i] = allMinMax[i];
+        stats[3 * i + 1] = sums[i] / size;
+        stats[3 * i + 2] = -allMinMax[count + i];
+    }
+}
+
+// Function to parse the command line:
+//   <matrix_size> [--reps N] [--warmup W] [--sym full|blocked|early]
+//                 [--mode replicated|distributed] [--pack manual|datatype]
+//                 [--partition rows|triangular|paired] [--input FILE] [--output FILE] [--seed S] [--perf]
+// sym selects the element-wise symmetry check (full), the tile-pair one
+// (blocked) or the tile-pair one stopping at the first asymmetric pair (early).
+// mode selects the original layout, with the whole matrix on every rank and
+// the transpose gathered on rank 0 (replicated), or the row blocks scattered
+// among the ranks and exchanged with MPI_Alltoall (distributed, full check only).
+// pack selects how the transpose is sent: copied into contiguous buffers by
+// our loops (manual) or described with MPI derived datatypes (datatype).
+// partition shares the rows of the element-wise check of the replicated
+// layout among the ranks (see checkSymMPI).
+// The matrix is read from the input file (see matio.h) or generated from the
+// seed (see loadMatrix). In distributed mode the input file is read again by
+// every repetition, and the transpose written to the output file (distributed
+// mode only), both with collective MPI-IO and timed apart from the kernels.
+// With perf the hardware counters of every kernel are read, summed over the
+// ranks (see perf.h)
+bool parseArgs(int argc, char *argv[], int &n, int &reps, int &warmup, std::string &sym, std::string &mode,
+               std::string &pack, std::string &partition, std::string &input, std::string &output, long long &seed,
+               bool &perf) {
+    if (argc < 2) {
+        return false;
+    }
+    reps = 1;
+    warmup = 0;
+    sym = "full";
+    mode = "replicated";
+    pack = "manual";
+    partition = "rows";
+    input = "";
+    output = "";
+    seed = -1;
+    perf = false;
+    try {
+        n = std::stoi(argv[1]);
+        for (int i = 2; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--reps" && i + 1 < argc) {
+                reps = std::stoi(argv[++i]);
+            } else if (arg == "--warmup" && i + 1 < argc) {
+                warmup = std::stoi(argv[++i]);
+            } else if (arg == "--sym" && i + 1 < argc) {
+                sym = argv[++i];
+            } else if (arg == "--mode" && i + 1 < argc) {
+                mode = argv[++i];
+            } else if (arg == "--pack" && i + 1 < argc) {
+                pack = argv[++i];
+            } else if (arg == "--partition" && i + 1 < argc) {
+                partition = argv[++i];
+            } else if (arg == "--input" && i + 1 < argc) {
+                input = argv[++i];
+            } else if (arg == "--output" && i + 1 < argc) {
+                output = argv[++i];
+            } else if (arg == "--seed" && i + 1 < argc) {
+                seed = std::stoll(argv[++i]);
+                if (seed < 0) {
+                    return false;
+                }
+            } else if (arg == "--perf") {
+                perf = true;
+            } else {
+                return false;
             }
         }
+    } catch (const std::exception &) {
+        return false;
     }
-
-    return transpose;
+    bool validSym = (sym == "full" || sym == "blocked" || sym == "early");
+    bool validMode = (mode == "replicated" || (mode == "distributed" && sym == "full"));
+    bool validPack = (pack == "manual" || pack == "datatype");
+    bool validOutput = (output.empty() || mode == "distributed");
+    bool validPartitionSym = validPartition(partition) && (partition == "rows" || (sym == "full" && mode == "replicated"));
+    return n > 0 && reps > 0 && warmup >= 0 && validSym && validMode && validPack && validOutput && validPartitionSym;
 }
 
 int main(int argc, char *argv[]) {
@@ -122,15 +534,20 @@ int main(int argc, char *argv[]) {
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
     MPI_Comm_size(MPI_COMM_WORLD, &size);
 
-    if (argc != 2) {
+    int n, reps, warmup;
+    std::string sym, mode, pack, partition, input, output;
+    long long seed;
+    bool perf;
+    if (!parseArgs(argc, argv, n, reps, warmup, sym, mode, pack, partition, input, output, seed, perf)) {
         if (rank == 0) {
-            std::cerr << "Usage: " << argv[0] << " <matrix_size>\n";
+            std::cerr << "Usage: " << argv[0] << " <matrix_size> [--reps N] [--warmup W] [--sym full|blocked|early]"
+                      << " [--mode replicated|distributed] [--pack manual|datatype] [--partition rows|triangular|paired]"
+                      << " [--input FILE] [--output FILE] [--seed S] [--perf]\n";
         }
         MPI_Finalize();
         return 1;
     }
 
-    int n = std::stoi(argv[1]);
     if (n % size != 0) {
         if (rank == 0) {
             std::cerr << "Matrix size must be divisible by the number of processes.\n";
@@ -139,47 +556,183 @@ int main(int argc, char *argv[]) {
         return 1;
     }
 
-    std::vector<std::vector<float>> local_matrix;
-    std::vector<float> flatMatrix;
-
-    if (rank == 0) {
-        // Initialize the matrix in rank 0
-        local_matrix = initializeMatrix(n);
-        flatMatrix = flattenMatrix(local_matrix);
-        // std::cout << std::endl;
-        // printMatrix(local_matrix, "Original Matrix");
+    bool distributed = (mode == "distributed");
+    bool datatype = (pack == "datatype");
+    int rows_per_process = n / size;
+    Matrix local_matrix;
+    bool loaded = true;
+    // Byte offset of the payload of the input file, for the collective reads
+    MPI_Offset payload = 0;
+    // Time of the distribute phase (see Phase) of this rank
+    double distributeTime = 0.0;
 
+    if (distributed && !input.empty()) {
+        // Every rank reads only its own rows of the file
+        local_matrix = Matrix(rows_per_process, n);
+        std::string error;
+        loaded = readRowBlockMPI(input, local_matrix, rank, payload, error);
+        if (!loaded && rank == 0) {
+            std::cerr << "Error: " << error << "\n";
+        }
+    } else if (distributed && seed >= 0) {
+        // Every rank generates only its own rows of the seeded matrix
+        local_matrix = Matrix(rows_per_process, n);
+        fillSeeded(local_matrix, rank * rows_per_process, std::uint64_t(seed));
     } else {
-        flatMatrix.resize(n * n);
-    }
+        int ok = 1;
+        if (rank == 0) {
+            // Initialize (or read) the matrix in rank 0
+            try {
+                local_matrix = loadMatrix(n, input, seed);
+            } catch (const std::exception &e) {
+                std::cerr << "Error: " << e.what() << "\n";
+                ok = 0;
+            }
+            // std::cout << std::endl;
+            // printMatrix(local_matrix, "Original Matrix");
 
-    // Broadcast the flattened matrix to all processes
-    MPI_Bcast(flatMatrix.data(), n * n, MPI_FLOAT, 0, MPI_COMM_WORLD);
+        } else if (!distributed) {
+            local_matrix = Matrix(n);
+        }
+        MPI_Bcast(&ok, 1, MPI_INT, 0, MPI_COMM_WORLD);
+        loaded = (ok == 1);
 
-    // Reconstruct the matrix from the received vector
-    local_matrix = reconstructMatrix(flatMatrix, n);
+        double start = MPI_Wtime();
+        if (loaded && distributed) {
+            // Scatter the row blocks; rank 0 frees the whole matrix afterwards,
+            // so every rank keeps only n * n / size elements
+            Matrix local_rows(rows_per_process, n);
+            MPI_Scatter(local_matrix.data(), rows_per_process * n, MPI_FLOAT, local_rows.data(), rows_per_process * n, MPI_FLOAT, 0, MPI_COMM_WORLD);
+            local_matrix = std::move(local_rows);
+        } else if (loaded) {
+            // Broadcast the matrix buffer to all processes
+            MPI_Bcast(local_matrix.data(), n * n, MPI_FLOAT, 0, MPI_COMM_WORLD);
+        }
+        distributeTime = MPI_Wtime() - start;
+    }
 
-    // Measure symmetry check time
-    auto start = MPI_Wtime();
-    bool isSymmetric = checkSymMPI(local_matrix, rank, size);
-    auto end = MPI_Wtime();
+    if (!loaded) {
+        MPI_Finalize();
+        return 1;
+    }
 
-    if (rank == 0) {
-        std::cout << (end - start) << ",";
+    // Repetitions doing MPI-IO report its time, the others NaN
+    bool readInput = distributed && !input.empty();
+    bool io = readInput || !output.empty();
+
+    // Hardware counters of the kernels in every rank, NaN without --perf
+    PerfCounters counters;
+    if (perf) {
+        int opened = counters.open();
+        int allOpened;
+        MPI_Reduce(&opened, &allOpened, 1, MPI_INT, MPI_MIN, 0, MPI_COMM_WORLD);
+        if (rank == 0) {
+            perfWarning(allOpened);
+        }
     }
+    double localCounts[PERF_EVENTS], checkSymCounts[PERF_EVENTS], transposeCounts[PERF_EVENTS];
+    missingCounts(checkSymCounts);
+    missingCounts(transposeCounts);
+    double phases[PHASES], checkSymWork[3], phaseStats[3 * PHASES];
 
-    // Measure transpose time
-    start = MPI_Wtime();
-    auto transposed_matrix = matTransposeMPI(local_matrix, n, rank, size);
-    end = MPI_Wtime();
+    // The first warmup repetitions are run but not printed
+    for (int r = 0; r < warmup + reps; ++r) {
+        // Start every repetition together
+        MPI_Barrier(MPI_COMM_WORLD);
 
-    if (rank == 0) {
-        std::cout << (end - start);
-        // std::cout << std::endl;
-        // printMatrix(transposed_matrix, "Transposed Matrix");
+        double ioTime = io ? 0.0 : std::numeric_limits<double>::quiet_NaN();
+        std::string error;
+        for (int ph = 0; ph < PHASES; ++ph) {
+            phases[ph] = 0.0;
+        }
+        phases[DISTRIBUTE] = distributeTime;
+
+        // Measure read time: every repetition reads its rows of the input again
+        auto start = MPI_Wtime();
+        if (readInput && !readRowBlockAllMPI(input, payload, local_matrix, rank)) {
+            if (rank == 0) {
+                std::cerr << "Error: cannot read " << input << "\n";
+            }
+            MPI_Finalize();
+            return 1;
+        }
+        auto end = MPI_Wtime();
+        if (readInput) {
+            ioTime += end - start;
+        }
+
+        // Measure symmetry check time (and counters)
+        counters.start();
+        start = MPI_Wtime();
+        bool isSymmetric;
+        if (distributed) {
+            isSymmetric = checkSymDistributedMPI(local_matrix, rank, size, phases);
+        } else if (sym == "full") {
+            isSymmetric = checkSymMPI(local_matrix, rank, size, partition, phases);
+        } else {
+            isSymmetric = checkSymBlockedMPI(local_matrix, rank, size, defaultTileSize(), sym == "early", phases);
+        }
+        end = MPI_Wtime();
+        counters.stop();
+        double checkSymTime = end - start;
+        // The work of checkSym is its compute phase (matTranspose has none)
+        timeStatsMPI(&phases[COMPUTE], 1, size, checkSymWork);
+        if (perf) {
+            clearCounts(localCounts);
+            counters.read(localCounts);
+            MPI_Reduce(localCounts, checkSymCounts, PERF_EVENTS, MPI_DOUBLE, MPI_SUM, 0, MPI_COMM_WORLD);
+        }
 
+        // Measure transpose time (and counters)
+        counters.start();
+        start = MPI_Wtime();
+        Matrix transposed_matrix;
+        if (distributed) {
+            transposed_matrix = datatype ? matTransposeDistributedDatatypeMPI(local_matrix, phases)
+                                         : matTransposeDistributedMPI(local_matrix, size, phases);
+        } else {
+            transposed_matrix = datatype ? matTransposeDatatypeMPI(local_matrix, n, rank, size, phases)
+                                         : matTransposeMPI(local_matrix, n, rank, size, phases);
+        }
+        end = MPI_Wtime();
+        counters.stop();
+        double transposeTime = end - start;
+        if (perf) {
+            clearCounts(localCounts);
+            counters.read(localCounts);
+            MPI_Reduce(localCounts, transposeCounts, PERF_EVENTS, MPI_DOUBLE, MPI_SUM, 0, MPI_COMM_WORLD);
+        }
+
+        // Measure write time of the transpose
+        if (!output.empty()) {
+            start = MPI_Wtime();
+            if (!writeRowBlockMPI(output, transposed_matrix, rank, error)) {
+                if (rank == 0) {
+                    std::cerr << "Error: " << error << "\n";
+                }
+                MPI_Finalize();
+                return 1;
+            }
+            end = MPI_Wtime();
+            ioTime += end - start;
+        }
+
+        // One CSV line per repetition: checksym_time,transpose_time,io_time,sym,mode,pack,partition,
+        // the time of the ranks in checkSym (checksym_work_min,checksym_work_mean,checksym_work_max),
+        // in every phase (phase_distribute_min, ..., phase_reduce_max, see Phase), then the
+        // counters of checkSym and of matTranspose (see PERF_EVENT_NAMES)
+        timeStatsMPI(phases, PHASES, size, phaseStats);
+        if (rank == 0 && r >= warmup) {
+            std::cout << checkSymTime << "," << transposeTime << "," << ioTime << "," << sym << "," << mode << "," << pack
+                      << "," << partition << "," << checkSymWork[0] << "," << checkSymWork[1] << "," << checkSymWork[2];
+            for (int i = 0; i < 3 * PHASES; ++i) {
+                std::cout << "," << phaseStats[i];
+            }
+            std::cout << perfColumns(checkSymCounts) << perfColumns(transposeCounts) << std::endl;
+            // printMatrix(transposed_matrix, "Transposed Matrix");
+        }
     }
 
     MPI_Finalize();
     return 0;
-}
+}
\ No newline at end of file
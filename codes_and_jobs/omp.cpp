@@ -1,79 +1,441 @@
 #include <iostream>
-#include <vector>
-#include <random>
+#include <algorithm>
 #include <chrono>
+#include <cstdlib>
+#include <sstream>
+#include <string>
+#include <vector>
 #include <omp.h>
 
-// Function to initialize a random n x n matrix
-std::vector<std::vector<float>> initializeMatrix(int n) {
-    std::vector<std::vector<float>> matrix(n, std::vector<float>(n));
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_real_distribution<float> dist(0.0, 100.0);
+#include "matio.h"
+#include "matrix.h"
+#include "perf.h"
+#include "tuning.h"
 
-    for (int i = 0; i < n; ++i) {
-        for (int j = 0; j < n; ++j) {
-            matrix[i][j] = dist(gen);
+// The element-wise check (rows and paired partitions) and both transposes take
+// the OpenMP schedule set at run time (--schedule, static by default). The
+// symmetry checks store the time every thread of the team spends checking
+// rows in work, to measure the load imbalance. The transposes write into the
+// n x n transpose of the caller, so that its pages can be placed beforehand
+// (see --init)
+
+// Element-wise symmetry check, with the rows shared among the threads by the
+// partition (see validPartition): the default static schedule of the rows
+// partition gives the first threads most of the pairs, triangular gives every
+// thread one contiguous range of rows with the same number of pairs, paired
+// gives the threads pairs of rows i and n - 1 - i
+bool checkSymOMP(const Matrix &matrix, const std::string &partition, std::vector<double> &work) {
+    int n = matrix.size();
+    bool isSymmetric = true;
+
+    #pragma omp parallel reduction(&&: isSymmetric)
+    {
+        #pragma omp single
+        work.assign(omp_get_num_threads(), 0.0);
+
+        double start = omp_get_wtime();
+        if (partition == "triangular") {
+            int first, last;
+            triangleRows(n, omp_get_thread_num(), omp_get_num_threads(), first, last);
+            for (int i = first; i < last; i++) {
+                isSymmetric = rowSymmetric(matrix, i) && isSymmetric;
+            }
+        } else if (partition == "paired") {
+            // The middle row of an odd n has no pair
+            #pragma omp for schedule(runtime) nowait
+            for (int i = 0; i < (n + 1) / 2; i++) {
+                isSymmetric = rowSymmetric(matrix, i) && isSymmetric;
+                if (n - 1 - i != i) {
+                    isSymmetric = rowSymmetric(matrix, n - 1 - i) && isSymmetric;
+                }
+            }
+        } else {
+            #pragma omp for schedule(runtime) nowait
+            for (int i = 0; i < n; i++) {
+                isSymmetric = rowSymmetric(matrix, i) && isSymmetric;
+            }
         }
+        work[omp_get_thread_num()] = omp_get_wtime() - start;
     }
-    return matrix;
+    return isSymmetric;
 }
 
-bool checkSymOMP(const std::vector<std::vector<float>> &matrix) {
+// Tile-pair symmetry check: the threads take blocks of tile rows dynamically,
+// since the blocks near the bottom of the upper triangle have less work. With
+// earlyExit the first thread finding an asymmetric pair cancels the loop (only
+// effective when the program runs with OMP_CANCELLATION=true)
+bool checkSymBlockedOMP(const Matrix &matrix, int tile, bool earlyExit, std::vector<double> &work) {
     int n = matrix.size();
     bool isSymmetric = true;
 
-    #pragma omp parallel for reduction(&&: isSymmetric)
-    for (int i = 0; i < n; i++) {
-        for (int j = i + 1; j < n; j++) {
-            if (matrix[i][j] != matrix[j][i]) {
-                isSymmetric = false; 
+    // Not a combined "parallel for": the loop to cancel must not be nowait
+    #pragma omp parallel
+    {
+        #pragma omp single
+        work.assign(omp_get_num_threads(), 0.0);
+
+        double busy = 0.0;
+        #pragma omp for schedule(dynamic)
+        for (int ii = 0; ii < n; ii += tile) {
+            double start = omp_get_wtime();
+            bool blockSymmetric = rowBlockSymmetric(matrix, ii, std::min(ii + tile, n), tile, earlyExit);
+            busy += omp_get_wtime() - start;
+            if (!blockSymmetric) {
+                #pragma omp atomic write
+                isSymmetric = false;
+                #pragma omp cancel for if(earlyExit)
             }
+            #pragma omp cancellation point for
         }
+        work[omp_get_thread_num()] = busy;
     }
     return isSymmetric;
 }
 
-std::vector<std::vector<float>> matTransposeOMP(const std::vector<std::vector<float>> &matrix) {
+void matTransposeOMP(const Matrix &matrix, Matrix &transpose) {
     int n = matrix.size();
-    std::vector<std::vector<float>> transpose(n, std::vector<float>(n));
 
-    #pragma omp parallel for collapse(2)
+    #pragma omp parallel for collapse(2) schedule(runtime)
     for (int i = 0; i < n; ++i) {
         for (int j = 0; j < n; ++j) {
-            transpose[j][i] = matrix[i][j];
+            transpose(j, i) = matrix(i, j);
+        }
+    }
+}
+
+// Blocked transpose: the threads share the tile x tile blocks, and every block
+// is read and written while its source and destination rows are in cache
+void matTransposeBlockedOMP(const Matrix &matrix, Matrix &transpose, int tile) {
+    int n = matrix.size();
+
+    #pragma omp parallel for collapse(2) schedule(runtime)
+    for (int ii = 0; ii < n; ii += tile) {
+        for (int jj = 0; jj < n; jj += tile) {
+            int iEnd = std::min(ii + tile, n);
+            int jEnd = std::min(jj + tile, n);
+            for (int i = ii; i < iEnd; ++i) {
+                const float *src = matrix.row(i);
+                for (int j = jj; j < jEnd; ++j) {
+                    transpose(j, i) = src[j];
+                }
+            }
+        }
+    }
+}
+
+// Function to run the transpose of the tile: the element-wise one for tile 0
+void transposeOMP(const Matrix &matrix, Matrix &transpose, int tile) {
+    if (tile > 0) {
+        matTransposeBlockedOMP(matrix, transpose, tile);
+    } else {
+        matTransposeOMP(matrix, transpose);
+    }
+}
+
+// Function to parse an OpenMP schedule written as kind[:chunk], with kind one
+// of static, dynamic, guided and auto (chunk 0 = the default chunk)
+bool parseSchedule(const std::string &text, omp_sched_t &kind, int &chunk) {
+    std::string name = text.substr(0, text.find(':'));
+    chunk = 0;
+    if (name.size() < text.size()) {
+        try {
+            chunk = std::stoi(text.substr(name.size() + 1));
+        } catch (const std::exception &) {
+            return false;
+        }
+    }
+    if (name == "static") {
+        kind = omp_sched_static;
+    } else if (name == "dynamic") {
+        kind = omp_sched_dynamic;
+    } else if (name == "guided") {
+        kind = omp_sched_guided;
+    } else if (name == "auto") {
+        kind = omp_sched_auto;
+    } else {
+        return false;
+    }
+    return chunk >= 0;
+}
+
+// Function to open the hardware counters of every thread of the team: each
+// thread opens its own, so the team must be the one that runs the kernels.
+// Returns the number of events available to every thread
+int openTeamCounters(std::vector<PerfCounters> &counters) {
+    int opened = PERF_EVENTS;
+    #pragma omp parallel reduction(min: opened)
+    {
+        opened = counters[omp_get_thread_num()].open();
+    }
+    return opened;
+}
+
+// Function to sum the counts of every thread of the team. The counters are
+// enabled and disabled by the master thread, so the time the other threads
+// wait between the parallel regions is counted too
+void readTeamCounters(const std::vector<PerfCounters> &counters, double *values) {
+    clearCounts(values);
+    for (const PerfCounters &c : counters) {
+        c.read(values);
+    }
+}
+
+// Function to format the smallest, mean and largest time of the threads
+// (see checkSymOMP) as CSV columns: ", min, mean, max"
+std::string workColumns(const std::vector<double> &work) {
+    double sum = 0.0;
+    for (double w : work) {
+        sum += w;
+    }
+    std::ostringstream out;
+    out << ", " << *std::min_element(work.begin(), work.end()) << ", " << sum / work.size() << ", "
+        << *std::max_element(work.begin(), work.end());
+    return out.str();
+}
+
+// Function to get the input matrix like loadMatrix, but with its pages first
+// touched by the threads of the team: the rows are written in parallel, in
+// static blocks like the rows of the kernels with the static schedule, so on
+// a NUMA node every block lives in the memory of the socket of the thread
+// that reads it. The input file is read by one thread, then copied; without
+// a seed the seed of the matrix is random
+Matrix firstTouchMatrix(int n, const std::string &input, long long seed) {
+    Matrix source;
+    if (!input.empty()) {
+        source = loadMatrix(n, input, seed);
+    } else if (seed < 0) {
+        std::random_device rd;
+        seed = ((long long)(rd() & 0x7FFFFFFF) << 32) | rd();
+    }
+    Matrix matrix(n);
+    std::uint64_t base = std::uint64_t(seed);
+    #pragma omp parallel for schedule(static)
+    for (int i = 0; i < n; ++i) {
+        float *row = matrix.row(i);
+        if (source.size() > 0) {
+            std::copy(source.row(i), source.row(i) + n, row);
+        } else {
+            for (int j = 0; j < n; ++j) {
+                row[j] = seededValue(base, std::uint64_t(i) * n + j);
+            }
         }
     }
-    return transpose;
+    return matrix;
+}
+
+// Function to parse the command line:
+//   <matrix_size> [--reps N] [--warmup W] [--tile T|auto] [--sym full|blocked|early]
+//                 [--schedule KIND[:CHUNK]] [--partition rows|triangular|paired] [--tuning FILE|none]
+//                 [--input FILE] [--seed S] [--init serial|first-touch] [--perf]
+// tile 0 selects the element-wise transpose, auto the default tile size; sym
+// selects the element-wise symmetry check (full), the tile-pair one (blocked)
+// or the tile-pair one stopping at the first asymmetric pair (early); schedule
+// is the OpenMP schedule of the loops (see parseSchedule); partition shares
+// the rows of the element-wise check among the threads (see validPartition),
+// the tile-pair checks always take blocks of rows dynamically. With a tuning
+// database (see tuning.h; tuning.csv when it exists, unless it is none) the
+// tile, the schedule and, when OMP_NUM_THREADS is not set, the number of
+// threads not given on the command line are the tuned ones of this host. The matrix is read from the input file (see matio.h) or
+// generated from the seed (see loadMatrix). init places the pages of the
+// matrices: serial fills the matrix from one thread and allocates a new
+// transpose in every repetition (timed with it), first-touch fills the matrix
+// in parallel (see firstTouchMatrix) and allocates the transpose once, first
+// touched by an untimed run of the transpose kernel. With perf the hardware
+// counters of every kernel are read, summed over the threads (see perf.h)
+bool parseArgs(int argc, char *argv[], int &n, int &reps, int &warmup, int &tile, std::string &sym,
+               std::string &schedule, std::string &partition, std::string &tuning, std::string &input,
+               long long &seed, std::string &init, bool &perf) {
+    if (argc < 2) {
+        return false;
+    }
+    reps = 1;
+    warmup = 0;
+    tile = -1;
+    sym = "full";
+    schedule = "";
+    partition = "rows";
+    tuning = "";
+    input = "";
+    seed = -1;
+    init = "serial";
+    perf = false;
+    try {
+        n = std::stoi(argv[1]);
+        for (int i = 2; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--reps" && i + 1 < argc) {
+                reps = std::stoi(argv[++i]);
+            } else if (arg == "--warmup" && i + 1 < argc) {
+                warmup = std::stoi(argv[++i]);
+            } else if (arg == "--tile" && i + 1 < argc) {
+                std::string value = argv[++i];
+                tile = (value == "auto") ? defaultTileSize() : std::stoi(value);
+                if (tile < 0) {
+                    return false;
+                }
+            } else if (arg == "--sym" && i + 1 < argc) {
+                sym = argv[++i];
+            } else if (arg == "--schedule" && i + 1 < argc) {
+                schedule = argv[++i];
+            } else if (arg == "--partition" && i + 1 < argc) {
+                partition = argv[++i];
+            } else if (arg == "--tuning" && i + 1 < argc) {
+                tuning = argv[++i];
+            } else if (arg == "--input" && i + 1 < argc) {
+                input = argv[++i];
+            } else if (arg == "--seed" && i + 1 < argc) {
+                seed = std::stoll(argv[++i]);
+                if (seed < 0) {
+                    return false;
+                }
+            } else if (arg == "--init" && i + 1 < argc) {
+                init = argv[++i];
+            } else if (arg == "--perf") {
+                perf = true;
+            } else {
+                return false;
+            }
+        }
+    } catch (const std::exception &) {
+        return false;
+    }
+    bool validSym = (sym == "full" || sym == "blocked" || sym == "early");
+    omp_sched_t kind;
+    int chunk;
+    bool validSchedule = schedule.empty() || parseSchedule(schedule, kind, chunk);
+    bool validPartitionSym = validPartition(partition) && (partition == "rows" || sym == "full");
+    bool validInit = (init == "serial" || init == "first-touch");
+    return n > 0 && reps > 0 && warmup >= 0 && validSym && validSchedule && validPartitionSym && validInit;
 }
 
 int main(int argc, char *argv[]){
     
-    if (argc != 2) {
-        std::cerr << "Usage: " << argv[0] << " <matrix_size>" << std::endl;
+    int n, reps, warmup, tile;
+    std::string sym, schedule, partition, tuning, input, init;
+    long long seed;
+    bool perf;
+    if (!parseArgs(argc, argv, n, reps, warmup, tile, sym, schedule, partition, tuning, input, seed, init, perf)) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size> [--reps N] [--warmup W] [--tile T|auto] [--sym full|blocked|early]"
+                  << " [--schedule KIND[:CHUNK]] [--partition rows|triangular|paired] [--tuning FILE|none] [--input FILE]"
+                  << " [--seed S] [--init serial|first-touch] [--perf]" << std::endl;
         return 1;
     }
 
-    int n = std::stoi(argv[1]);
+    // Fill in the options not given with the tuned ones of this host; only a
+    // database given on the command line must have entries for it
+    bool givenTuning = !tuning.empty() && tuning != "none";
+    tuning = tuningPath(tuning);
+    if (!tuning.empty()) {
+        TuningEntry entry;
+        bool fixedThreads = std::getenv("OMP_NUM_THREADS") != nullptr;
+        try {
+            std::vector<TuningEntry> entries = readTuning(tuning, hostName());
+            if (findTuning(entries, n, fixedThreads ? omp_get_max_threads() : 0, entry)) {
+                tile = (tile < 0) ? entry.tile : tile;
+                schedule = schedule.empty() ? entry.schedule : schedule;
+                if (!fixedThreads) {
+                    omp_set_num_threads(entry.threads);
+                }
+            } else if (givenTuning) {
+                std::cerr << "Warning: " << tuning << " has no entries for host " << hostName() << std::endl;
+            }
+        } catch (const std::exception &e) {
+            std::cerr << "Error: " << e.what() << std::endl;
+            return 1;
+        }
+    }
+    tile = (tile < 0) ? defaultTileSize() : tile;
+    schedule = schedule.empty() ? "static" : schedule;
+    omp_sched_t kind;
+    int chunk;
+    if (!parseSchedule(schedule, kind, chunk)) {
+        std::cerr << "Error: bad schedule '" << schedule << "'" << std::endl;
+        return 1;
+    }
+    omp_set_schedule(kind, chunk);
 
-    // Initialize the matrix
-    auto matrix = initializeMatrix(n);
+    // The tile-pair symmetry check uses the transpose tile (the default one
+    // when the transpose is element-wise)
+    int symTile = (tile > 0) ? tile : defaultTileSize();
+    bool earlyExit = (sym == "early");
+    if (earlyExit && !omp_get_cancellation()) {
+        std::cerr << "Warning: OMP_CANCELLATION is not true, the threads will not stop at the first asymmetric pair" << std::endl;
+    }
 
-    // Measure symmetry check time
-    auto start = std::chrono::high_resolution_clock::now();
-    bool isSymmetric = checkSymOMP(matrix);
-    auto end = std::chrono::high_resolution_clock::now();
+    // Initialize the matrix once, every repetition works on the same data
+    bool firstTouch = (init == "first-touch");
+    Matrix matrix;
+    try {
+        matrix = firstTouch ? firstTouchMatrix(n, input, seed) : loadMatrix(n, input, seed);
+    } catch (const std::exception &e) {
+        std::cerr << "Error: " << e.what() << std::endl;
+        return 1;
+    }
+
+    // With first-touch every repetition writes into the same transpose, its
+    // pages placed by the threads that write them in the kernel
+    Matrix transpose;
+    if (firstTouch) {
+        transpose = Matrix(n);
+        transposeOMP(matrix, transpose, tile);
+    }
+
+    // Hardware counters of the kernels, one per thread, NaN without --perf
+    std::vector<PerfCounters> counters(omp_get_max_threads());
+    if (perf) {
+        perfWarning(openTeamCounters(counters));
+    }
+    double checkSymCounts[PERF_EVENTS], transposeCounts[PERF_EVENTS];
+    std::vector<double> checkSymWork;
+    missingCounts(checkSymCounts);
+    missingCounts(transposeCounts);
 
-    std::chrono::duration<double> checkSymDur = end - start; 
-    std::cout << checkSymDur.count() << ", ";
+    // The first warmup repetitions are run but not printed
+    for (int r = 0; r < warmup + reps; ++r) {
+        // Measure symmetry check time (and counters)
+        for (PerfCounters &c : counters) {
+            c.start();
+        }
+        auto start = std::chrono::high_resolution_clock::now();
+        bool isSymmetric = (sym == "full") ? checkSymOMP(matrix, partition, checkSymWork)
+                                           : checkSymBlockedOMP(matrix, symTile, earlyExit, checkSymWork);
+        auto end = std::chrono::high_resolution_clock::now();
+        for (PerfCounters &c : counters) {
+            c.stop();
+        }
+        std::chrono::duration<double> checkSymDur = end - start;
+        if (perf) {
+            readTeamCounters(counters, checkSymCounts);
+        }
 
-    // Measure transpose time
-    start = std::chrono::high_resolution_clock::now();
-    auto transpose = matTransposeOMP(matrix);
-    end = std::chrono::high_resolution_clock::now();
+        // Measure transpose time (and counters)
+        for (PerfCounters &c : counters) {
+            c.start();
+        }
+        Matrix fresh;
+        start = std::chrono::high_resolution_clock::now();
+        if (!firstTouch) {
+            fresh = Matrix(n);
+        }
+        transposeOMP(matrix, firstTouch ? transpose : fresh, tile);
+        end = std::chrono::high_resolution_clock::now();
+        for (PerfCounters &c : counters) {
+            c.stop();
+        }
+        std::chrono::duration<double> matTransposeDur = end - start;
+        if (perf) {
+            readTeamCounters(counters, transposeCounts);
+        }
 
-    std::chrono::duration<double> matTransposeDur = end - start; 
-    std::cout << matTransposeDur.count() << std::endl;
+        // One CSV line per repetition: checksym_time,transpose_time,tile,sym,schedule,partition,init,
+        // the time of the threads in checkSym (checksym_work_min,checksym_work_mean,checksym_work_max),
+        // then the counters of checkSym and of matTranspose (see PERF_EVENT_NAMES)
+        if (r >= warmup) {
+            std::cout << checkSymDur.count() << ", " << matTransposeDur.count() << ", " << tile << ", " << sym << ", "
+                      << schedule << ", " << partition << ", " << init << workColumns(checkSymWork)
+                      << perfColumns(checkSymCounts, ", ") << perfColumns(transposeCounts, ", ") << std::endl;
+        }
+    }
 
     return 0;
 }
\ No newline at end of file
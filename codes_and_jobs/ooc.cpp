@@ -0,0 +1,261 @@
+#include <iostream>
+#include <algorithm>
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <cstdio>
+#include <random>
+#include <stdexcept>
+#include <string>
+#include <vector>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include "matrix.h"
+
+// Out-of-core implementation: the matrix and its transpose are raw row-major
+// float files mapped in memory, so n can be larger than the RAM of the node
+// and the kernel pages the data in and out as it goes. Both kernels walk the
+// matrix in blocks of block x block elements (the unit of I/O: a block row of
+// 1024 floats is one 4 KiB page) and every block in cache tiles, like the
+// blocked kernels of seq.cpp. Indices are std::size_t, since n * n can exceed
+// the range of int.
+
+// Default block size of the out-of-core kernels
+const std::size_t DEFAULT_BLOCK = 1024;
+
+// Shared mapping of a whole file, read-only or read-write (the file is created
+// or resized to bytes when writable)
+class MappedFile {
+public:
+    MappedFile(const std::string &path, std::size_t bytes, bool writable) : fd_(-1), addr_(nullptr), bytes_(bytes) {
+        fd_ = open(path.c_str(), writable ? (O_RDWR | O_CREAT) : O_RDONLY, 0644);
+        if (fd_ < 0) {
+            throw std::runtime_error("cannot open " + path);
+        }
+        if (writable && ftruncate(fd_, off_t(bytes)) != 0) {
+            close(fd_);
+            throw std::runtime_error("cannot resize " + path);
+        }
+        int prot = writable ? (PROT_READ | PROT_WRITE) : PROT_READ;
+        addr_ = mmap(nullptr, bytes, prot, MAP_SHARED, fd_, 0);
+        if (addr_ == MAP_FAILED) {
+            close(fd_);
+            throw std::runtime_error("cannot map " + path);
+        }
+    }
+
+    ~MappedFile() {
+        munmap(addr_, bytes_);
+        close(fd_);
+    }
+
+    MappedFile(const MappedFile &) = delete;
+    MappedFile &operator=(const MappedFile &) = delete;
+
+    float *data() { return static_cast<float *>(addr_); }
+    const float *data() const { return static_cast<const float *>(addr_); }
+
+    // Writes the dirty pages back to the file and waits for them
+    void sync() {
+        if (msync(addr_, bytes_, MS_SYNC) != 0) {
+            throw std::runtime_error("msync failed");
+        }
+    }
+
+private:
+    int fd_;
+    void *addr_;
+    std::size_t bytes_;
+};
+
+// Function to write a random n x n matrix to a raw file, one row at a time,
+// with the values of initializeMatrix (of the seeded matrix when seed is not
+// negative); an existing file of the right size is reused, so the (slow)
+// generation is paid once per size
+void createMatrixFile(const std::string &path, std::size_t n, long long seed) {
+    struct stat st;
+    if (stat(path.c_str(), &st) == 0 && std::size_t(st.st_size) == n * n * sizeof(float)) {
+        return;
+    }
+
+    FILE *file = std::fopen(path.c_str(), "wb");
+    if (file == nullptr) {
+        throw std::runtime_error("cannot create " + path);
+    }
+    std::random_device rd;
+    std::mt19937 gen(rd());
+    std::uniform_real_distribution<float> dist(0.0, 100.0);
+    std::vector<float> row(n);
+    for (std::size_t i = 0; i < n; ++i) {
+        for (std::size_t j = 0; j < n; ++j) {
+            row[j] = (seed >= 0) ? seededValue(std::uint64_t(seed), i * n + j) : dist(gen);
+        }
+        if (std::fwrite(row.data(), sizeof(float), n, file) != n) {
+            std::fclose(file);
+            throw std::runtime_error("cannot write " + path);
+        }
+    }
+    std::fclose(file);
+}
+
+// Function to check if the mapped matrix is symmetric: every block of the
+// upper triangle is compared with its mirror block, one tile pair at a time
+bool checkSymOutOfCore(const float *matrix, std::size_t n, std::size_t block, std::size_t tile) {
+    bool isSymmetric = true;
+    for (std::size_t ib = 0; ib < n; ib += block) {
+        std::size_t ibEnd = std::min(ib + block, n);
+        for (std::size_t jb = ib; jb < n; jb += block) {
+            std::size_t jbEnd = std::min(jb + block, n);
+            for (std::size_t ii = ib; ii < ibEnd; ii += tile) {
+                std::size_t iEnd = std::min(ii + tile, ibEnd);
+                for (std::size_t jj = jb; jj < jbEnd; jj += tile) {
+                    std::size_t jEnd = std::min(jj + tile, jbEnd);
+                    for (std::size_t i = ii; i < iEnd; ++i) {
+                        for (std::size_t j = std::max(jj, i + 1); j < jEnd; ++j) {
+                            if (matrix[i * n + j] != matrix[j * n + i]) {
+                                isSymmetric = false;
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+    return isSymmetric;
+}
+
+// Function to transpose the mapped matrix into the mapped destination, block
+// by block and tile by tile
+void matTransposeOutOfCore(const float *matrix, float *transpose, std::size_t n, std::size_t block, std::size_t tile) {
+    for (std::size_t ib = 0; ib < n; ib += block) {
+        std::size_t ibEnd = std::min(ib + block, n);
+        for (std::size_t jb = 0; jb < n; jb += block) {
+            std::size_t jbEnd = std::min(jb + block, n);
+            for (std::size_t ii = ib; ii < ibEnd; ii += tile) {
+                std::size_t iEnd = std::min(ii + tile, ibEnd);
+                for (std::size_t jj = jb; jj < jbEnd; jj += tile) {
+                    std::size_t jEnd = std::min(jj + tile, jbEnd);
+                    for (std::size_t i = ii; i < iEnd; ++i) {
+                        const float *src = matrix + i * n;
+                        for (std::size_t j = jj; j < jEnd; ++j) {
+                            transpose[j * n + i] = src[j];
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+// Function to parse the command line:
+//   <matrix_size> [--reps N] [--warmup W] [--tile B|auto] [--dir D] [--keep] [--seed S]
+// tile is the block size of the out-of-core kernels (auto = 1024), dir the
+// folder of the matrix and transpose files, which are deleted at the end
+// unless --keep is given; with a seed the matrix is the seeded one of matrix.h
+bool parseArgs(int argc, char *argv[], std::size_t &n, int &reps, int &warmup, std::size_t &block,
+               std::string &dir, bool &keep, long long &seed) {
+    if (argc < 2) {
+        return false;
+    }
+    reps = 1;
+    warmup = 0;
+    block = DEFAULT_BLOCK;
+    dir = ".";
+    keep = false;
+    seed = -1;
+    long long size;
+    long long value = (long long)DEFAULT_BLOCK;
+    try {
+        size = std::stoll(argv[1]);
+        for (int i = 2; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--reps" && i + 1 < argc) {
+                reps = std::stoi(argv[++i]);
+            } else if (arg == "--warmup" && i + 1 < argc) {
+                warmup = std::stoi(argv[++i]);
+            } else if (arg == "--tile" && i + 1 < argc) {
+                std::string text = argv[++i];
+                value = (text == "auto") ? (long long)DEFAULT_BLOCK : std::stoll(text);
+            } else if (arg == "--dir" && i + 1 < argc) {
+                dir = argv[++i];
+            } else if (arg == "--keep") {
+                keep = true;
+            } else if (arg == "--seed" && i + 1 < argc) {
+                seed = std::stoll(argv[++i]);
+                if (seed < 0) {
+                    return false;
+                }
+            } else {
+                return false;
+            }
+        }
+    } catch (const std::exception &) {
+        return false;
+    }
+    if (size <= 0 || value <= 0) {
+        return false;
+    }
+    n = std::size_t(size);
+    block = std::size_t(value);
+    return reps > 0 && warmup >= 0;
+}
+
+int main(int argc, char *argv[]){
+
+    std::size_t n, block;
+    int reps, warmup;
+    std::string dir;
+    bool keep;
+    long long seed;
+    if (!parseArgs(argc, argv, n, reps, warmup, block, dir, keep, seed)) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size> [--reps N] [--warmup W] [--tile B|auto] [--dir D] [--keep]"
+                  << " [--seed S]" << std::endl;
+        return 1;
+    }
+
+    std::string matrixPath = dir + "/ooc_matrix_" + std::to_string(n) + (seed >= 0 ? "_seed" + std::to_string(seed) : "") + ".bin";
+    std::string transposePath = dir + "/ooc_transpose_" + std::to_string(n) + ".bin";
+    std::size_t bytes = n * n * sizeof(float);
+    std::size_t tile = std::min(block, std::size_t(defaultTileSize()));
+
+    try {
+        createMatrixFile(matrixPath, n, seed);
+        {
+            MappedFile matrix(matrixPath, bytes, false);
+            MappedFile transpose(transposePath, bytes, true);
+
+            // The first warmup repetitions are run but not printed
+            for (int r = 0; r < warmup + reps; ++r) {
+                // Measure symmetry check time
+                auto start = std::chrono::high_resolution_clock::now();
+                bool isSymmetric = checkSymOutOfCore(matrix.data(), n, block, tile);
+                auto end = std::chrono::high_resolution_clock::now();
+                std::chrono::duration<double> checkSymDur = end - start;
+
+                // Measure transpose time, until the result is written to the file
+                start = std::chrono::high_resolution_clock::now();
+                matTransposeOutOfCore(matrix.data(), transpose.data(), n, block, tile);
+                transpose.sync();
+                end = std::chrono::high_resolution_clock::now();
+                std::chrono::duration<double> matTransposeDur = end - start;
+
+                // One CSV line per repetition: checksym_time,transpose_time,tile
+                if (r >= warmup) {
+                    std::cout << checkSymDur.count() << "," << matTransposeDur.count() << "," << block << std::endl;
+                }
+            }
+        }
+    } catch (const std::exception &e) {
+        std::cerr << "Error: " << e.what() << std::endl;
+        return 1;
+    }
+
+    if (!keep) {
+        std::remove(matrixPath.c_str());
+        std::remove(transposePath.c_str());
+    }
+    return 0;
+}
@@ -0,0 +1,176 @@
+#ifndef PERF_H
+#define PERF_H
+
+#include <cmath>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <limits>
+#include <sstream>
+#include <string>
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+// Hardware events counted by --perf, in the order of their CSV columns
+// (<kernel>_<event>): core cycles, retired instructions, L1 data cache read
+// misses, last level cache misses and data TLB read misses
+const int PERF_EVENTS = 5;
+const char *const PERF_EVENT_NAMES[PERF_EVENTS] = {"cycles", "instructions", "l1d_misses", "llc_misses", "dtlb_misses"};
+
+// Counters of the events of one thread, read with perf_event_open (Linux
+// only). Only user space is counted, so the counters also work with the
+// default perf_event_paranoid; the events that cannot be opened (no PMU in a
+// virtual machine, perf_event_paranoid > 2, another OS) read as NaN
+class PerfCounters {
+public:
+    PerfCounters() {
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            fds[e] = -1;
+        }
+    }
+
+    ~PerfCounters() {
+        close();
+    }
+
+    PerfCounters(const PerfCounters &) = delete;
+    PerfCounters &operator=(const PerfCounters &) = delete;
+
+    // Function to open the counters of the calling thread (disabled until
+    // start); returns the number of events that could be opened
+    int open() {
+        close();
+        int opened = 0;
+#ifdef __linux__
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            perf_event_attr attr;
+            std::memset(&attr, 0, sizeof(attr));
+            attr.size = sizeof(attr);
+            eventType(e, attr);
+            attr.disabled = 1;
+            attr.exclude_kernel = 1;
+            attr.exclude_hv = 1;
+            // With more events than hardware counters the kernel multiplexes
+            // them, and the counts are scaled by the time each one was counted
+            attr.read_format = PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+            fds[e] = int(syscall(__NR_perf_event_open, &attr, 0, -1, -1, 0));
+            if (fds[e] >= 0) {
+                ++opened;
+            }
+        }
+#endif
+        return opened;
+    }
+
+    // Function to reset and enable the counters
+    void start() {
+#ifdef __linux__
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            if (fds[e] >= 0) {
+                ioctl(fds[e], PERF_EVENT_IOC_RESET, 0);
+                ioctl(fds[e], PERF_EVENT_IOC_ENABLE, 0);
+            }
+        }
+#endif
+    }
+
+    // Function to disable the counters
+    void stop() {
+#ifdef __linux__
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            if (fds[e] >= 0) {
+                ioctl(fds[e], PERF_EVENT_IOC_DISABLE, 0);
+            }
+        }
+#endif
+    }
+
+    // Function to add the counts since start to values (PERF_EVENTS values);
+    // the events that are not counted add NaN
+    void read(double *values) const {
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            double count = std::numeric_limits<double>::quiet_NaN();
+#ifdef __linux__
+            std::uint64_t data[3];
+            if (fds[e] >= 0 && ::read(fds[e], data, sizeof(data)) == ssize_t(sizeof(data)) && data[2] > 0) {
+                count = double(data[0]) * (double(data[1]) / double(data[2]));
+            }
+#endif
+            values[e] += count;
+        }
+    }
+
+private:
+    int fds[PERF_EVENTS];
+
+    void close() {
+#ifdef __linux__
+        for (int e = 0; e < PERF_EVENTS; ++e) {
+            if (fds[e] >= 0) {
+                ::close(fds[e]);
+            }
+            fds[e] = -1;
+        }
+#endif
+    }
+
+#ifdef __linux__
+    // Function to set the perf type and config of an event
+    static void eventType(int e, perf_event_attr &attr) {
+        const std::uint64_t readMiss = (PERF_COUNT_HW_CACHE_OP_READ << 8) | (PERF_COUNT_HW_CACHE_RESULT_MISS << 16);
+        switch (e) {
+        case 0: attr.type = PERF_TYPE_HARDWARE; attr.config = PERF_COUNT_HW_CPU_CYCLES; break;
+        case 1: attr.type = PERF_TYPE_HARDWARE; attr.config = PERF_COUNT_HW_INSTRUCTIONS; break;
+        case 2: attr.type = PERF_TYPE_HW_CACHE; attr.config = PERF_COUNT_HW_CACHE_L1D | readMiss; break;
+        case 3: attr.type = PERF_TYPE_HARDWARE; attr.config = PERF_COUNT_HW_CACHE_MISSES; break;
+        default: attr.type = PERF_TYPE_HW_CACHE; attr.config = PERF_COUNT_HW_CACHE_DTLB | readMiss; break;
+        }
+    }
+#endif
+};
+
+// Function to set the counts of every event to 0
+inline void clearCounts(double *values) {
+    for (int e = 0; e < PERF_EVENTS; ++e) {
+        values[e] = 0.0;
+    }
+}
+
+// Function to set the counts of every event to NaN (not measured)
+inline void missingCounts(double *values) {
+    for (int e = 0; e < PERF_EVENTS; ++e) {
+        values[e] = std::numeric_limits<double>::quiet_NaN();
+    }
+}
+
+// Function to format the counts as the CSV columns of a kernel: ",c1,c2,..."
+// with the integer counts, or nan
+inline std::string perfColumns(const double *values, const std::string &separator = ",") {
+    std::ostringstream out;
+    for (int e = 0; e < PERF_EVENTS; ++e) {
+        out << separator;
+        if (std::isnan(values[e])) {
+            out << "nan";
+        } else {
+            out << (long long)std::llround(values[e]);
+        }
+    }
+    return out.str();
+}
+
+// Function to warn once, on stderr, when some of the events cannot be counted
+inline void perfWarning(int opened) {
+    if (opened < PERF_EVENTS) {
+        std::ostringstream out;
+        out << "Warning: only " << opened << " of " << PERF_EVENTS << " hardware counters are available"
+            << " (check /proc/sys/kernel/perf_event_paranoid), the others are written as nan\n";
+        std::fputs(out.str().c_str(), stderr);
+    }
+}
+
+#endif
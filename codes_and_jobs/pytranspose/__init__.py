@@ -0,0 +1,20 @@
+"""
+Python side of the matrix transposition project.
+
+The modules mirror the C++ implementations in codes_and_jobs/, so matrices
+can be created, exchanged and checked from Python without copies.
+"""
+from .kernels import SYM_MODES, check_sym, mat_transpose
+from .matrix import (ALIGNMENT, DTYPE, as_matrix, default_tile_size, empty, fill_seeded, from_buffer, initialize,
+                     is_aligned, seeded_values)
+
+# The functions of matio are imported on first use, so that running its
+# command line (python3 -m pytranspose.matio) does not import it twice
+_MATIO = ("checksum", "create", "load", "read_header", "save")
+
+
+def __getattr__(name):
+    if name in _MATIO:
+        from . import matio
+        return getattr(matio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,66 @@
+"""
+NumPy counterpart of the kernels of seq.cpp.
+
+Every function works on whole rows or tiles at a time, so the loops run in
+NumPy and not in the interpreter: the element-wise versions compare or copy
+the matrix against its transposed view, the blocked ones do the same one
+tile x tile block at a time, like checkSymBlocked and matTransposeBlocked.
+"""
+import numpy as np
+
+from .matrix import as_matrix, default_tile_size, empty
+
+# Variants of the symmetry check, as the --sym option of the binaries
+SYM_MODES = ("full", "blocked", "early")
+
+
+def check_sym(matrix, sym="full", tile=None):
+    """
+    Returns True if the matrix is symmetric. sym selects the comparison of
+    the whole matrix with its transposed view (full), the comparison of every
+    block of tile rows of the upper triangle with the matching columns
+    (blocked) or the blocked one stopping at the first asymmetric block
+    (early). tile None is the default tile size.
+    """
+    if sym not in SYM_MODES:
+        raise ValueError(f"unknown symmetry check '{sym}', expected one of {', '.join(SYM_MODES)}")
+    matrix = np.asarray(matrix)
+    n = matrix.shape[0]
+    if matrix.shape != (n, n):
+        raise ValueError(f"expected a square matrix, got shape {matrix.shape}")
+
+    if sym == "full":
+        return bool(np.array_equal(matrix, matrix.T))
+
+    tile = default_tile_size() if tile is None or tile <= 0 else tile
+    is_symmetric = True
+    for ii in range(0, n, tile):
+        i_end = min(ii + tile, n)
+        # rows [ii, i_end) from the diagonal on, against the same columns
+        if not np.array_equal(matrix[ii:i_end, ii:], matrix[ii:, ii:i_end].T):
+            is_symmetric = False
+            if sym == "early":
+                break
+    return is_symmetric
+
+
+def mat_transpose(matrix, tile=None):
+    """
+    Returns the transpose of the matrix in a new aligned, C-contiguous
+    matrix. tile 0 copies the whole transposed view at once, any other tile
+    size copies it one tile x tile block at a time (None is the default tile
+    size).
+    """
+    matrix = as_matrix(matrix)
+    rows, cols = matrix.shape
+    transpose = empty(cols, rows)
+
+    tile = default_tile_size() if tile is None else tile
+    if tile <= 0:
+        np.copyto(transpose, matrix.T)
+        return transpose
+
+    for ii in range(0, rows, tile):
+        for jj in range(0, cols, tile):
+            transpose[jj:jj + tile, ii:ii + tile] = matrix[ii:ii + tile, jj:jj + tile].T
+    return transpose
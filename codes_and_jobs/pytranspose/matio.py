@@ -0,0 +1,165 @@
+"""
+Python side of the binary matrix format of matio.h.
+
+A matrix file is a 64-byte header (magic, version, dtype, rows, cols, layout,
+payload offset, checksum) followed by the float32 elements in row-major
+order. load() maps the payload with np.memmap, so even a matrix larger than
+the memory is opened without reading or copying it, and the array is aligned
+like the buffers of the C++ Matrix class.
+
+Usage:
+    python3 -m pytranspose.matio create <n> <file> [--seed S]
+    python3 -m pytranspose.matio info <file> [--verify]
+"""
+import argparse
+import os
+
+import numpy as np
+
+from .matrix import DTYPE, empty, fill_seeded
+
+MAGIC = b"PARCOMAT"
+VERSION = 1
+DTYPE_FLOAT32 = 1
+LAYOUT_ROW_MAJOR = 0
+
+# Same layout as MatrixFileHeader in matio.h (little-endian, 64 bytes)
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("dtype", "<u4"),
+    ("rows", "<u8"),
+    ("cols", "<u8"),
+    ("layout", "<u4"),
+    ("offset", "<u4"),
+    ("checksum", "<u8"),
+    ("reserved", "V16"),
+])
+
+# Elements processed at a time by checksum() and create()
+_CHUNK = 1 << 22
+
+
+def checksum(matrix, first=0):
+    """
+    Returns the checksum of the elements (matrixChecksum in matio.h): the sum
+    of (index + 1) * bits of every element modulo 2^64, where the first
+    element has index first.
+    """
+    words = np.ascontiguousarray(matrix, dtype=DTYPE).reshape(-1).view(np.uint32)
+    total = 0
+    for start in range(0, words.size, _CHUNK):
+        chunk = words[start:start + _CHUNK].astype(np.uint64)
+        index = np.arange(first + start + 1, first + start + 1 + chunk.size, dtype=np.uint64)
+        total = (total + int(np.sum(chunk * index, dtype=np.uint64))) % (1 << 64)
+    return total
+
+
+def _header(rows, cols, digest):
+    header = np.zeros((), dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["dtype"] = DTYPE_FLOAT32
+    header["rows"] = rows
+    header["cols"] = cols
+    header["layout"] = LAYOUT_ROW_MAJOR
+    header["offset"] = HEADER.itemsize
+    header["checksum"] = digest
+    return header.tobytes()
+
+
+def read_header(path):
+    """
+    Returns the header of a matrix file as a dict, raising ValueError when
+    the file is not a matrix file of a supported version, dtype and layout.
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER.itemsize)
+    if len(raw) != HEADER.itemsize:
+        raise ValueError(f"{path} is not a matrix file")
+    header = np.frombuffer(raw, dtype=HEADER)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError(f"{path} is not a matrix file")
+    if (header["version"] != VERSION or header["dtype"] != DTYPE_FLOAT32
+            or header["layout"] != LAYOUT_ROW_MAJOR or header["offset"] < HEADER.itemsize):
+        raise ValueError(f"{path}: unsupported version, dtype or layout")
+    return {name: int(header[name]) for name in ("rows", "cols", "offset", "checksum")}
+
+
+def load(path, mode="r", verify=False):
+    """
+    Returns the matrix of a file as a rows x cols np.memmap, without reading
+    it (mode "r" read-only, "r+" writable, "c" copy-on-write). With verify the
+    whole payload is read once to check its checksum.
+    """
+    header = read_header(path)
+    shape = (header["rows"], header["cols"])
+    expected = header["offset"] + shape[0] * shape[1] * np.dtype(DTYPE).itemsize
+    if os.path.getsize(path) < expected:
+        raise ValueError(f"{path} is truncated")
+    matrix = np.memmap(path, dtype=DTYPE, mode=mode, offset=header["offset"], shape=shape)
+    if verify and checksum(matrix) != header["checksum"]:
+        raise ValueError(f"{path}: wrong checksum")
+    return matrix
+
+
+def save(path, matrix):
+    """
+    Writes a 2-D array to a matrix file (as float32).
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=DTYPE)
+    if matrix.ndim != 2:
+        raise ValueError(f"expected a 2-D array, got {matrix.ndim} dimensions")
+    with open(path, "wb") as f:
+        f.write(_header(matrix.shape[0], matrix.shape[1], checksum(matrix)))
+        matrix.tofile(f)
+
+
+def create(path, n, seed):
+    """
+    Writes the seeded random n x n matrix (initialize(n, seed), the --seed
+    option of the binaries) to a matrix file, a few rows at a time, so that
+    the matrix never has to fit in memory.
+    """
+    rows = max(1, _CHUNK // n)
+    block = empty(rows, n)
+    digest = 0
+    with open(path, "wb") as f:
+        f.write(_header(n, n, 0))
+        for i in range(0, n, rows):
+            count = min(rows, n - i)
+            fill_seeded(block[:count], i, seed)
+            digest = (digest + checksum(block[:count], first=i * n)) % (1 << 64)
+            block[:count].tofile(f)
+        f.seek(0)
+        f.write(_header(n, n, digest))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m pytranspose.matio", description="Create or inspect matrix files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create_parser = commands.add_parser("create", help="write the seeded random n x n matrix")
+    create_parser.add_argument("n", type=int)
+    create_parser.add_argument("path")
+    create_parser.add_argument("--seed", type=int, default=0)
+    info_parser = commands.add_parser("info", help="print the header of a matrix file")
+    info_parser.add_argument("path")
+    info_parser.add_argument("--verify", action="store_true", help="also check the checksum")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        if args.n < 1 or args.seed < 0:
+            parser.error("n must be positive and --seed not negative")
+        create(args.path, args.n, args.seed)
+    else:
+        try:
+            header = read_header(args.path)
+            if args.verify:
+                load(args.path, verify=True)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"{e}\n")
+        print(f"{header['rows']} x {header['cols']} float32, checksum {header['checksum']:#018x}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+NumPy counterpart of matrix.h.
+
+A matrix is a float32 array over one contiguous, 64-byte aligned, row-major
+buffer, exactly the layout of the C++ Matrix class: element (i, j) is at
+offset i * cols + j. Such arrays can be passed to MPI or written to a file
+without packing, and any buffer in that layout can be viewed without copies.
+"""
+import os
+
+import numpy as np
+
+# Same alignment and element type as matrix.h
+ALIGNMENT = 64
+DTYPE = np.float32
+
+
+def is_aligned(array, alignment=ALIGNMENT):
+    """
+    Returns True if the array starts on an alignment boundary.
+    """
+    return array.ctypes.data % alignment == 0
+
+
+def empty(rows, cols=None):
+    """
+    Returns an uninitialized rows x cols matrix (square if cols is None) with
+    an aligned, C-contiguous buffer.
+    """
+    cols = rows if cols is None else cols
+    nbytes = rows * cols * np.dtype(DTYPE).itemsize
+    raw = np.empty(nbytes + ALIGNMENT, dtype=np.uint8)
+    offset = -raw.ctypes.data % ALIGNMENT
+    return raw[offset:offset + nbytes].view(DTYPE).reshape(rows, cols)
+
+
+def as_matrix(array):
+    """
+    Returns the array in the matrix layout: the array itself when it already
+    is an aligned, C-contiguous float32 2-D array, an aligned copy otherwise.
+    """
+    array = np.asarray(array)
+    if array.ndim != 2:
+        raise ValueError(f"expected a 2-D array, got {array.ndim} dimensions")
+    if array.dtype == DTYPE and array.flags.c_contiguous and is_aligned(array):
+        return array
+    matrix = empty(*array.shape)
+    matrix[...] = array
+    return matrix
+
+
+def from_buffer(buffer, rows, cols=None, offset=0):
+    """
+    Returns a rows x cols matrix viewing the given buffer (bytes, mmap,
+    shared memory, ...) starting at byte offset, without copying it.
+    """
+    cols = rows if cols is None else cols
+    return np.frombuffer(buffer, dtype=DTYPE, count=rows * cols, offset=offset).reshape(rows, cols)
+
+
+def default_tile_size():
+    """
+    Returns the default tile size of the blocked kernels, chosen like
+    defaultTileSize in matrix.h: the largest power of two such that a source
+    and a destination tile fill at most half of the L1 data cache (32 KiB
+    assumed when it cannot be detected).
+    """
+    l1 = 32 * 1024
+    try:
+        detected = os.sysconf("SC_LEVEL1_DCACHE_SIZE")
+        if detected > 0:
+            l1 = detected
+    except (ValueError, OSError, AttributeError):
+        pass
+    tile = 8
+    while 2 * (2 * tile) ** 2 * np.dtype(DTYPE).itemsize <= l1 // 2:
+        tile *= 2
+    return tile
+
+
+def seeded_values(seed, first, count):
+    """
+    Returns the elements first ... first + count - 1 (row-major indices) of
+    the seeded random matrix, as seededValue in matrix.h: a splitmix64 hash
+    of the seed and the index, scaled to [0, 100) with the same float32
+    operations, so C++ and Python produce the same bits.
+    """
+    index = np.arange(first + 1, first + count + 1, dtype=np.uint64)
+    z = np.uint64(seed) + index * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(40)).astype(DTYPE) * DTYPE(1.0 / 16777216.0) * DTYPE(100.0)
+
+
+def fill_seeded(matrix, first_row, seed):
+    """
+    Fills the rows of matrix with the rows first_row ... of the seeded random
+    n x n matrix, n being the number of columns (fillSeeded in matrix.h).
+    """
+    rows, n = matrix.shape
+    # A few rows at a time, to bound the size of the uint64 temporaries
+    step = max(1, (1 << 20) // max(n, 1))
+    for i in range(0, rows, step):
+        count = min(step, rows - i)
+        matrix[i:i + count] = seeded_values(seed, (first_row + i) * n, count * n).reshape(count, n)
+
+
+def initialize(n, seed=None):
+    """
+    Returns a random n x n matrix with values in [0, 100), like
+    initializeMatrix in matrix.h. With the same seed it is the same matrix
+    as initializeMatrix(n, seed) and as the --seed option of the binaries.
+    """
+    if seed is None:
+        seed = int.from_bytes(os.urandom(8), "little")
+    matrix = empty(n)
+    fill_seeded(matrix, 0, seed)
+    return matrix
@@ -0,0 +1,385 @@
+"""
+mpi4py counterpart of the kernels of mpi.cpp, on NumPy buffers.
+
+The functions take the matrix (or the row block of the rank) as a NumPy array
+and a communicator, and exchange the buffers of the matrix layout (see
+matrix.py) with the uppercase methods of mpi4py, so nothing is pickled:
+    - check_sym and mat_transpose mirror checkSymMPI/checkSymBlockedMPI and
+      matTransposeMPI: every rank holds the whole matrix, checks its range of
+      rows and the transposed column blocks are gathered on the root;
+    - check_sym_distributed and mat_transpose_distributed mirror the
+      distributed layout (--mode distributed): every rank holds only its
+      block of rows and the blocks are exchanged with a single Alltoall.
+The module needs mpi4py (it is not imported by the package), and can be run
+under mpiexec with the options and output of the MPI binary:
+    mpiexec -n 4 python3 -m pytranspose.mpi_backend <matrix_size> [--reps N] [--warmup W]
+                 [--sym full|blocked|early] [--mode replicated|distributed]
+                 [--partition rows|triangular|paired] [--input FILE] [--seed S]
+Every repetition prints, on rank 0, one line in the schema of
+mpi_results.csv: checksym_time,transpose_time,io_time,sym,mode,pack,partition,
+the smallest, mean and largest time the ranks spend checking their rows, the
+times of the phases and the hardware counters. The input file is read once,
+before the repetitions, so io_time, the phases and the counters are always
+nan, and the transpose is always packed by NumPy (pack manual).
+"""
+import argparse
+import sys
+
+import numpy as np
+from mpi4py import MPI
+
+from .kernels import SYM_MODES
+from .matio import checksum, load, read_header
+from .matrix import as_matrix, default_tile_size, empty, fill_seeded, initialize
+
+# Data layouts, as the --mode option of the MPI binary
+MPI_MODES = ("replicated", "distributed")
+
+# Partitions of the rows of the full check, as the --partition option of the
+# MPI binary (see row_range)
+PARTITIONS = ("rows", "triangular", "paired")
+
+# Phase (see mpi.cpp) and hardware counter (see perf.h) columns of
+# mpi_results.csv, not measured here
+_PHASE_COLUMNS = 18
+_PERF_COLUMNS = 10
+
+
+def _triangle_boundary(n, k, parts):
+    """
+    Returns the first row of part k of the triangular partition: the first
+    row r such that the rows before it have at least k / parts of the
+    n (n - 1) / 2 pairs of the upper triangle (row i has n - 1 - i pairs).
+    """
+    if k >= parts:
+        return n
+    target = k * n * (n - 1) / (2 * parts)
+    lo, hi = 0, n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mid * (n - 1) - mid * (mid - 1) / 2 >= target:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def row_range(n, rank, size, partition="rows"):
+    """
+    Returns the ranges of rows [start, end) checked by a rank, as
+    checkSymMPI: n / size rows each, the remainder to the last rank (rows), a
+    contiguous range with the same number of pairs of the upper triangle
+    (triangular), or the pairs of rows i and n - 1 - i of an equal range of
+    the pairs (paired), which are two ranges of rows.
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"unknown partition '{partition}', expected one of {', '.join(PARTITIONS)}")
+    if partition == "triangular":
+        return [(_triangle_boundary(n, rank, size), _triangle_boundary(n, rank + 1, size))]
+    if partition == "paired":
+        # The middle row of an odd n has no pair
+        pairs = (n + 1) // 2
+        start, end = rank * pairs // size, (rank + 1) * pairs // size
+        return [(start, end), (max(end, n - end), n - start)]
+    rows = n // size
+    start = rank * rows
+    return [(start, n if rank == size - 1 else start + rows)]
+
+
+def _rows_symmetric(matrix, start, end):
+    """
+    Returns True if the rows [start, end) of the matrix, from the diagonal
+    on, are equal to the matching columns.
+    """
+    return np.array_equal(matrix[start:end, start:], matrix[start:, start:end].T)
+
+
+def check_sym(matrix, comm=MPI.COMM_WORLD, sym="full", tile=None, partition="rows"):
+    """
+    Returns, on every rank, whether the matrix (the whole matrix on every
+    rank) is symmetric and the time this rank spent checking its rows. Every
+    rank checks its range of rows (see row_range; the partitions other than
+    rows only apply to full): at once (full), in blocks of tile rows
+    (blocked) or in blocks of tile rows stopping, on every rank, as soon as
+    one rank has found an asymmetric block (early; the flags of every block
+    are combined with an Iallreduce while the next block is checked, as
+    checkSymBlockedMPI).
+    """
+    if sym not in SYM_MODES:
+        raise ValueError(f"unknown symmetry check '{sym}', expected one of {', '.join(SYM_MODES)}")
+    if sym != "full" and partition != "rows":
+        raise ValueError(f"the {partition} partition only applies to the full symmetry check")
+    n = matrix.shape[0]
+    rank, size = comm.Get_rank(), comm.Get_size()
+    ranges = row_range(n, rank, size, partition)
+    start, end = ranges[0]
+    found = np.zeros(1, dtype=np.intc)
+    found_all = np.zeros(1, dtype=np.intc)
+    work = 0.0
+
+    if sym != "early":
+        begin = MPI.Wtime()
+        for start, end in ranges:
+            tile = end - start if sym == "full" else (default_tile_size() if tile is None or tile <= 0 else tile)
+            for ii in range(start, end, max(tile, 1)):
+                if not _rows_symmetric(matrix, ii, min(ii + tile, end)):
+                    found[0] = 1
+        work = MPI.Wtime() - begin
+        comm.Allreduce(found, found_all, op=MPI.LOR)
+        return found_all[0] == 0, work
+
+    # Every rank takes part in the same number of rounds (the last rank has
+    # the most rows), also when it has no rows left to check
+    tile = default_tile_size() if tile is None or tile <= 0 else tile
+    rounds = -(-(n // size + n % size) // tile)
+    sent = np.zeros(1, dtype=np.intc)
+    request = None
+    for b in range(rounds):
+        ii = start + b * tile
+        if not found[0] and ii < end:
+            begin = MPI.Wtime()
+            if not _rows_symmetric(matrix, ii, min(ii + tile, end)):
+                found[0] = 1
+            work += MPI.Wtime() - begin
+
+        # Flags of the previous round: every rank sees the same value and
+        # leaves the loop at the same round
+        if request is not None:
+            request.Wait()
+            if found_all[0]:
+                return False, work
+        sent[0] = found[0]
+        request = comm.Iallreduce(sent, found_all, op=MPI.LOR)
+    if request is not None:
+        request.Wait()
+    return found_all[0] == 0, work
+
+
+def mat_transpose(matrix, comm=MPI.COMM_WORLD, root=0):
+    """
+    Returns, on the root, the transpose of the matrix (the whole matrix on
+    every rank, n a multiple of the ranks) in a new matrix, None on the other
+    ranks. Every rank copies its column block, transposed, into a contiguous
+    buffer of rows of the result, and the root gathers them already in their
+    final place.
+    """
+    n = matrix.shape[0]
+    rank, size = comm.Get_rank(), comm.Get_size()
+    rows = n // size
+    chunk = empty(rows, n)
+    np.copyto(chunk, matrix[:, rank * rows:(rank + 1) * rows].T)
+
+    transpose = empty(n) if rank == root else None
+    comm.Gather(chunk, [transpose, MPI.FLOAT] if rank == root else None, root=root)
+    return transpose
+
+
+def exchange_blocks(local_rows, comm=MPI.COMM_WORLD, transpose_blocks=False):
+    """
+    Sends block c of the local rows (rpp x n, seen as size blocks of
+    rpp x rpp) to rank c, transposed or not, with a single Alltoall. Returns
+    the received blocks as a (size, rpp, rpp) array: block r comes from rank r.
+    """
+    rpp = local_rows.shape[0]
+    size = comm.Get_size()
+    blocks = local_rows.reshape(rpp, size, rpp)
+    send = empty(size * rpp, rpp).reshape(size, rpp, rpp)
+    recv = empty(size * rpp, rpp).reshape(size, rpp, rpp)
+    np.copyto(send, blocks.transpose(1, 2, 0) if transpose_blocks else blocks.transpose(1, 0, 2))
+    comm.Alltoall(send, recv)
+    return recv
+
+
+def check_sym_distributed(local_rows, comm=MPI.COMM_WORLD):
+    """
+    Returns, on every rank, whether the distributed matrix is symmetric and
+    the time this rank spent comparing its blocks: rank r receives the blocks
+    (c, r) of the other ranks and compares them with its mirror blocks (r, c),
+    as checkSymDistributedMPI.
+    """
+    rpp = local_rows.shape[0]
+    rank, size = comm.Get_rank(), comm.Get_size()
+    blocks = exchange_blocks(local_rows, comm)
+
+    # Blocks below the diagonal are checked by the rank owning their mirror
+    begin = MPI.Wtime()
+    mirrors = local_rows.reshape(rpp, size, rpp)[:, rank:, :].transpose(1, 2, 0)
+    symmetric = np.array([np.array_equal(blocks[rank:], mirrors)], dtype=np.intc)
+    work = MPI.Wtime() - begin
+    symmetric_all = np.zeros(1, dtype=np.intc)
+    comm.Allreduce(symmetric, symmetric_all, op=MPI.LAND)
+    return symmetric_all[0] == 1, work
+
+
+def mat_transpose_distributed(local_rows, comm=MPI.COMM_WORLD):
+    """
+    Returns the rows of the transpose of the distributed matrix held by this
+    rank (the same rows as of the input), as matTransposeDistributedMPI.
+    """
+    rpp, n = local_rows.shape
+    size = comm.Get_size()
+    blocks = exchange_blocks(local_rows, comm, transpose_blocks=True)
+
+    # block r, already transposed by rank r, is the column block r of our rows
+    local_transposed = empty(rpp, n)
+    np.copyto(local_transposed.reshape(rpp, size, rpp), blocks.transpose(1, 0, 2))
+    return local_transposed
+
+
+def _all_ok(comm, ok):
+    """
+    Returns True on every rank if ok is True on every rank.
+    """
+    flag = np.array([int(ok)], dtype=np.intc)
+    flag_all = np.zeros(1, dtype=np.intc)
+    comm.Allreduce(flag, flag_all, op=MPI.LAND)
+    return flag_all[0] == 1
+
+
+def _work_stats(comm, work):
+    """
+    Returns, on rank 0, the smallest, mean and largest work time of the ranks.
+    """
+    times = np.array([work, -work, work])
+    low = np.zeros(2)
+    total = np.zeros(1)
+    comm.Reduce(times[:2], low, op=MPI.MIN, root=0)
+    comm.Reduce(times[2:], total, op=MPI.SUM, root=0)
+    return low[0], total[0] / comm.Get_size(), -low[1]
+
+
+def _load(args, comm):
+    """
+    Returns the matrix of this rank (the whole matrix, or its rows in the
+    distributed layout), read from the input file or generated from the seed
+    as mpi.cpp does, or None on every rank when the input file cannot be read.
+    """
+    n = args.n
+    rank, size = comm.Get_rank(), comm.Get_size()
+    rows = n // size
+    distributed = args.mode == "distributed"
+    error = None
+    matrix = None
+
+    if args.input and distributed:
+        # Every rank copies only its own rows of the mapped file, and the sum
+        # of the checksums of the rows of every rank must be the one of the
+        # header, as in mpi.cpp
+        partial = 0
+        try:
+            header = read_header(args.input)
+            mapped = load(args.input)
+            if mapped.shape != (n, n):
+                raise ValueError(f"{args.input} is not a {n} x {n} matrix")
+            matrix = as_matrix(mapped[rank * rows:(rank + 1) * rows])
+            partial = checksum(matrix, first=rank * rows * n)
+        except (OSError, ValueError) as e:
+            error = e
+        if not _all_ok(comm, error is None):
+            if error is not None:
+                print(f"Error: {error}", file=sys.stderr, flush=True)
+            return None
+        # The sum of the partial checksums wraps modulo 2^64 like checksum
+        total = np.zeros(1, dtype=np.uint64)
+        comm.Allreduce(np.array([partial], dtype=np.uint64), total, op=MPI.SUM)
+        if int(total[0]) != int(header["checksum"]):
+            if rank == 0:
+                print(f"Error: {args.input}: wrong checksum", file=sys.stderr, flush=True)
+            return None
+        return matrix
+
+    if distributed and args.seed is not None:
+        # Every rank generates only its own rows of the seeded matrix
+        matrix = empty(rows, n)
+        fill_seeded(matrix, rank * rows, args.seed)
+        return matrix
+
+    # Initialize (or read) the matrix in rank 0
+    if rank == 0:
+        try:
+            if args.input:
+                full = load(args.input, verify=True)
+                if full.shape != (n, n):
+                    raise ValueError(f"{args.input} is not a {n} x {n} matrix")
+                full = as_matrix(np.array(full))
+            else:
+                full = initialize(n, args.seed)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr, flush=True)
+            full = None
+    else:
+        full = None if distributed else empty(n)
+    ok = np.array([int(rank != 0 or full is not None)], dtype=np.intc)
+    comm.Bcast(ok, root=0)
+    if not ok[0]:
+        return None
+
+    if distributed:
+        # Scatter the row blocks: every rank keeps only n * n / size elements
+        matrix = empty(rows, n)
+        comm.Scatter([full, MPI.FLOAT] if rank == 0 else None, matrix, root=0)
+        return matrix
+    # Broadcast the matrix buffer to all processes
+    comm.Bcast(full, root=0)
+    return full
+
+
+def main(argv=None):
+    comm = MPI.COMM_WORLD
+    rank, size = comm.Get_rank(), comm.Get_size()
+
+    parser = argparse.ArgumentParser(prog="python3 -m pytranspose.mpi_backend",
+                                     description="Time the mpi4py symmetry check and transpose.")
+    parser.add_argument("n", type=int, help="matrix size, a multiple of the processes")
+    parser.add_argument("--reps", type=int, default=1, help="printed repetitions")
+    parser.add_argument("--warmup", type=int, default=0, help="discarded repetitions before them")
+    parser.add_argument("--sym", choices=SYM_MODES, default="full", help="symmetry check variant")
+    parser.add_argument("--mode", choices=MPI_MODES, default="replicated", help="data layout")
+    parser.add_argument("--pack", choices=("manual",), default="manual",
+                        help="packing of the transpose (only manual: the blocks are copied by NumPy)")
+    parser.add_argument("--partition", choices=PARTITIONS, default="rows",
+                        help="partition of the rows of the full symmetry check among the ranks")
+    parser.add_argument("--input", help="matrix file to read (see matio.py) instead of a random matrix")
+    parser.add_argument("--seed", type=int, help="seed of the random matrix (same matrix as the binaries)")
+    args = parser.parse_args(argv)
+    if args.n < 1 or args.reps < 1 or args.warmup < 0 or (args.seed is not None and args.seed < 0):
+        parser.error("n and --reps must be positive, --warmup and --seed not negative")
+    if args.mode == "distributed" and args.sym != "full":
+        parser.error("the distributed layout has only the full symmetry check")
+    if args.partition != "rows" and (args.sym != "full" or args.mode == "distributed"):
+        parser.error("the partitions other than rows only apply to the full check of the replicated layout")
+    if args.n % size != 0:
+        parser.exit(1, "Matrix size must be divisible by the number of processes.\n" if rank == 0 else None)
+
+    matrix = _load(args, comm)
+    if matrix is None:
+        parser.exit(1)
+    distributed = args.mode == "distributed"
+
+    # The first warmup repetitions are run but not printed
+    for r in range(args.warmup + args.reps):
+        # Start every repetition together
+        comm.Barrier()
+
+        start = MPI.Wtime()
+        if distributed:
+            work = check_sym_distributed(matrix, comm)[1]
+        else:
+            work = check_sym(matrix, comm, args.sym, partition=args.partition)[1]
+        check_sym_time = MPI.Wtime() - start
+        work_min, work_mean, work_max = _work_stats(comm, work)
+
+        start = MPI.Wtime()
+        if distributed:
+            mat_transpose_distributed(matrix, comm)
+        else:
+            mat_transpose(matrix, comm)
+        transpose_time = MPI.Wtime() - start
+
+        if rank == 0 and r >= args.warmup:
+            print(f"{check_sym_time},{transpose_time},nan,{args.sym},{args.mode},{args.pack},{args.partition},"
+                  f"{work_min},{work_mean},{work_max}" + ",nan" * (_PHASE_COLUMNS + _PERF_COLUMNS), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Command line benchmark of the NumPy kernels, with the same options and output
+as the sequential binary (seq.cpp):
+    python3 -m pytranspose.seq <matrix_size> [--reps N] [--warmup W] [--tile T|auto] [--sym full|blocked|early]
+                               [--input FILE] [--seed S]
+Every repetition prints one line checksym_time,transpose_time,tile,sym, so
+bench.py writes the rows in the schema of sequential_results.csv.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .kernels import SYM_MODES, check_sym, mat_transpose
+from .matio import load
+from .matrix import as_matrix, default_tile_size, initialize
+
+
+def parse_tile(text):
+    """
+    Parses a tile size, where "auto" is the default tile size.
+    """
+    if text == "auto":
+        return default_tile_size()
+    if not text.isdigit():
+        raise argparse.ArgumentTypeError(f"'{text}' is not a tile size")
+    return int(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m pytranspose.seq",
+                                     description="Time the NumPy symmetry check and transpose.")
+    parser.add_argument("n", type=int, help="matrix size")
+    parser.add_argument("--reps", type=int, default=1, help="printed repetitions")
+    parser.add_argument("--warmup", type=int, default=0, help="discarded repetitions before them")
+    parser.add_argument("--tile", type=parse_tile, default=default_tile_size(),
+                        help="tile size of the blocked transpose, 0 = element-wise (default: auto)")
+    parser.add_argument("--sym", choices=SYM_MODES, default="full", help="symmetry check variant")
+    parser.add_argument("--input", help="matrix file to read (see matio.py) instead of a random matrix")
+    parser.add_argument("--seed", type=int, help="seed of the random matrix (same matrix as the binaries)")
+    args = parser.parse_args(argv)
+    if args.n < 1 or args.reps < 1 or args.warmup < 0 or (args.seed is not None and args.seed < 0):
+        parser.error("n and --reps must be positive, --warmup and --seed not negative")
+
+    # The tile-pair symmetry check uses the transpose tile (the default one
+    # when the transpose is element-wise)
+    sym_tile = args.tile if args.tile > 0 else default_tile_size()
+
+    # Initialize (or read into memory) the matrix once, every repetition works
+    # on the same data
+    if args.input:
+        try:
+            matrix = load(args.input, verify=True)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"Error: {e}\n")
+        if matrix.shape != (args.n, args.n):
+            parser.exit(1, f"Error: {args.input} is not a {args.n} x {args.n} matrix\n")
+        matrix = as_matrix(np.array(matrix))
+    else:
+        matrix = initialize(args.n, args.seed)
+
+    # The first warmup repetitions are run but not printed
+    for r in range(args.warmup + args.reps):
+        start = time.perf_counter()
+        check_sym(matrix, args.sym, sym_tile)
+        check_sym_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mat_transpose(matrix, args.tile)
+        transpose_time = time.perf_counter() - start
+
+        if r >= args.warmup:
+            print(f"{check_sym_time},{transpose_time},{args.tile},{args.sym}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
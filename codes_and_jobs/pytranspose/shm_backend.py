@@ -0,0 +1,312 @@
+"""
+Shared memory counterpart of omp.cpp, on a pool of processes.
+
+The matrix and its transpose live in two blocks of multiprocessing
+shared_memory, in the matrix layout (see matrix.py). The workers of the pool
+attach to both blocks once, when they start, so a task only carries the
+first row of its band: no element of the matrices is ever copied between the
+processes. The symmetry check and the transpose are split in bands of tile
+rows, handed out to the workers like the iterations of the OpenMP loops:
+in one contiguous chunk per worker (static) or a few bands at a time as the
+workers get free (dynamic[:chunk]). Every task measures its own time, so the
+kernels also return the busy time of every worker.
+
+It can be run with the options and output of the OpenMP binary:
+    python3 -m pytranspose.shm_backend <matrix_size> [--workers W] [--reps N] [--warmup W] [--tile T|auto]
+                                       [--sym full|blocked|early] [--schedule static|dynamic[:chunk]]
+                                       [--partition rows] [--init serial] [--input FILE] [--seed S] [--worker-times]
+Every repetition prints one line in the schema of omp_results.csv, with the
+smallest, mean and largest busy time of the workers in the symmetry check as
+the work columns (the bands are always shared as the rows partition, the
+matrix is always filled by the main process, and the hardware counters are
+nan). The number of workers defaults to
+OMP_NUM_THREADS, as the threads of omp.cpp, so bench.py times it as the shm
+backend with n_threads = number of workers.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from multiprocessing import Barrier, Pool, shared_memory
+
+import numpy as np
+
+from .kernels import SYM_MODES
+from .matio import load
+from .matrix import DTYPE, default_tile_size, fill_seeded, from_buffer
+
+# Schedules of the bands, as the --schedule option of the OpenMP binary
+SCHEDULE_KINDS = ("static", "dynamic")
+
+# Hardware counter columns of omp_results.csv (see perf.h), not measured here
+_PERF_COLUMNS = 10
+
+# Shared blocks attached by every worker of the pool (see _attach)
+_worker = {}
+
+
+def parse_schedule(text):
+    """
+    Returns the (kind, chunk) of a schedule written as kind[:chunk]; chunk 0
+    is the default one of the kind.
+    """
+    kind, _, chunk = text.partition(":")
+    if kind not in SCHEDULE_KINDS or (chunk and not chunk.isdigit()):
+        raise ValueError(f"'{text}' is not a schedule (kind[:chunk], kind among {', '.join(SCHEDULE_KINDS)})")
+    return kind, int(chunk or 0)
+
+
+def _attach(names, n, barrier):
+    """
+    Initializer of the workers: attaches to the shared blocks of the source,
+    the transpose and the early exit flag, and keeps the barrier of the
+    static schedule (see _run_block).
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker["barrier"] = barrier
+    _worker["blocks"] = blocks
+    _worker["source"] = from_buffer(blocks[0].buf, n)
+    _worker["target"] = from_buffer(blocks[1].buf, n)
+    _worker["flag"] = np.frombuffer(blocks[2].buf, dtype=np.uint8, count=1)
+
+
+def _check_band(task):
+    """
+    Checks the band of rows [ii, ii + band), from the diagonal on, against the
+    matching columns. Returns the pid of the worker, whether the band is
+    symmetric and the time taken. With early the band is skipped once another
+    one has set the flag, and sets it when it is not symmetric (the omp
+    cancel of checkSymBlockedOMP).
+    """
+    ii, band, early = task
+    start = time.perf_counter()
+    source, flag = _worker["source"], _worker["flag"]
+    symmetric = True
+    if not (early and flag[0]):
+        symmetric = bool(np.array_equal(source[ii:ii + band, ii:], source[ii:, ii:ii + band].T))
+        if early and not symmetric:
+            flag[0] = 1
+    return os.getpid(), symmetric, time.perf_counter() - start
+
+
+def _transpose_band(task):
+    """
+    Writes the band of rows [ii, ii + band) of the source, transposed, into
+    the columns [ii, ii + band) of the target: tile x tile block by block, or
+    with one strided copy when tile is 0. Returns the pid of the worker and
+    the time taken.
+    """
+    ii, band, tile = task
+    start = time.perf_counter()
+    source, target = _worker["source"], _worker["target"]
+    n = source.shape[1]
+    if tile <= 0:
+        np.copyto(target[:, ii:ii + band], source[ii:ii + band, :].T)
+    else:
+        for jj in range(0, n, tile):
+            target[jj:jj + tile, ii:ii + band] = source[ii:ii + band, jj:jj + tile].T
+    return os.getpid(), time.perf_counter() - start
+
+
+def _run_block(block):
+    """
+    Runs a contiguous block of tasks of the static schedule and returns their
+    results. Every block first waits at the barrier of the team, which opens
+    only once every worker holds one block, so no worker runs two of them;
+    the wait is not part of the times of the tasks.
+    """
+    function, tasks = block
+    _worker["barrier"].wait()
+    return [function(task) for task in tasks]
+
+
+class SharedMemoryTeam:
+    """
+    A pool of workers sharing an n x n source matrix and its transpose.
+    Write the matrix into source, then call check_sym and transpose; the
+    transpose is left in target. Both arrays are views of the shared blocks,
+    valid until close() (or the end of the with block), which stops the
+    workers and frees the blocks.
+    """
+
+    def __init__(self, n, workers=None):
+        self.n = n
+        self.workers = workers or os.cpu_count() or 1
+        nbytes = n * n * np.dtype(DTYPE).itemsize
+        self._blocks = [shared_memory.SharedMemory(create=True, size=max(nbytes, 1)) for _ in range(2)]
+        self._blocks.append(shared_memory.SharedMemory(create=True, size=1))
+        # Shared blocks are mapped at page boundaries, so the views are
+        # aligned like the buffers of matrix.h
+        self.source = from_buffer(self._blocks[0].buf, n)
+        self.target = from_buffer(self._blocks[1].buf, n)
+        self._flag = np.frombuffer(self._blocks[2].buf, dtype=np.uint8, count=1)
+        self._barrier = Barrier(self.workers)
+        self._pool = Pool(self.workers, initializer=_attach,
+                          initargs=([b.name for b in self._blocks], n, self._barrier))
+        self._index = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stops the workers and frees the shared blocks.
+        """
+        if self._pool is None:
+            return
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        # The blocks are removed first, so they never outlive the team; they
+        # can be closed only when no view of them is left (copy the transpose
+        # to keep it)
+        self.source = self.target = self._flag = None
+        for block in self._blocks:
+            block.unlink()
+        for block in self._blocks:
+            block.close()
+
+    def _run(self, function, tasks, schedule):
+        """
+        Runs the tasks on the pool with the schedule and returns their results.
+        """
+        kind, chunk = parse_schedule(schedule)
+        if kind == "static":
+            # One contiguous block of bands per worker, as many blocks as
+            # workers (some empty when there are fewer bands)
+            size = math.ceil(len(tasks) / self.workers)
+            blocks = [(function, tasks[w * size:(w + 1) * size]) for w in range(self.workers)]
+            return [r for results in self._pool.map(_run_block, blocks, chunksize=1) for r in results]
+        return list(self._pool.imap_unordered(function, tasks, chunksize=max(1, chunk)))
+
+    def _busy(self, results):
+        """
+        Returns the busy time of every worker (summed over its tasks, 0 for
+        the workers without tasks); the workers are numbered by their first
+        task, so every kernel reports them in the same order.
+        """
+        busy = [0.0] * self.workers
+        for pid, elapsed in results:
+            w = self._index.setdefault(pid, len(self._index))
+            busy[w] += elapsed
+        return busy
+
+    def check_sym(self, sym="full", tile=None, schedule="static"):
+        """
+        Returns whether the source matrix is symmetric and the busy time of
+        every worker. The bands have tile rows (None or 0 is the default tile
+        size); full and blocked check every band, early skips the bands still
+        waiting once an asymmetric one has been found.
+        """
+        if sym not in SYM_MODES:
+            raise ValueError(f"unknown symmetry check '{sym}', expected one of {', '.join(SYM_MODES)}")
+        band = tile if tile else default_tile_size()
+        self._flag[0] = 0
+        tasks = [(ii, band, sym == "early") for ii in range(0, self.n, band)]
+        results = self._run(_check_band, tasks, schedule)
+        symmetric = all(r[1] for r in results)
+        return symmetric, self._busy([(r[0], r[2]) for r in results])
+
+    def transpose(self, tile=None, schedule="static"):
+        """
+        Transposes the source matrix into target and returns target and the
+        busy time of every worker. The bands have tile rows (None is the
+        default tile size) and are copied tile by tile; tile 0 copies every
+        band of default tile size rows at once.
+        """
+        tile = default_tile_size() if tile is None else tile
+        band = tile if tile > 0 else default_tile_size()
+        tasks = [(ii, band, tile) for ii in range(0, self.n, band)]
+        return self.target, self._busy(self._run(_transpose_band, tasks, schedule))
+
+
+def parse_tile(text):
+    """
+    Parses a tile size, where "auto" is the default tile size.
+    """
+    if text == "auto":
+        return default_tile_size()
+    if not text.isdigit():
+        raise argparse.ArgumentTypeError(f"'{text}' is not a tile size")
+    return int(text)
+
+
+def default_workers():
+    """
+    Returns the number of workers of the command line: OMP_NUM_THREADS, as
+    omp.cpp, or the number of CPUs.
+    """
+    try:
+        return max(1, int(os.environ["OMP_NUM_THREADS"].split(",")[0]))
+    except (KeyError, ValueError):
+        return os.cpu_count() or 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m pytranspose.shm_backend",
+                                     description="Time the shared memory symmetry check and transpose.")
+    parser.add_argument("n", type=int, help="matrix size")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes (default: OMP_NUM_THREADS or the number of CPUs)")
+    parser.add_argument("--reps", type=int, default=1, help="printed repetitions")
+    parser.add_argument("--warmup", type=int, default=0, help="discarded repetitions before them")
+    parser.add_argument("--tile", type=parse_tile, default=default_tile_size(),
+                        help="tile size of the blocked transpose, 0 = one copy per band (default: auto)")
+    parser.add_argument("--sym", choices=SYM_MODES, default="full", help="symmetry check variant")
+    parser.add_argument("--schedule", default="static", help="schedule of the bands, static or dynamic[:chunk]")
+    parser.add_argument("--partition", choices=("rows",), default="rows",
+                        help="partition of the rows (only rows: the bands follow the schedule)")
+    parser.add_argument("--init", choices=("serial",), default="serial",
+                        help="placement of the pages (only serial: the main process fills the matrix)")
+    parser.add_argument("--input", help="matrix file to read (see matio.py) instead of a random matrix")
+    parser.add_argument("--seed", type=int, help="seed of the random matrix (same matrix as the binaries)")
+    parser.add_argument("--worker-times", action="store_true",
+                        help="print the busy time of every worker of every repetition on stderr")
+    args = parser.parse_args(argv)
+    if args.n < 1 or args.workers < 1 or args.reps < 1 or args.warmup < 0 or (args.seed is not None and args.seed < 0):
+        parser.error("n, --workers and --reps must be positive, --warmup and --seed not negative")
+    try:
+        parse_schedule(args.schedule)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with SharedMemoryTeam(args.n, args.workers) as team:
+        # Initialize (or read) the matrix once, straight into the shared block
+        if args.input:
+            try:
+                matrix = load(args.input, verify=True)
+            except (OSError, ValueError) as e:
+                parser.exit(1, f"Error: {e}\n")
+            if matrix.shape != (args.n, args.n):
+                parser.exit(1, f"Error: {args.input} is not a {args.n} x {args.n} matrix\n")
+            np.copyto(team.source, matrix)
+            del matrix
+        else:
+            seed = int.from_bytes(os.urandom(8), "little") if args.seed is None else args.seed
+            fill_seeded(team.source, 0, seed)
+
+        # The first warmup repetitions are run but not printed
+        for r in range(args.warmup + args.reps):
+            start = time.perf_counter()
+            check_sym_busy = team.check_sym(args.sym, args.tile, args.schedule)[1]
+            check_sym_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            transpose_busy = team.transpose(args.tile, args.schedule)[1]
+            transpose_time = time.perf_counter() - start
+
+            if r >= args.warmup:
+                print(f"{check_sym_time}, {transpose_time}, {args.tile}, {args.sym}, {args.schedule}, {args.partition}, "
+                      f"{args.init}, {min(check_sym_busy)}, {sum(check_sym_busy) / len(check_sym_busy)}, {max(check_sym_busy)}"
+                      + ", nan" * _PERF_COLUMNS, flush=True)
+                if args.worker_times:
+                    for w, (c, t) in enumerate(zip(check_sym_busy, transpose_busy)):
+                        print(f"worker {w}: checksym {c:.6g} s, transpose {t:.6g} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
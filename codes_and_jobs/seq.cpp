@@ -1,31 +1,37 @@
 #include <iostream>
-#include <vector>
-#include <random>
+#include <algorithm>
 #include <chrono>
+#include <string>
 
-// Function to initialize a random n x n matrix
-std::vector<std::vector<float>> initializeMatrix(int n) {
-    std::vector<std::vector<float>> matrix(n, std::vector<float>(n));
-    std::random_device rd;
-    std::mt19937 gen(rd());
-    std::uniform_real_distribution<float> dist(0.0, 100.0);
+#include "matio.h"
+#include "matrix.h"
+#include "perf.h"
+#include "tuning.h"
 
+// Function to check if the matrix is symmetric
+bool checkSym(const Matrix &matrix) {
+    int n = matrix.size();
+    bool isSymmetric = true;
     for (int i = 0; i < n; ++i) {
-        for (int j = 0; j < n; ++j) {
-            matrix[i][j] = dist(gen);
+        for (int j = i + 1; j < n; ++j) {
+            if (matrix(i, j) != matrix(j, i)) {
+                isSymmetric = false; 
+            }
         }
     }
-    return matrix;
+    return isSymmetric;
 }
 
-// Function to check if the matrix is symmetric
-bool checkSym(const std::vector<std::vector<float>> &matrix) {
+// Function to check if the matrix is symmetric tile pair by tile pair; with
+// earlyExit it returns as soon as an asymmetric pair is found
+bool checkSymBlocked(const Matrix &matrix, int tile, bool earlyExit) {
     int n = matrix.size();
     bool isSymmetric = true;
-    for (int i = 0; i < n; ++i) {
-        for (int j = i + 1; j < n; ++j) {
-            if (matrix[i][j] != matrix[j][i]) {
-                isSymmetric = false; 
+    for (int ii = 0; ii < n; ii += tile) {
+        if (!rowBlockSymmetric(matrix, ii, std::min(ii + tile, n), tile, earlyExit)) {
+            isSymmetric = false;
+            if (earlyExit) {
+                return false;
             }
         }
     }
@@ -33,45 +39,187 @@ bool checkSym(const std::vector<std::vector<float>> &matrix) {
 }
 
 // Function to transpose a matrix
-std::vector<std::vector<float>> matTranspose(const std::vector<std::vector<float>> &matrix) {
+Matrix matTranspose(const Matrix &matrix) {
     int n = matrix.size();
-    std::vector<std::vector<float>> transpose(n, std::vector<float>(n));
+    Matrix transpose(n);
 
     for (int i = 0; i < n; ++i) {
         for (int j = 0; j < n; ++j) {
-            transpose[j][i] = matrix[i][j];
+            transpose(j, i) = matrix(i, j);
         }
     }
     return transpose;
 }
 
+// Function to transpose a matrix tile by tile: every tile x tile block is read
+// and written while its source and destination rows are still in cache
+Matrix matTransposeBlocked(const Matrix &matrix, int tile) {
+    int n = matrix.size();
+    Matrix transpose(n);
+
+    for (int ii = 0; ii < n; ii += tile) {
+        int iEnd = std::min(ii + tile, n);
+        for (int jj = 0; jj < n; jj += tile) {
+            int jEnd = std::min(jj + tile, n);
+            for (int i = ii; i < iEnd; ++i) {
+                const float *src = matrix.row(i);
+                for (int j = jj; j < jEnd; ++j) {
+                    transpose(j, i) = src[j];
+                }
+            }
+        }
+    }
+    return transpose;
+}
+
+// Function to parse the command line:
+//   <matrix_size> [--reps N] [--warmup W] [--tile T|auto] [--sym full|blocked|early]
+//                 [--tuning FILE|none] [--input FILE] [--seed S] [--perf]
+// tile 0 selects the element-wise transpose, auto the default tile size; sym
+// selects the element-wise symmetry check (full), the tile-pair one (blocked)
+// or the tile-pair one stopping at the first asymmetric pair (early); without
+// a tile, it is the one tuned for one thread in the tuning database (see
+// tuning.h; tuning.csv when it exists, unless it is none); the matrix is read from the input file (see matio.h) or generated from the seed
+// (see loadMatrix). With perf the hardware counters of every kernel are read
+// (see perf.h)
+bool parseArgs(int argc, char *argv[], int &n, int &reps, int &warmup, int &tile, std::string &sym,
+               std::string &tuning, std::string &input, long long &seed, bool &perf) {
+    if (argc < 2) {
+        return false;
+    }
+    reps = 1;
+    warmup = 0;
+    tile = -1;
+    sym = "full";
+    tuning = "";
+    input = "";
+    seed = -1;
+    perf = false;
+    try {
+        n = std::stoi(argv[1]);
+        for (int i = 2; i < argc; ++i) {
+            std::string arg = argv[i];
+            if (arg == "--reps" && i + 1 < argc) {
+                reps = std::stoi(argv[++i]);
+            } else if (arg == "--warmup" && i + 1 < argc) {
+                warmup = std::stoi(argv[++i]);
+            } else if (arg == "--tile" && i + 1 < argc) {
+                std::string value = argv[++i];
+                tile = (value == "auto") ? defaultTileSize() : std::stoi(value);
+                if (tile < 0) {
+                    return false;
+                }
+            } else if (arg == "--sym" && i + 1 < argc) {
+                sym = argv[++i];
+            } else if (arg == "--tuning" && i + 1 < argc) {
+                tuning = argv[++i];
+            } else if (arg == "--input" && i + 1 < argc) {
+                input = argv[++i];
+            } else if (arg == "--seed" && i + 1 < argc) {
+                seed = std::stoll(argv[++i]);
+                if (seed < 0) {
+                    return false;
+                }
+            } else if (arg == "--perf") {
+                perf = true;
+            } else {
+                return false;
+            }
+        }
+    } catch (const std::exception &) {
+        return false;
+    }
+    bool validSym = (sym == "full" || sym == "blocked" || sym == "early");
+    return n > 0 && reps > 0 && warmup >= 0 && validSym;
+}
+
 int main(int argc, char *argv[]){
     
-    if (argc != 2) {
-        std::cerr << "Usage: " << argv[0] << " <matrix_size>" << std::endl;
+    int n, reps, warmup, tile;
+    std::string sym, tuning, input;
+    long long seed;
+    bool perf;
+    if (!parseArgs(argc, argv, n, reps, warmup, tile, sym, tuning, input, seed, perf)) {
+        std::cerr << "Usage: " << argv[0] << " <matrix_size> [--reps N] [--warmup W] [--tile T|auto] [--sym full|blocked|early]"
+                  << " [--tuning FILE|none] [--input FILE] [--seed S] [--perf]" << std::endl;
         return 1;
     }
 
-    int n = std::stoi(argv[1]);
+    // Without a tile, take the one tuned for one thread on this host; only a
+    // database given on the command line must have entries for it
+    bool givenTuning = !tuning.empty() && tuning != "none";
+    tuning = tuningPath(tuning);
+    if (tile < 0 && !tuning.empty()) {
+        TuningEntry entry;
+        try {
+            if (findTuning(readTuning(tuning, hostName()), n, 1, entry)) {
+                tile = entry.tile;
+            } else if (givenTuning) {
+                std::cerr << "Warning: " << tuning << " has no entries for host " << hostName() << std::endl;
+            }
+        } catch (const std::exception &e) {
+            std::cerr << "Error: " << e.what() << std::endl;
+            return 1;
+        }
+    }
+    tile = (tile < 0) ? defaultTileSize() : tile;
+
+    // The tile-pair symmetry check uses the transpose tile (the default one
+    // when the transpose is element-wise)
+    int symTile = (tile > 0) ? tile : defaultTileSize();
+    bool earlyExit = (sym == "early");
 
-    // Initialize the matrix
-    auto matrix = initializeMatrix(n);
+    // Initialize the matrix once, every repetition works on the same data
+    Matrix matrix;
+    try {
+        matrix = loadMatrix(n, input, seed);
+    } catch (const std::exception &e) {
+        std::cerr << "Error: " << e.what() << std::endl;
+        return 1;
+    }
 
-    // Measure symmetry check time
-    auto start = std::chrono::high_resolution_clock::now();
-    bool isSymmetric = checkSym(matrix);
-    auto end = std::chrono::high_resolution_clock::now();
+    // Hardware counters of the kernels, NaN without --perf
+    PerfCounters counters;
+    if (perf) {
+        perfWarning(counters.open());
+    }
+    double checkSymCounts[PERF_EVENTS], transposeCounts[PERF_EVENTS];
+    missingCounts(checkSymCounts);
+    missingCounts(transposeCounts);
 
-    std::chrono::duration<double> checkSymDur = end - start; 
-    std::cout << checkSymDur.count() << ",";
+    // The first warmup repetitions are run but not printed
+    for (int r = 0; r < warmup + reps; ++r) {
+        // Measure symmetry check time (and counters)
+        counters.start();
+        auto start = std::chrono::high_resolution_clock::now();
+        bool isSymmetric = (sym == "full") ? checkSym(matrix) : checkSymBlocked(matrix, symTile, earlyExit);
+        auto end = std::chrono::high_resolution_clock::now();
+        counters.stop();
+        std::chrono::duration<double> checkSymDur = end - start;
+        if (perf) {
+            clearCounts(checkSymCounts);
+            counters.read(checkSymCounts);
+        }
 
-    // Measure transpose time
-    start = std::chrono::high_resolution_clock::now();
-    auto transpose = matTranspose(matrix);
-    end = std::chrono::high_resolution_clock::now();
+        // Measure transpose time (and counters)
+        counters.start();
+        start = std::chrono::high_resolution_clock::now();
+        auto transpose = (tile > 0) ? matTransposeBlocked(matrix, tile) : matTranspose(matrix);
+        end = std::chrono::high_resolution_clock::now();
+        counters.stop();
+        std::chrono::duration<double> matTransposeDur = end - start;
+        if (perf) {
+            clearCounts(transposeCounts);
+            counters.read(transposeCounts);
+        }
 
-    std::chrono::duration<double> matTransposeDur = end - start; 
-    std::cout << matTransposeDur.count();
+        // One CSV line per repetition: checksym_time,transpose_time,tile,sym, then
+        // the counters of checkSym and of matTranspose (see PERF_EVENT_NAMES)
+        if (r >= warmup) {
+            std::cout << checkSymDur.count() << "," << matTransposeDur.count() << "," << tile << "," << sym
+                      << perfColumns(checkSymCounts) << perfColumns(transposeCounts) << std::endl;
+        }
+    }
 
     return 0;
 }
\ No newline at end of file
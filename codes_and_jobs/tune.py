@@ -0,0 +1,140 @@
+"""
+Autotuner of the OpenMP implementation.
+
+Searches, for every matrix size, the tile size of the blocked kernels, the
+OpenMP schedule of the loops and the number of threads. Every combination is
+measured by bench.py (so an interrupted search is resumed like a campaign)
+into tune_results.csv, one (n_matrix, n_threads) group at a time; once a
+group is measured, its fastest tile and schedule, by the median of
+checksym_time + transpose_time, are merged into the tuning database under the
+name of this host, so a search interrupted by the walltime keeps the groups
+it finished. omp.cpp and seq.cpp read the database at startup (tuning.csv, or
+--tuning FILE, see tuning.h), and graphs_data/tuning.py draws the measured
+landscape.
+
+    python3 tune.py --sizes 1024,4096 --threads 1,2,4,8 --tiles 0,16,32,64,128 --schedules static,dynamic:16,guided
+"""
+import argparse
+import csv
+import os
+import socket
+import statistics
+import sys
+
+import bench
+
+# Columns of the tuning database (see tuning.h)
+DATABASE_COLUMNS = ["host", "n_matrix", "n_threads", "tile", "schedule", "time"]
+
+# Search space of the default run
+DEFAULT_SIZES = "256,1024,4096"
+DEFAULT_THREADS = "1,2,4,8,16,32"
+DEFAULT_TILES = "0,16,32,64,128,256"
+DEFAULT_SCHEDULES = "static,static:1,dynamic:1,dynamic:16,guided"
+
+
+def best_configurations(path):
+    """
+    Returns the best (tile, schedule, time) of every (n_matrix, n_threads)
+    measured in the results file of the search, where time is the median of
+    checksym_time + transpose_time of a configuration (ERROR rows are left
+    out).
+    """
+    samples = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                total = float(row["checksym_time"]) + float(row["transpose_time"])
+            except ValueError:
+                continue
+            key = (int(row["n_matrix"]), int(row["n_threads"]), int(row["tile"]), row["schedule"])
+            samples.setdefault(key, []).append(total)
+
+    best = {}
+    for (n, threads, tile, schedule), times in samples.items():
+        time = statistics.median(times)
+        if (n, threads) not in best or time < best[(n, threads)][2]:
+            best[(n, threads)] = (tile, schedule, time)
+    return best
+
+
+def write_database(path, host, best):
+    """
+    Writes the best configurations of a host to the tuning database, replacing
+    its entries for the same (n_matrix, n_threads) and keeping all the others.
+    The file is replaced at once, so the binaries never read half of it.
+    """
+    rows = []
+    if os.path.exists(path):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            if next(reader, None) != DATABASE_COLUMNS:
+                sys.exit(f"{path} is not a tuning database")
+            rows = [r for r in reader if len(r) == len(DATABASE_COLUMNS)]
+    rows = [r for r in rows if not (r[0] == host and (int(r[1]), int(r[2])) in best)]
+    for (n, threads), (tile, schedule, time) in best.items():
+        rows.append([host, str(n), str(threads), str(tile), schedule, f"{time:.6g}"])
+    rows.sort(key=lambda r: (r[0], int(r[1]), int(r[2])))
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(DATABASE_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the best tile size, OpenMP schedule and threads of omp.cpp.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"matrix sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--threads", default=DEFAULT_THREADS, help=f"numbers of threads (default: {DEFAULT_THREADS})")
+    parser.add_argument("--tiles", default=DEFAULT_TILES, help=f"tile sizes, 0 = element-wise (default: {DEFAULT_TILES})")
+    parser.add_argument("--schedules", default=DEFAULT_SCHEDULES,
+                        help=f"OpenMP schedules as kind[:chunk] (default: {DEFAULT_SCHEDULES})")
+    parser.add_argument("--reps", type=int, default=10, help="samples per configuration")
+    parser.add_argument("--warmup", type=int, default=2, help="discarded runs before the samples")
+    parser.add_argument("--seed", type=int, help="seed of the input matrix (default: random)")
+    parser.add_argument("--binary", help="path of the OpenMP binary (default: the name used by the PBS jobs)")
+    parser.add_argument("--output", default="tune_results.csv", help="results CSV of the search")
+    parser.add_argument("--database", default="tuning.csv", help="tuning database to update")
+    parser.add_argument("--host", default=socket.gethostname(), help="host name of the entries (default: this host)")
+    parser.add_argument("--new", action="store_true", help="start a new search instead of resuming the last one")
+    args = parser.parse_args()
+
+    # The search is a bench.py sweep of the omp backend per (n_matrix,
+    # n_threads) group, whose best entry is merged into the database as soon
+    # as the group is measured (the groups already measured are skipped)
+    try:
+        sizes, threads = bench.parse_list(args.sizes), bench.parse_list(args.threads)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    new = args.new
+    written = 0
+    for n in sizes:
+        for count in threads:
+            sweep = ["omp", "--sizes", str(n), "--workers", str(count), "--tiles", args.tiles,
+                     "--schedule", args.schedules, "--reps", str(args.reps), "--warmup", str(args.warmup),
+                     "--output", args.output, "--new" if new else "--resume"]
+            if args.seed is not None:
+                sweep += ["--seed", str(args.seed)]
+            if args.binary:
+                sweep += ["--binary", args.binary]
+            bench.main(sweep)
+            new = False
+
+            best = best_configurations(args.output).get((n, count))
+            if best is None:
+                print(f"n={n} threads={count}: no valid measurement in {args.output}", file=sys.stderr)
+                continue
+            write_database(args.database, args.host, {(n, count): best})
+            written += 1
+            tile, schedule, time = best
+            print(f"n={n} threads={count}: tile={tile} schedule={schedule} ({time:.6g} s)", flush=True)
+
+    if not written:
+        sys.exit(f"No valid measurement in {args.output}")
+    print(f"Written {written} entries for {args.host} to {args.database}")
+
+
+if __name__ == "__main__":
+    main()
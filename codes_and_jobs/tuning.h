@@ -0,0 +1,103 @@
+#ifndef TUNING_H
+#define TUNING_H
+
+#include <cmath>
+#include <fstream>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <vector>
+#include <unistd.h>
+
+// Tuning database written by tune.py: a CSV with the best tile size and
+// OpenMP schedule found for every (host, n_matrix, n_threads), and the time
+// (checksym + transpose) they took:
+//   host,n_matrix,n_threads,tile,schedule,time
+struct TuningEntry {
+    int n;
+    int threads;
+    int tile;
+    std::string schedule;
+    double time;
+};
+
+// Tuning database read by the binaries at startup when it exists in the
+// working directory and no other one is given (--tuning FILE, or none)
+const char *const DEFAULT_TUNING = "tuning.csv";
+
+// Function to choose the tuning database of a run: the given one, no
+// database for "none", else the default one when it exists
+inline std::string tuningPath(const std::string &given) {
+    if (given == "none") {
+        return "";
+    }
+    if (!given.empty()) {
+        return given;
+    }
+    std::ifstream file(DEFAULT_TUNING);
+    return file ? DEFAULT_TUNING : "";
+}
+
+// Function to get the name of this host, the key of its entries
+inline std::string hostName() {
+    char name[256] = {0};
+    if (gethostname(name, sizeof(name) - 1) != 0) {
+        return "unknown";
+    }
+    return name;
+}
+
+// Function to read the entries of one host from a tuning database
+inline std::vector<TuningEntry> readTuning(const std::string &path, const std::string &host) {
+    std::ifstream file(path);
+    if (!file) {
+        throw std::runtime_error("cannot open " + path);
+    }
+    std::string line;
+    if (!std::getline(file, line) || line != "host,n_matrix,n_threads,tile,schedule,time") {
+        throw std::runtime_error(path + " is not a tuning database");
+    }
+
+    std::vector<TuningEntry> entries;
+    while (std::getline(file, line)) {
+        std::vector<std::string> fields;
+        std::stringstream row(line);
+        std::string field;
+        while (std::getline(row, field, ',')) {
+            fields.push_back(field);
+        }
+        if (fields.size() != 6 || fields[0] != host) {
+            continue;
+        }
+        try {
+            entries.push_back({std::stoi(fields[1]), std::stoi(fields[2]), std::stoi(fields[3]), fields[4], std::stod(fields[5])});
+        } catch (const std::exception &) {
+            throw std::runtime_error(path + ": bad line '" + line + "'");
+        }
+    }
+    return entries;
+}
+
+// Function to choose the entry for a matrix of size n run by threads threads:
+// among the entries of the nearest tuned size (in log scale), the one with the
+// nearest number of threads, or the fastest one when threads is 0. Returns
+// false when there are no entries
+inline bool findTuning(const std::vector<TuningEntry> &entries, int n, int threads, TuningEntry &best) {
+    bool found = false;
+    double bestSize = 0, bestThreads = 0;
+    for (const TuningEntry &entry : entries) {
+        double size = std::fabs(std::log2(double(entry.n)) - std::log2(double(n)));
+        double thr = (threads > 0) ? std::abs(entry.threads - threads) : 0;
+        bool better = !found || size < bestSize ||
+                      (size == bestSize && (thr < bestThreads || (thr == bestThreads && entry.time < best.time)));
+        if (better) {
+            best = entry;
+            bestSize = size;
+            bestThreads = thr;
+            found = true;
+        }
+    }
+    return found;
+}
+
+#endif
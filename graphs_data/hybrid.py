@@ -0,0 +1,50 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+import metrics
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["hybrid"]
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # The grid of the largest matrix, where the split matters the most
+    n = results.select(table, "hybrid")["n_matrix"].max()
+
+    for kernel, label in [("checksym", "CheckSym"), ("transpose", "Transpose")]:
+        # ========== Speedup over the (processes, threads) grid ========== #
+        grid = metrics.grid_speedup(table, "hybrid", kernel, n)
+        values = grid.to_numpy()
+
+        fig = plt.figure(figsize=(8, 6))
+        plt.imshow(values, origin="lower", cmap="viridis", aspect="auto")
+        plt.colorbar(label=f"Speedup ({label})")
+
+        # Speedup written in every measured cell
+        for i in range(values.shape[0]):
+            for j in range(values.shape[1]):
+                if not np.isnan(values[i, j]):
+                    plt.text(j, i, f"{values[i, j]:.2f}", ha="center", va="center", color="white")
+
+        plt.xticks(range(len(grid.columns)), grid.columns)
+        plt.yticks(range(len(grid.index)), grid.index)
+        plt.xlabel("Threads per Process")
+        plt.ylabel("Number of Processes")
+        plt.title(f"Hybrid Speedup - {label} (n={n})")
+        plt.tight_layout()
+        figs.append((f"{kernel}_speedup_grid", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
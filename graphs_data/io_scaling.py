@@ -0,0 +1,74 @@
+import matplotlib.pyplot as plt
+
+import metrics
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["mpi"]
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # Only the MPI runs that read or wrote matrix files have an I/O time
+    if "io_time" not in table.columns:
+        return figs
+    table = table[(table["backend"] == "mpi") & table["io_time"].notna()]
+    if len(table) == 0:
+        return figs
+
+    # One row per (workers, n_matrix): the best measured configuration, with
+    # the compute time of both kernels next to the MPI-IO time
+    table = results.best(table)
+    table["compute_time"] = table["checksym_time"] + table["transpose_time"]
+    scaling = metrics.strong_scaling(table, kernels=("compute", "io"))
+
+    # ========== Compute vs. I/O time ========== #
+    fig = plt.figure(figsize=(8, 6))
+
+    for i, (n, sub_df) in enumerate(results.select(table, "mpi").groupby("n_matrix")):
+        color = f"C{i}"
+        plt.plot(sub_df["workers"], sub_df["compute_time"], marker='o', color=color, label=f"Compute, n={n}")
+        plt.plot(sub_df["workers"], sub_df["io_time"], marker='s', ls="--", color=color, label=f"I/O, n={n}")
+
+    plt.xscale("log", base=2)
+    plt.yscale("log")
+    plt.xlabel("Number of Processes (p)")
+    plt.ylabel("Average Time (s)")
+    plt.title("MPI Compute vs. MPI-IO Time")
+    plt.grid(True, which="both", ls="--", linewidth=0.5)
+    plt.legend()
+    plt.tight_layout()
+    figs.append(("times", fig))
+
+    # ========== Compute vs. I/O speedup ========== #
+    fig = plt.figure(figsize=(8, 6))
+
+    workers = sorted(table["workers"].unique())
+    plt.plot(workers, workers, ls=":", color="gray", label="Ideal")
+    for i, n in enumerate(sorted(table["n_matrix"].unique())):
+        color = f"C{i}"
+        compute = metrics.select(scaling, "mpi", "compute", n)
+        io = metrics.select(scaling, "mpi", "io", n)
+        plt.plot(compute["workers"], compute["speedup"], marker='o', color=color, label=f"Compute, n={n}")
+        plt.plot(io["workers"], io["speedup"], marker='s', ls="--", color=color, label=f"I/O, n={n}")
+
+    plt.xlabel("Number of Processes (p)")
+    plt.ylabel("Speedup")
+    plt.title("Strong Scaling - Compute vs. MPI-IO")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    figs.append(("speedup", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
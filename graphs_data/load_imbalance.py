@@ -0,0 +1,99 @@
+import matplotlib.pyplot as plt
+
+import metrics
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["omp", "mpi"]
+
+# Python backend drawn dashed in the panel of every backend, when measured
+PYTHON = {"omp": "shm", "mpi": "mpi4py"}
+
+# Row partitions of the symmetry check (--partition), in drawing order
+PARTITIONS = ["rows", "triangular", "paired"]
+
+def best_per_partition(table):
+    """
+    Returns the rows of the full symmetry check of the replicated layout, one
+    per (backend, workers, n_matrix, partition): the configuration with the
+    lowest checksym time (the other options, e.g. the tile of the transpose,
+    do not change the check).
+    """
+    rows = table[table["sym"] == "full"]
+    if "mode" in rows.columns:
+        rows = rows[rows["mode"] != "distributed"]
+    rows = rows.dropna(subset=["checksym_time"])
+    keys = ["backend", "workers", "n_matrix", "partition"]
+    rows = rows.loc[rows.groupby(keys, observed=True)["checksym_time"].idxmin()]
+    columns = keys + ["checksym_time"] + [c for c in results.WORK_COLUMNS if c in rows.columns]
+    return rows[columns].reset_index(drop=True)
+
+def plot_partitions(ax, rows, backend, column):
+    """
+    Draws a metric of every partition of a backend (and of its Python
+    counterpart, dashed) against the number of workers, for the largest
+    matrix measured by the backend.
+    """
+    sub = rows[rows["backend"] == backend]
+    if len(sub) == 0:
+        return
+    n = sub["n_matrix"].max()
+    for python, style in ((False, "-"), (True, "--")):
+        name = PYTHON[backend] if python else backend
+        for i, partition in enumerate(PARTITIONS):
+            line = rows[(rows["backend"] == name) & (rows["n_matrix"] == n) & (rows["partition"] == partition)]
+            if len(line):
+                line = line.sort_values("workers")
+                ax.plot(line["workers"], line[column], marker='o', ls=style, color=f"C{i}",
+                        label=f"{partition}{' (Python)' if python else ''}")
+    ax.set_xscale("log", base=2)
+    ax.set_xlabel("Number of Threads/Processes (p)")
+    ax.set_title(f"{backend} (n={n})")
+    ax.grid(True, which="both", ls="--", linewidth=0.5)
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # The results without the partition and work columns have nothing to draw
+    if "partition" not in table.columns or any(c not in table.columns for c in results.WORK_COLUMNS):
+        return figs
+    table = best_per_partition(table)
+    imbalance = metrics.load_imbalance(table)
+
+    # ========== Load imbalance of the partitions ========== #
+    fig, axes = plt.subplots(1, len(BACKENDS), figsize=(7 * len(BACKENDS), 6))
+    for ax, backend in zip(axes, BACKENDS):
+        plot_partitions(ax, imbalance, backend, "imbalance")
+        ax.axhline(1, color="black", ls=":", linewidth=1)
+        ax.set_ylabel("Load Imbalance (max / mean work time)")
+        ax.legend()
+    fig.suptitle("Load Imbalance of the Symmetry Check")
+    fig.tight_layout()
+    figs.append(("imbalance", fig))
+
+    # ========== Speedup of the partitions ========== #
+    scaling = metrics.strong_scaling(table, kernels=("checksym",))
+    fig, axes = plt.subplots(1, len(BACKENDS), figsize=(7 * len(BACKENDS), 6))
+    for ax, backend in zip(axes, BACKENDS):
+        plot_partitions(ax, scaling, backend, "speedup")
+        workers = sorted(scaling.loc[scaling["backend"] == backend, "workers"].unique())
+        if workers:
+            ax.plot(workers, workers, color="black", ls=":", linewidth=1, label="ideal")
+        ax.set_ylabel("Speedup (CheckSym)")
+        ax.legend()
+    fig.suptitle("Strong Scaling of the Symmetry Check by Partition")
+    fig.tight_layout()
+    figs.append(("speedup", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Scaling metrics computed on the averaged results table of results.py.
+
+All the metrics are computed in one vectorized pass: the table is reshaped to
+one row per (backend, n_matrix, workers, kernel), every row is merged with its
+p=1 baseline and the ratios are plain NumPy divisions.
+"""
+import numpy as np
+import pandas as pd
+
+import results
+
+# Kernels measured by the implementations (column "<kernel>_time"); io is the
+# MPI-IO time of the MPI runs reading or writing matrix files
+KERNELS = ("checksym", "transpose", "io")
+
+# Bytes of float32 elements that a kernel has to move for an n x n matrix: the
+# symmetry check reads both elements of the n(n-1)/2 pairs, the transpose
+# reads and writes every element
+KERNEL_BYTES = {
+    "checksym": lambda n: 4.0 * n * (n - 1),
+    "transpose": lambda n: 8.0 * n * n,
+}
+
+
+def _ratio(num, den):
+    """
+    Element-wise num / den, NaN where the denominator is not positive.
+    """
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def tidy(table, kernels=KERNELS):
+    """
+    Reshapes the averaged table to one row per kernel: backend, workers,
+    n_matrix, configuration columns, kernel and time, plus time_lo and
+    time_hi when the table has confidence intervals (see stats.summarize).
+    Kernels that were not measured by a row (NaN time) are left out.
+    """
+    columns = results.SPLIT_COLUMNS + results.CONFIG_COLUMNS
+    keys = ["backend", "workers", "n_matrix"] + [c for c in columns if c in table.columns]
+    value_columns = [f"{k}_time" for k in kernels if f"{k}_time" in table.columns]
+    long = table.melt(id_vars=keys, value_vars=value_columns, var_name="kernel", value_name="time")
+    for bound in ("lo", "hi"):
+        bound_columns = [f"{c}_{bound}" for c in value_columns]
+        if all(c in table.columns for c in bound_columns):
+            # melt stacks the columns in the same order, so the rows line up
+            long[f"time_{bound}"] = table.melt(id_vars=keys, value_vars=bound_columns)["value"].to_numpy()
+    long = long.dropna(subset=["time"]).reset_index(drop=True)
+    long["kernel"] = long["kernel"].str[: -len("_time")]
+    long["backend"] = long["backend"].astype(str)
+    return long
+
+
+def strong_scaling(table, kernels=KERNELS):
+    """
+    Returns, for every (backend, n_matrix, workers, kernel), the time, the
+    baseline time T1 with one worker, the speedup S = T1 / Tp, the efficiency
+    E = S / p (in %) and the Karp-Flatt serial fraction
+    e = (1/S - 1/p) / (1 - 1/p), which is undefined for p = 1.
+    Problems without a p=1 run are left out. kernels selects the
+    "<kernel>_time" columns of the table to use. When the table has
+    confidence intervals of the times, speedup_lo/hi and efficiency_lo/hi
+    bound the ratios with the opposite bounds of the two times
+    (T1_lo / Tp_hi and T1_hi / Tp_lo).
+    """
+    long = tidy(table, kernels)
+    times = [c for c in ["time", "time_lo", "time_hi"] if c in long.columns]
+    # With processes x threads, every split of p workers has the same baseline
+    keys = [c for c in long.columns if c not in ["workers"] + times + results.SPLIT_COLUMNS]
+
+    baseline = long[long["workers"] == 1][keys + times].rename(columns={c: "t1" + c[len("time"):] for c in times})
+    scaling = long.merge(baseline, on=keys, how="inner")
+
+    p = scaling["workers"].to_numpy(dtype="float64")
+    speedup = _ratio(scaling["t1"], scaling["time"])
+    scaling["speedup"] = speedup
+    scaling["efficiency"] = _ratio(speedup, p) * 100
+    serial_den = np.where(p > 1, 1.0 - 1.0 / p, np.nan)
+    scaling["karp_flatt"] = _ratio(_ratio(1.0, speedup) - 1.0 / p, serial_den)
+    if "time_lo" in scaling.columns and "time_hi" in scaling.columns:
+        scaling["speedup_lo"] = _ratio(scaling["t1_lo"], scaling["time_hi"])
+        scaling["speedup_hi"] = _ratio(scaling["t1_hi"], scaling["time_lo"])
+        scaling["efficiency_lo"] = _ratio(scaling["speedup_lo"], p) * 100
+        scaling["efficiency_hi"] = _ratio(scaling["speedup_hi"], p) * 100
+
+    return scaling.sort_values(["backend", "kernel", "n_matrix", "workers"]).reset_index(drop=True)
+
+
+def weak_scaling(table, points):
+    """
+    Returns the weak scaling speedup S_w(p) = T1(N) / T_p(p*N) of every
+    backend and kernel, where points is the list of (p, n_matrix) pairs that
+    keep the work per worker constant and points[0] is the baseline.
+    Missing points get NaN.
+    """
+    long = tidy(table)
+    wanted = pd.DataFrame(points, columns=["workers", "n_matrix"])
+    wanted["point"] = np.arange(len(wanted))
+
+    combos = long[["backend", "kernel"]].drop_duplicates()
+    grid = combos.merge(wanted, how="cross")
+    weak = grid.merge(long, on=["backend", "kernel", "workers", "n_matrix"], how="left")
+
+    base = weak[weak["point"] == 0][["backend", "kernel", "time"]].rename(columns={"time": "t1"})
+    weak = weak.merge(base, on=["backend", "kernel"], how="left")
+    weak["weak_speedup"] = _ratio(weak["t1"], weak["time"])
+
+    return weak.sort_values(["backend", "kernel", "point"]).drop(columns="point").reset_index(drop=True)
+
+
+def grid_speedup(table, backend, kernel, n_matrix):
+    """
+    Returns the speedup S = T(1, 1) / T(processes, threads) of a backend with
+    processes and threads (hybrid) as a table with one row per number of
+    processes and one column per number of threads, using the best
+    configuration of every cell. Cells that were not measured are NaN.
+    """
+    rows = results.select(table, backend, n_matrix=n_matrix)
+    grid = rows.pivot_table(index="n_processes", columns="n_threads", values=f"{kernel}_time", aggfunc="min")
+    grid.index = grid.index.astype(int)
+    grid.columns = grid.columns.astype(int)
+    t1 = grid.loc[1, 1] if (1 in grid.index and 1 in grid.columns) else np.nan
+    return pd.DataFrame(_ratio(t1, grid.to_numpy()), index=grid.index, columns=grid.columns)
+
+
+def select(scaling, backend, kernel, n_matrix=None):
+    """
+    Returns the metric rows of one backend and kernel (optionally for a single
+    matrix size), sorted by workers.
+    """
+    rows = scaling[(scaling["backend"] == backend) & (scaling["kernel"] == kernel)]
+    if n_matrix is not None:
+        rows = rows[rows["n_matrix"] == n_matrix]
+    return rows.sort_values(["n_matrix", "workers"])
+
+
+def hardware(table, kernels=("checksym", "transpose")):
+    """
+    Returns one row per row of the table and kernel, with the time, the
+    achieved bandwidth (KERNEL_BYTES / time, in GB/s), the instructions per
+    cycle and, for every cache and TLB counter, the misses per matrix element
+    ("<event>_per_element"); the counter metrics are NaN for the runs without
+    hardware counters (see results.COUNTER_COLUMNS). Kernels that were not
+    measured by a row are left out.
+    """
+    columns = results.SPLIT_COLUMNS + results.CONFIG_COLUMNS
+    keys = ["backend", "workers", "n_matrix"] + [c for c in columns if c in table.columns]
+    missing = np.full(len(table), np.nan)
+    frames = []
+    for kernel in kernels:
+        if f"{kernel}_time" not in table.columns:
+            continue
+        counts = {e: table[f"{kernel}_{e}"].to_numpy(dtype="float64") if f"{kernel}_{e}" in table.columns else missing
+                  for e in results.PERF_EVENTS}
+        n = table["n_matrix"].to_numpy(dtype="float64")
+        rows = table[keys].copy()
+        rows["kernel"] = kernel
+        rows["time"] = table[f"{kernel}_time"].to_numpy()
+        rows["bandwidth"] = _ratio(KERNEL_BYTES[kernel](n) / 1e9, rows["time"])
+        rows["ipc"] = _ratio(counts["instructions"], counts["cycles"])
+        for event in results.PERF_EVENTS:
+            if event.endswith("_misses"):
+                rows[f"{event}_per_element"] = counts[event] / (n * n)
+        frames.append(rows)
+    out = pd.concat(frames, ignore_index=True).dropna(subset=["time"]).reset_index(drop=True)
+    out["backend"] = out["backend"].astype(str)
+    return out
+
+
+def load_imbalance(table):
+    """
+    Returns one row per row of the table with work times of the symmetry check
+    (see results.WORK_COLUMNS): the time of the check, the smallest, mean and
+    largest time of the workers (work_min, work_mean, work_max), the load
+    imbalance max / mean (1 = balanced, p = one worker does all the work) and
+    idle, the share of the check (in %) that the workers spend on average
+    waiting for the slowest one. The runs without work times are left out.
+    """
+    columns = results.SPLIT_COLUMNS + results.CONFIG_COLUMNS
+    keys = ["backend", "workers", "n_matrix"] + [c for c in columns if c in table.columns]
+    rows = table[keys].copy()
+    rows["time"] = table["checksym_time"].to_numpy()
+    for c in results.WORK_COLUMNS:
+        rows[c[len("checksym_"):]] = table[c].to_numpy(dtype="float64") if c in table.columns else np.nan
+    rows = rows.dropna(subset=["time", "work_max"]).reset_index(drop=True)
+    rows["imbalance"] = _ratio(rows["work_max"], rows["work_mean"])
+    rows["idle"] = (1.0 - _ratio(rows["work_mean"], rows["work_max"])) * 100
+    rows["backend"] = rows["backend"].astype(str)
+    return rows
@@ -1,23 +1,32 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
-    # Read the CSV file
-    df = pd.read_csv("omp_results.csv")
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["omp"]
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # One row per (backend, workers, n_matrix): the best measured configuration
+    table = results.best(table)
 
-    # Group by (n_threads, n_matrix) and calculate the mean of the values
-    grouped_df = df.groupby(["n_threads", "n_matrix"], as_index=False).mean()
+    # Read the results averaged by (workers, n_matrix)
+    grouped_df = results.select(table, "omp")
 
     # Extract the list of unique threads and sort the table by n_matrix
-    unique_procs = sorted(grouped_df["n_threads"].unique())
+    unique_procs = sorted(grouped_df["workers"].unique())
 
     # ========== PLOT 1: checksym_time ========== #
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
 
     for p in unique_procs:
         # Filter data for the specific number of threads p
-        sub_df = grouped_df[grouped_df["n_threads"] == p]
-        sub_df = sub_df.sort_values("n_matrix")
+        sub_df = grouped_df[grouped_df["workers"] == p]
 
         # Plot the line for these data points
         plt.plot(
@@ -37,14 +46,13 @@ def main():
     plt.grid(True, which="both", ls="--", linewidth=0.5)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("checksym_time", fig))
 
     # ========== PLOT 2: transpose_time ========== #
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
 
     for p in unique_procs:
-        sub_df = grouped_df[grouped_df["n_threads"] == p]
-        sub_df = sub_df.sort_values("n_matrix")
+        sub_df = grouped_df[grouped_df["workers"] == p]
 
         plt.plot(
             sub_df["n_matrix"], 
@@ -62,6 +70,12 @@ def main():
     plt.grid(True, which="both", ls="--", linewidth=0.5)
     plt.legend()
     plt.tight_layout()
+    figs.append(("transpose_time", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
     plt.show()
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+import metrics
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["seq", "omp", "mpi"]
+
+# Cache and TLB counters drawn as misses per element, with their labels
+MISSES = [
+    ("l1d_misses", "L1D Misses"),
+    ("llc_misses", "LLC Misses"),
+    ("dtlb_misses", "dTLB Misses"),
+]
+
+STYLES = {"checksym": "--", "transpose": "-"}
+
+def plot_vs_size(ax, rows, column):
+    """
+    Draws a metric of every backend and kernel against the matrix size, with
+    the largest number of workers measured by each backend.
+    """
+    for i, backend in enumerate(BACKENDS):
+        sub = rows[rows["backend"] == backend]
+        if len(sub) == 0:
+            continue
+        sub = sub[sub["workers"] == sub["workers"].max()]
+        for kernel, style in STYLES.items():
+            line = metrics.select(sub, backend, kernel).dropna(subset=[column])
+            if len(line):
+                ax.plot(line["n_matrix"], line[column], marker='o', ls=style, color=f"C{i}",
+                        label=f"{backend} (p={line['workers'].iloc[0]}), {kernel}")
+    ax.set_xscale("log", base=2)
+    ax.set_xlabel("Matrix Size (n)")
+
+def plot_vs_workers(ax, rows, column):
+    """
+    Draws a metric of the parallel backends and of every kernel against the
+    number of workers, for the largest matrix measured by each backend.
+    """
+    for i, backend in enumerate(BACKENDS):
+        sub = rows[(rows["backend"] == backend) & (rows["workers"] > 1)]
+        if len(sub) == 0:
+            continue
+        n = sub["n_matrix"].max()
+        for kernel, style in STYLES.items():
+            line = metrics.select(rows, backend, kernel, n).dropna(subset=[column])
+            if len(line):
+                ax.plot(line["workers"], line[column], marker='o', ls=style, color=f"C{i}",
+                        label=f"{backend} (n={n}), {kernel}")
+    ax.set_xscale("log", base=2)
+    ax.set_xlabel("Number of Threads/Processes (p)")
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # Best configuration of every (backend, workers, n_matrix), with the
+    # counters of the same configuration as the time of each kernel
+    rows = metrics.hardware(results.best(table))
+
+    # ========== Achieved bandwidth ========== #
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    plot_vs_size(axes[0], rows, "bandwidth")
+    plot_vs_workers(axes[1], rows, "bandwidth")
+    for ax in axes:
+        ax.set_yscale("log")
+        ax.set_ylabel("Achieved Bandwidth (GB/s)")
+        ax.grid(True, which="both", ls="--", linewidth=0.5)
+        ax.legend(fontsize="small")
+    axes[0].set_title("Bandwidth vs. Matrix Size")
+    axes[1].set_title("Bandwidth vs. Workers")
+    fig.tight_layout()
+    figs.append(("bandwidth", fig))
+
+    # The other figures need the hardware counters (bench.py --perf)
+    if rows["ipc"].isna().all() and all(rows[f"{e}_per_element"].isna().all() for e, _ in MISSES):
+        return figs
+
+    # ========== Miss rates and IPC ========== #
+    panels = [(f"{e}_per_element", f"{label} per Element") for e, label in MISSES] + [("ipc", "Instructions per Cycle")]
+    fig, axes = plt.subplots(2, len(panels), figsize=(5 * len(panels), 10))
+    for j, (column, label) in enumerate(panels):
+        plot_vs_size(axes[0, j], rows, column)
+        plot_vs_workers(axes[1, j], rows, column)
+        for ax in axes[:, j]:
+            if column != "ipc" and np.nanmax(rows[column].to_numpy(dtype="float64"), initial=0) > 0:
+                ax.set_yscale("log")
+            ax.set_ylabel(label)
+            ax.grid(True, which="both", ls="--", linewidth=0.5)
+        axes[0, j].set_title(f"{label} vs. Matrix Size")
+        axes[1, j].set_title(f"{label} vs. Workers")
+    # One legend per row, on the first panel with lines (the counters that
+    # are not available leave their panels empty)
+    for row in axes:
+        drawn = [ax for ax in row if ax.get_lines()]
+        if drawn:
+            drawn[0].legend(fontsize="small")
+    fig.tight_layout()
+    figs.append(("miss_rates", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["mpi"]
+
+def phase_rows(table):
+    """
+    Returns the MPI rows with phase times of the full symmetry check (with
+    the rows partition, when the table has partitions), one per (mode, pack,
+    workers, n_matrix).
+    """
+    rows = results.select(table, "mpi")
+    rows = rows[rows["sym"] == "full"]
+    if "partition" in rows.columns:
+        rows = rows[rows["partition"] == "rows"]
+    rows = rows.dropna(subset=[f"phase_{phase}_mean" for phase in results.PHASES], how="all")
+    keys = ["mode", "pack", "workers", "n_matrix"]
+    columns = ["checksym_time", "transpose_time"] + results.PHASE_COLUMNS
+    return rows.groupby(keys, as_index=False, observed=True)[columns].mean()
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # The results without the phase columns have nothing to draw
+    if any(c not in table.columns for c in results.PHASE_COLUMNS):
+        return figs
+    rows = phase_rows(table)
+
+    # ========== Phase times vs. processes, one figure per layout and packing ========== #
+    for (mode, pack), config in rows.groupby(["mode", "pack"], observed=True):
+        sizes = sorted(config["n_matrix"].unique())
+        cols = min(3, len(sizes))
+        lines = math.ceil(len(sizes) / cols)
+        fig, axes = plt.subplots(lines, cols, figsize=(6 * cols, 4.5 * lines + 0.5), squeeze=False)
+        for ax, n in zip(axes.flat, sizes):
+            sub = config[config["n_matrix"] == n].sort_values("workers")
+            x = np.arange(len(sub))
+            bottom = np.zeros(len(sub))
+            # Mean time of the processes in every phase, stacked; the distribute
+            # phase runs once before the repetitions, so it goes on top of the
+            # phases of the kernels
+            for i, phase in enumerate(results.PHASES):
+                if phase == "distribute":
+                    continue
+                height = np.nan_to_num(sub[f"phase_{phase}_mean"].to_numpy(dtype="float64"))
+                ax.bar(x, height, bottom=bottom, color=f"C{i}", label=phase)
+                bottom += height
+            height = np.nan_to_num(sub["phase_distribute_mean"].to_numpy(dtype="float64"))
+            ax.bar(x, height, bottom=bottom, color="C0", alpha=0.4, hatch="//", label="distribute (once)")
+            # Measured time of the kernels, to compare with the phases below distribute
+            ax.plot(x, sub["checksym_time"] + sub["transpose_time"], "k_", markersize=20, mew=2,
+                    label="checkSym + transpose")
+            ax.set_xticks(x)
+            ax.set_xticklabels(sub["workers"].astype(int))
+            ax.set_xlabel("Number of Processes (p)")
+            ax.set_ylabel("Time (s) - mean over the processes")
+            ax.set_title(f"n={n}")
+            ax.grid(True, axis="y", ls="--", linewidth=0.5)
+        for ax in list(axes.flat)[len(sizes):]:
+            ax.set_visible(False)
+        fig.suptitle(f"MPI Phase Breakdown ({mode}, {pack})")
+        fig.legend(*axes[0, 0].get_legend_handles_labels(), loc="upper center", ncol=7, fontsize="small",
+                   bbox_to_anchor=(0.5, 0.96))
+        fig.tight_layout(rect=(0, 0, 1, 0.93))
+        figs.append((f"{mode}_{pack}", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+
+import matplotlib.pyplot as plt
+
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["omp", "mpi"]
+
+# Backend drawn in one more line of panels, when measured
+HYBRID = "hybrid"
+
+# Binding policies of bench.py (--bind), in drawing order
+BINDINGS = ["default", "none", "close", "spread", "socket", "numa"]
+
+# Page placements of omp.cpp (--init): serial solid, first-touch dashed
+INITS = {"serial": "-", "first-touch": "--"}
+
+def best_per_placement(table):
+    """
+    Returns the rows of the full symmetry check with the rows partition, one
+    per (backend, workers, n_matrix, binding, init): the lowest time of each
+    kernel over the other options (e.g. the tile of the transpose, or the
+    split of the hybrid workers in processes x threads). The backends without
+    an init column get the serial one, the hybrid one has neither sym nor
+    partition.
+    """
+    rows = table[table["sym"].isna() | (table["sym"] == "full")]
+    if "partition" in rows.columns:
+        rows = rows[rows["partition"].isna() | (rows["partition"] == "rows")]
+    rows = rows.dropna(subset=["binding"]).copy()
+    if "init" not in rows.columns:
+        rows["init"] = "serial"
+    rows["init"] = rows["init"].astype("object").fillna("serial")
+    keys = ["backend", "workers", "n_matrix", "binding", "init"]
+    return rows.groupby(keys, as_index=False, observed=True)[["checksym_time", "transpose_time"]].min()
+
+def plot_placements(ax, rows, backend, kernel):
+    """
+    Draws the time of a kernel of every binding and init of a backend against
+    the number of workers, for the largest matrix measured by the backend.
+    """
+    sub = rows[rows["backend"] == backend]
+    if len(sub) == 0:
+        ax.set_visible(False)
+        return
+    n = sub["n_matrix"].max()
+    sub = sub[sub["n_matrix"] == n]
+    for i, binding in enumerate(BINDINGS):
+        for init, style in INITS.items():
+            line = sub[(sub["binding"] == binding) & (sub["init"] == init)].sort_values("workers")
+            if len(line):
+                label = binding if backend != "omp" else f"{binding}, {init}"
+                ax.plot(line["workers"], line[f"{kernel}_time"], marker='o', ls=style, color=f"C{i}", label=label)
+    ax.set_xscale("log", base=2)
+    ax.set_yscale("log")
+    ax.set_xlabel("Number of Threads/Processes (p)")
+    ax.set_ylabel(f"Time (s) - {kernel}")
+    ax.set_title(f"{backend} (n={n})")
+    ax.grid(True, which="both", ls="--", linewidth=0.5)
+    ax.legend(fontsize="small")
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # The results without the binding column have nothing to draw
+    if "binding" not in table.columns:
+        return figs
+    rows = best_per_placement(table)
+
+    # ========== Kernel times of the placements ========== #
+    backends = BACKENDS + ([HYBRID] if (rows["backend"] == HYBRID).any() else [])
+    fig, axes = plt.subplots(len(backends), 2, figsize=(14, 5.5 * len(backends)), squeeze=False)
+    for line, backend in zip(axes, backends):
+        for ax, kernel in zip(line, ("checksym", "transpose")):
+            plot_placements(ax, rows, backend, kernel)
+    fig.suptitle("Thread/Process Binding and Page Placement")
+    fig.tight_layout()
+    figs.append(("times", fig))
+
+    return figs
+
+def main():
+    # The hybrid panels are optional, as in report.py
+    optional = [HYBRID] if os.path.exists(results.results_path(HYBRID)) else []
+    figures(results.load_table(BACKENDS + optional))
+    plt.show()
+
+if __name__ == "__main__":
+    main()
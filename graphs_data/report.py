@@ -0,0 +1,107 @@
+"""
+Renders every figure of the graph scripts in a single run.
+
+The results are loaded and averaged once, then the figures of every script
+(sequential.py ... report_strong_scaling_efficiency.py) are drawn with the
+non-interactive Agg backend and saved to files, optionally rendering the
+scripts in parallel on a process pool.
+
+Usage: python3 report.py [--out figures] [--formats png,svg,pdf] [--jobs N]
+                         [--stat mean|median|trimmed|min] [--ci 0.95] [--outliers 3.5]
+"""
+import argparse
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+import results
+import stats
+
+# Graph scripts rendered by the report, in the order of the README
+SCRIPTS = [
+    "sequential",
+    "mpi",
+    "omp",
+    "strong_scaling_mpi",
+    "strong_scaling_omp",
+    "weak_scaling",
+    "report_times",
+    "report_strong_scaling_efficiency",
+    "tile_size",
+    "hybrid",
+    "io_scaling",
+    "tuning",
+    "perf_counters",
+    "load_imbalance",
+    "phase_breakdown",
+    "placement",
+]
+
+
+def render(script, table, out_dir, formats):
+    """
+    Draws the figures of one script and saves every figure in every format,
+    as <out_dir>/<script>_<figure>.<format>. Returns the written paths.
+    """
+    module = importlib.import_module(script)
+    paths = []
+    for name, fig in module.figures(table):
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{script}_{name}.{fmt}")
+            fig.savefig(path, format=fmt)
+            paths.append(path)
+        plt.close(fig)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every figure of the report to files.")
+    parser.add_argument("--data-dir", default=".", help="folder with the results CSV files")
+    parser.add_argument("--out", default="figures", help="output folder of the figures")
+    parser.add_argument("--formats", default="png", help="comma separated list of png, svg, pdf")
+    parser.add_argument("--jobs", type=int, default=1, help="number of processes rendering the scripts")
+    parser.add_argument("--stat", default="mean", choices=stats.STATS, help="statistic of the iterations of every configuration")
+    parser.add_argument("--ci", type=float, help="level of the bootstrap confidence intervals drawn as bands (e.g. 0.95)")
+    parser.add_argument("--outliers", type=float, help="reject the iterations farther than this many scaled MADs from the median")
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS, help="scripts to render (default: all)")
+    args = parser.parse_args()
+
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    for fmt in formats:
+        if fmt not in ("png", "svg", "pdf"):
+            parser.error(f"unsupported format '{fmt}'")
+    for script in args.scripts:
+        if script not in SCRIPTS:
+            parser.error(f"unknown script '{script}'")
+    if args.ci is not None and not 0 < args.ci < 1:
+        parser.error("--ci must be between 0 and 1")
+
+    # Load every available backend once; scripts missing one of theirs are skipped
+    table = results.load_table(data_dir=args.data_dir, stat=args.stat, ci=args.ci, outliers=args.outliers)
+    available = set(table["backend"].astype(str))
+    scripts = []
+    for script in args.scripts:
+        missing = [b for b in importlib.import_module(script).BACKENDS if b not in available]
+        if missing:
+            print(f"Skipping {script}: no results for {', '.join(missing)}", file=sys.stderr)
+        else:
+            scripts.append(script)
+
+    os.makedirs(args.out, exist_ok=True)
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [pool.submit(render, s, table, args.out, formats) for s in scripts]
+            written = [path for future in futures for path in future.result()]
+    else:
+        written = [path for s in scripts for path in render(s, table, args.out, formats)]
+
+    print(f"Written {len(written)} files to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,32 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
-    # ======== 1) Reading the Sequential CSV ======== #
-    seq_df = pd.read_csv("sequential_results.csv")
-    # Group by n_matrix and calculate the mean
-    seq_grouped = seq_df.groupby("n_matrix", as_index=False).mean()
-    seq_grouped.sort_values("n_matrix", inplace=True)
-
-    # ======== 2) Reading the OMP CSV ======== #
-    omp_df = pd.read_csv("omp_results.csv")
-    # Group by (n_threads, n_matrix) and calculate the mean
-    omp_grouped = omp_df.groupby(["n_threads", "n_matrix"], as_index=False).mean()
-    # Filter for n_threads == 32
-    omp_32 = omp_grouped[omp_grouped["n_threads"] == 32].copy()
-    omp_32.sort_values("n_matrix", inplace=True)
-
-    # ======== 3) Reading the MPI CSV ======== #
-    mpi_df = pd.read_csv("mpi_results.csv")
-    # Group by (n_processes, n_matrix) and calculate the mean
-    mpi_grouped = mpi_df.groupby(["n_processes", "n_matrix"], as_index=False).mean()
-    # Filter for n_processes == 32
-    mpi_32 = mpi_grouped[mpi_grouped["n_processes"] == 32].copy()
-    mpi_32.sort_values("n_matrix", inplace=True)
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["seq", "omp", "mpi"]
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # One row per (backend, workers, n_matrix): the best measured configuration
+    table = results.best(table)
+
+    # ======== Selecting the averaged results ======== #
+    # 1) Sequential
+    seq_grouped = results.select(table, "seq")
+    # 2) OMP with 32 threads
+    omp_32 = results.select(table, "omp", workers=32)
+    # 3) MPI with 32 processes
+    mpi_32 = results.select(table, "mpi", workers=32)
+    # 4) NumPy kernels of pytranspose, as a reference when they were measured
+    numpy_grouped = results.select(table, "numpy")
 
     # ======== PLOT 1: CheckSym Time ======== #
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
 
     # Sequential
     plt.plot(seq_grouped["n_matrix"], seq_grouped["checksym_time"], 
@@ -39,6 +40,11 @@ def main():
     plt.plot(mpi_32["n_matrix"], mpi_32["checksym_time"], 
              marker='o', label="MPI - 32 processes")
 
+    # NumPy
+    if len(numpy_grouped) > 0:
+        plt.plot(numpy_grouped["n_matrix"], numpy_grouped["checksym_time"],
+                 marker='s', ls="--", label="NumPy")
+
     plt.xscale("log")  
     plt.yscale("log")
     plt.xlabel("Matrix Dimension (n)")
@@ -47,10 +53,10 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("checksym_time", fig))
 
     # ======== PLOT 2: Transpose Time ======== #
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
 
     # Sequential
     plt.plot(seq_grouped["n_matrix"], seq_grouped["transpose_time"], 
@@ -64,6 +70,11 @@ def main():
     plt.plot(mpi_32["n_matrix"], mpi_32["transpose_time"], 
              marker='o', label="MPI - 32 processes")
 
+    # NumPy
+    if len(numpy_grouped) > 0:
+        plt.plot(numpy_grouped["n_matrix"], numpy_grouped["transpose_time"],
+                 marker='s', ls="--", label="NumPy")
+
     plt.xscale("log")  
     plt.yscale("log")  
 
@@ -73,6 +84,12 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
+    figs.append(("transpose_time", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
     plt.show()
 
 if __name__ == "__main__":
@@ -0,0 +1,394 @@
+"""
+Shared loading of the benchmark result CSVs.
+
+Every graph script reads the same CSV files, so this module parses each of them
+only once, with explicit compact dtypes, and keeps a binary columnar copy in
+.results_cache/ next to the CSV. The copy is reused as long as the size, the
+modification time and the hash of the head/tail of the CSV do not change;
+when rows were only appended to the CSV (e.g. by a campaign of bench.py that
+is still running) just the new rows are parsed and added to the copy.
+The scripts get the already averaged (backend, workers, n_matrix) table; the
+samples can also be reduced with a robust statistic and confidence intervals
+(see stats.py).
+"""
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import stats
+
+# Results file and worker column of every backend (None = always one worker,
+# a tuple = the workers are the product of the columns, which are kept)
+BACKENDS = {
+    "seq": ("sequential_results.csv", None),
+    "omp": ("omp_results.csv", "n_threads"),
+    "mpi": ("mpi_results.csv", "n_processes"),
+    "hybrid": ("hybrid_results.csv", ("n_processes", "n_threads")),
+    "numpy": ("numpy_results.csv", None),
+    "ooc": ("ooc_results.csv", None),
+    "mpi4py": ("mpi4py_results.csv", "n_processes"),
+    "shm": ("shm_results.csv", "n_threads"),
+    # Every configuration measured by the autotuner (codes_and_jobs/tune.py)
+    "tune": ("tune_results.csv", "n_threads"),
+}
+
+# Worker columns of the backends with several of them, kept in the table
+SPLIT_COLUMNS = sorted({c for _, w in BACKENDS.values() if isinstance(w, tuple) for c in w})
+
+# Explicit dtypes of the known columns; any other "*_time" column, the
+# counters, the work times and the phase times are float64
+DTYPES = {
+    "n_threads": "int16",
+    "n_processes": "int16",
+    "n_matrix": "int32",
+    "iteration": "int32",
+    "checksym_time": "float64",
+    "transpose_time": "float64",
+    "io_time": "float64",
+    "tile": "int16",
+}
+
+# Hardware counters of the kernels written by the binaries ("<kernel>_<event>",
+# nan unless they ran with --perf, see codes_and_jobs/perf.h), averaged like
+# the timings
+PERF_EVENTS = ("cycles", "instructions", "l1d_misses", "llc_misses", "dtlb_misses")
+COUNTER_COLUMNS = [f"{kernel}_{event}" for kernel in ("checksym", "transpose") for event in PERF_EVENTS]
+
+# Smallest, mean and largest time the threads/processes of the omp and mpi
+# backends spend checking their rows in the symmetry check, averaged like the
+# timings: their spread is the load imbalance of the partition
+WORK_COLUMNS = ["checksym_work_min", "checksym_work_mean", "checksym_work_max"]
+
+# Smallest, mean and largest time the processes of the mpi backend spend in
+# every phase of a repetition ("phase_<phase>_<stat>", see
+# codes_and_jobs/mpi.cpp), averaged like the timings
+PHASES = ("distribute", "compute", "pack", "communicate", "unpack", "reduce")
+PHASE_COLUMNS = [f"phase_{phase}_{stat}" for phase in PHASES for stat in ("min", "mean", "max")]
+
+# Columns that describe the run configuration (kept as keys when averaging):
+# tile = tile size of the blocked transpose (0 = element-wise),
+# sym = symmetry check variant (full, blocked or early),
+# mode = data layout of MPI (replicated or distributed),
+# pack = packing of the MPI transpose (manual loops or derived datatypes),
+# schedule = OpenMP schedule of the loops (kind[:chunk]),
+# partition = sharing of the rows of the full symmetry check (rows, triangular or paired),
+# init = placement of the pages of the matrices (serial or first-touch),
+# binding = placement of the threads/processes (the --bind policy of bench.py)
+CONFIG_COLUMNS = ["tile", "sym", "mode", "pack", "schedule", "partition", "init", "binding"]
+
+# Configurations that skip part of the work, so their times are not comparable
+# with the others (the early exit stops at the first asymmetric pair)
+PARTIAL_WORK = {"sym": ["early"]}
+
+CACHE_DIR = ".results_cache"
+CACHE_VERSION = 6
+
+# Bytes hashed at the beginning and at the end of the CSV for the cache key
+_HASH_CHUNK = 1 << 20
+
+# Raw tables already loaded by this process, keyed by CSV path
+_loaded = {}
+
+
+def _prefix_hash(path, end):
+    """
+    Returns a hash of the first and last megabyte of the first end bytes of
+    the file (hashing millions of rows on every run would cost as much as
+    parsing them).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(min(_HASH_CHUNK, end)))
+        if end > _HASH_CHUNK:
+            f.seek(max(_HASH_CHUNK, end - _HASH_CHUNK))
+            h.update(f.read(end - f.tell()))
+    return h.hexdigest()
+
+
+def _fingerprint(path):
+    """
+    Returns the cache key of the CSV file: size, mtime and the hash of its
+    head and tail.
+    """
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": _prefix_hash(path, st.st_size)}
+
+
+def _complete_end(path, size):
+    """
+    Returns the length of the complete lines of the file, leaving out a last
+    line that is still being written.
+    """
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - _HASH_CHUNK)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _column_dtype(column):
+    if column in DTYPES:
+        return DTYPES[column]
+    if column.endswith("_time") or column in COUNTER_COLUMNS or column in WORK_COLUMNS or column in PHASE_COLUMNS:
+        return "float64"
+    return None
+
+
+def _parse_csv(path, start=0, end=None):
+    """
+    Parses the bytes [start, end) of a results CSV (the whole file by
+    default; start is 0 or the beginning of a line) with explicit dtypes.
+    Rows written as ERROR by the jobs are dropped, as they carry no timing; a
+    single missing timing (nan, e.g. io_time of the MPI runs without MPI-IO)
+    is kept as NaN.
+    """
+    header = pd.read_csv(path, nrows=0, skipinitialspace=True).columns
+    columns = [c.strip() for c in header]
+    dtypes = {}
+    for c in columns:
+        dtype = _column_dtype(c)
+        # Timings and configuration values are parsed as float first, so that
+        # ERROR becomes NaN; they get their final dtype once those rows are gone
+        if dtype is None:
+            dtypes[c] = "category"
+        elif dtype.startswith("float") or c in CONFIG_COLUMNS:
+            dtypes[c] = "float64"
+        else:
+            dtypes[c] = dtype
+
+    source = path
+    if end is not None:
+        with open(path, "rb") as f:
+            f.seek(start)
+            source = io.BytesIO(f.read(end - start))
+    df = pd.read_csv(
+        source,
+        header=0 if start == 0 else None,
+        names=columns,
+        dtype=dtypes,
+        skipinitialspace=True,
+        na_values=["ERROR"],
+        on_bad_lines="skip",
+    )
+    timing = [c for c in columns if c.endswith("_time")]
+    df = df.dropna(subset=timing, how="all").reset_index(drop=True)
+    for c in columns:
+        if dtypes[c] == "float64":
+            df[c] = df[c].astype(_column_dtype(c))
+    return df
+
+
+def _cache_path(path):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    return os.path.join(folder, os.path.basename(path) + ".npz")
+
+
+def _read_cache(path):
+    """
+    Returns the cached table of the CSV and the metadata of the cache, or
+    (None, None) when there is no usable cache.
+    """
+    cache = _cache_path(path)
+    if not os.path.exists(cache):
+        return None, None
+    try:
+        with np.load(cache, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"]))
+            if meta.get("version") != CACHE_VERSION:
+                return None, None
+            df = pd.DataFrame({c: data[c] for c in meta["columns"]})
+    except (OSError, ValueError, KeyError):
+        return None, None
+    for c in meta["categories"]:
+        df[c] = df[c].astype("category")
+    return df, meta
+
+
+def _append_rows(df, new):
+    """
+    Returns the rows of new appended to df, with the categories merged.
+    """
+    if len(new) == 0:
+        return df
+    categories = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    df = pd.concat([df, new], ignore_index=True)
+    for c in categories:
+        df[c] = df[c].astype(str).astype("category")
+    return df
+
+
+def _write_cache(path, fingerprint, parsed, df):
+    cache = _cache_path(path)
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    categories = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    arrays = {}
+    for c in df.columns:
+        if c in categories:
+            arrays[c] = df[c].astype(str).to_numpy(dtype=str)
+        else:
+            arrays[c] = df[c].to_numpy()
+    meta = {
+        "version": CACHE_VERSION,
+        "source": fingerprint,
+        # Length of the parsed lines of the CSV and hash of their head/tail
+        "parsed": parsed,
+        "prefix": _prefix_hash(path, parsed),
+        "columns": list(df.columns),
+        "categories": categories,
+    }
+    arrays["__meta__"] = np.array(json.dumps(meta))
+    # Write next to the final file and rename, so readers never see half a cache
+    tmp = cache + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, cache)
+
+
+def results_path(backend, data_dir="."):
+    """
+    Returns the path of the results CSV of a backend.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {sorted(BACKENDS)}")
+    return os.path.join(data_dir, BACKENDS[backend][0])
+
+
+def load_raw(backend, data_dir="."):
+    """
+    Returns every sample of a backend, one row per iteration, with the dtypes
+    of DTYPES. The parsed table is cached both on disk and in this process;
+    when the CSV only grew since it was cached, only the new lines are parsed.
+    """
+    path = results_path(backend, data_dir)
+    fingerprint = _fingerprint(path)
+    key = os.path.abspath(path)
+
+    memo = _loaded.get(key)
+    if memo is not None and memo[0] == fingerprint:
+        return memo[1]
+
+    df, meta = _read_cache(path)
+    if df is None or meta["source"] != fingerprint:
+        end = _complete_end(path, fingerprint["size"])
+        if df is not None and meta["parsed"] <= end and _prefix_hash(path, meta["parsed"]) == meta["prefix"]:
+            # Same lines as the cache, plus the ones appended since then
+            df = _append_rows(df, _parse_csv(path, meta["parsed"], end))
+        else:
+            df = _parse_csv(path, 0, end)
+        try:
+            _write_cache(path, fingerprint, end, df)
+        except OSError:
+            # A read-only data directory only costs us the cache
+            pass
+
+    _loaded[key] = (fingerprint, df)
+    return df
+
+
+def aggregate(df, backend, stat="mean", ci=None, outliers=None):
+    """
+    Averages the samples of a backend over the iterations and returns them in
+    the common layout: backend, workers, n_matrix, configuration columns and
+    the timing columns (plus the worker columns when there are several),
+    and the hardware counters, work times and phase times when the file has
+    them. stat, ci and outliers
+    select the statistic of the iterations, the level of the confidence
+    intervals of the timings ("<column>_lo" and "<column>_hi") and the
+    outlier rejection, as in stats.summarize.
+    """
+    worker_column = BACKENDS[backend][1]
+    config = [c for c in CONFIG_COLUMNS if c in df.columns]
+    timing = [c for c in df.columns if c.endswith("_time")]
+    counters = [c for c in COUNTER_COLUMNS + WORK_COLUMNS + PHASE_COLUMNS if c in df.columns]
+
+    df = df.copy()
+    split = []
+    if worker_column is None:
+        df["workers"] = np.int16(1)
+    elif isinstance(worker_column, tuple):
+        split = list(worker_column)
+        df["workers"] = df[split].prod(axis=1).astype("int16")
+    else:
+        df["workers"] = df[worker_column]
+    keys = ["workers"] + split + ["n_matrix"] + config
+
+    grouped = stats.summarize(df, keys, timing, stat=stat, ci=ci, outliers=outliers)
+    if counters:
+        # Same groups in the same order, without the bootstrap of the timings
+        counts = stats.summarize(df, keys, counters, stat=stat, outliers=outliers)
+        for c in counters:
+            grouped[c] = counts[c].to_numpy()
+    grouped.insert(0, "backend", backend)
+    return grouped
+
+
+def load_table(backends=None, data_dir=".", stat="mean", ci=None, outliers=None):
+    """
+    Returns the averaged table of the requested backends, one row per
+    (backend, workers, n_matrix) and configuration (see CONFIG_COLUMNS).
+    With backends=None every backend whose results file exists is loaded.
+    stat, ci and outliers are passed to aggregate.
+    """
+    if backends is None:
+        backends = [b for b in BACKENDS if os.path.exists(results_path(b, data_dir))]
+
+    tables = [aggregate(load_raw(b, data_dir), b, stat, ci, outliers) for b in backends]
+    if not tables:
+        raise FileNotFoundError(f"No results CSV found in '{os.path.abspath(data_dir)}'")
+
+    table = pd.concat(tables, ignore_index=True, sort=False)
+    table["backend"] = table["backend"].astype("category")
+    return table
+
+
+def best(table):
+    """
+    Collapses the configuration columns: returns, for every (backend, workers,
+    n_matrix), the lowest average time of each kernel over all the
+    configurations that were measured (e.g. the best tile size, or the best
+    split of the workers in processes x threads), leaving out the PARTIAL_WORK
+    ones. The statistics, the hardware counters and the work times of a
+    kernel ("<kernel>_time_lo", "<kernel>_cycles", "<kernel>_work_max", ...)
+    are taken from the same configuration as its time.
+    """
+    config = [c for c in CONFIG_COLUMNS + SPLIT_COLUMNS if c in table.columns]
+    if not config:
+        return table
+    for column, values in PARTIAL_WORK.items():
+        if column in table.columns:
+            table = table[~table[column].isin(values)]
+    timing = [c for c in table.columns if c.endswith("_time")]
+    keys = ["backend", "workers", "n_matrix"]
+    out = table.groupby(keys, as_index=False, observed=True, sort=True)[timing].min()
+    for c in timing:
+        kernel = c[: -len("_time")]
+        extra = [s for s in table.columns
+                 if s.startswith(c + "_")
+                 or ((s in COUNTER_COLUMNS or s in WORK_COLUMNS) and s.startswith(kernel + "_"))]
+        if extra:
+            measured = table.dropna(subset=[c])
+            rows = measured.loc[measured.groupby(keys, observed=True)[c].idxmin(), keys + extra]
+            out = out.merge(rows, on=keys, how="left")
+    return out
+
+
+def select(table, backend, workers=None, n_matrix=None):
+    """
+    Returns the rows of one backend (optionally for a single workers count or
+    matrix size), sorted by workers and n_matrix.
+    """
+    rows = table[table["backend"] == backend]
+    if workers is not None:
+        rows = rows[rows["workers"] == workers]
+    if n_matrix is not None:
+        rows = rows[rows["n_matrix"] == n_matrix]
+    return rows.sort_values(["workers", "n_matrix"])
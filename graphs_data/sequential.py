@@ -1,19 +1,32 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
-    # Read the CSV file
-    df = pd.read_csv("sequential_results.csv")
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["seq"]
 
-    # Group data by matrix dimension
-    grouped = df.groupby("n_matrix")
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
 
-    # Calculate the average times for checksym and transpose operations
-    mean_df = grouped[["checksym_time", "transpose_time"]].mean().reset_index()
+    # One row per (backend, workers, n_matrix): the best measured configuration
+    table = results.best(table)
+
+    # Read the average times for checksym and transpose operations
+    mean_df = results.select(table, "seq")
+    # Other single-worker implementations, drawn as a reference when they were
+    # measured: the NumPy kernels of pytranspose and the out-of-core transpose
+    references = [("NumPy", results.select(table, "numpy")), ("out-of-core", results.select(table, "ooc"))]
 
     # Plot CheckSym Time vs. Matrix Dimension (log-log scale)
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     plt.plot(mean_df["n_matrix"], mean_df["checksym_time"], marker='o', label="CheckSym Time")
+    for label, ref_df in references:
+        if len(ref_df) > 0:
+            plt.plot(ref_df["n_matrix"], ref_df["checksym_time"], marker='s', ls="--", label=f"CheckSym Time ({label})")
     plt.xscale("log")
     plt.yscale("log")
     plt.xlabel("Matrix Dimension (n)")
@@ -22,11 +35,14 @@ def main():
     plt.grid(True, which="both", ls="--", linewidth=0.5)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("checksym_time", fig))
 
     # Plot Transpose Time vs. Matrix Dimension (log-log scale)
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
     plt.plot(mean_df["n_matrix"], mean_df["transpose_time"], marker='o', color="red", label="Transpose Time")
+    for label, ref_df in references:
+        if len(ref_df) > 0:
+            plt.plot(ref_df["n_matrix"], ref_df["transpose_time"], marker='s', ls="--", label=f"Transpose Time ({label})")
     plt.xscale("log")
     plt.yscale("log")
     plt.xlabel("Matrix Dimension")
@@ -35,6 +51,12 @@ def main():
     plt.grid(True, which="both", ls="--", linewidth=0.5)
     plt.legend()
     plt.tight_layout()
+    figs.append(("transpose_time", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
     plt.show()
 
 if __name__ == "__main__":
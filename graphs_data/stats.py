@@ -0,0 +1,154 @@
+"""
+Summary statistics of the benchmark samples.
+
+The averaged tables of results.py reduce the repetitions of every
+configuration to one time, and a few repetitions slowed down by the OS (most
+visible at the small sizes) can move the mean a lot. This module reduces the
+samples of every group with the mean, the median, a trimmed mean or the
+minimum, optionally after rejecting the outliers by their median absolute
+deviation (MAD), and computes percentiles and bootstrap confidence intervals.
+All the groups are reduced at once: the samples are packed in a
+(groups x samples) array, sorted in every row and padded with NaN.
+"""
+import numpy as np
+
+# Statistics reducing the samples of a group to one value
+STATS = ("mean", "median", "trimmed", "min")
+
+# Scale of the MAD that makes it estimate the standard deviation of normal samples
+MAD_SCALE = 1.4826
+
+# Elements of the bootstrap resamples drawn at once, to bound the memory
+_BOOT_CHUNK = 1 << 22
+
+
+def reject_outliers(df, keys, columns, threshold=3.5):
+    """
+    Returns a copy of the samples where the values of columns farther than
+    threshold scaled MADs from the median of their group (keys) are NaN.
+    Groups with a MAD of 0 keep every value.
+    """
+    df = df.copy()
+    by = [df[k] for k in keys]
+    for c in columns:
+        median = df[c].groupby(by, observed=True, sort=False).transform("median")
+        deviation = (df[c] - median).abs()
+        mad = deviation.groupby(by, observed=True, sort=False).transform("median") * MAD_SCALE
+        df.loc[(mad > 0) & (deviation > threshold * mad), c] = np.nan
+    return df
+
+
+def _pack(values, group, n_groups):
+    """
+    Returns the values in a (n_groups x max count) array, one row per group
+    id, sorted in every row and padded with NaN at the end, and the count of
+    values of every group. NaN values and group ids < 0 are left out.
+    """
+    valid = ~np.isnan(values) & (group >= 0)
+    values, group = values[valid], group[valid]
+    order = np.lexsort((values, group))
+    values, group = values[order], group[order]
+
+    counts = np.bincount(group, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(values)) - starts[group]
+    packed = np.full((n_groups, max(counts.max(initial=0), 1)), np.nan)
+    packed[group, position] = values
+    return packed, counts
+
+
+def _take(packed, index):
+    """
+    Returns packed[..., index] for one index per row (index has the shape of
+    packed without the last axis).
+    """
+    index = np.clip(index, 0, packed.shape[-1] - 1)
+    return np.take_along_axis(packed, index[..., None], axis=-1)[..., 0]
+
+
+def _percentile(packed, counts, q):
+    """
+    Returns the q-th percentile of every row of packed, with the linear
+    interpolation of numpy.percentile.
+    """
+    position = (counts - 1) * (q / 100.0)
+    below = np.floor(position).astype(np.int64)
+    above = np.ceil(position).astype(np.int64)
+    low = _take(packed, below)
+    return np.where(counts > 0, low + (_take(packed, above) - low) * (position - below), np.nan)
+
+
+def _center(packed, counts, stat, trim):
+    """
+    Returns the statistic stat of every row of packed (sorted rows of counts
+    values, padded with NaN; any leading shape). trimmed is the mean without
+    the lowest and highest trim fraction of the values.
+    """
+    if stat == "min":
+        return np.where(counts > 0, packed[..., 0], np.nan)
+    if stat == "median":
+        return _percentile(packed, counts, 50)
+
+    position = np.arange(packed.shape[-1])
+    cut = np.floor(trim * counts).astype(np.int64) if stat == "trimmed" else np.zeros_like(counts)
+    keep = (position >= cut[..., None]) & (position < (counts - cut)[..., None])
+    kept = counts - 2 * cut
+    total = np.where(keep, packed, 0.0).sum(axis=-1)
+    return np.divide(total, kept, out=np.full(total.shape, np.nan), where=kept > 0)
+
+
+def _bootstrap(packed, counts, stat, trim, ci, n_boot, rng):
+    """
+    Returns the bounds of the percentile bootstrap confidence interval, with
+    level ci, of the statistic stat of every row of packed.
+    """
+    n_groups, width = packed.shape
+    lo = np.full(n_groups, np.nan)
+    hi = np.full(n_groups, np.nan)
+    step = max(1, _BOOT_CHUNK // (n_boot * width))
+    for start in range(0, n_groups, step):
+        rows = slice(start, start + step)
+        c = counts[rows]
+        # n_boot resamples with replacement of the c values of every group
+        index = (rng.random((len(c), n_boot, width)) * c[:, None, None]).astype(np.int64)
+        samples = np.take_along_axis(packed[rows][:, None, :], index, axis=2)
+        samples = np.where(np.arange(width) < c[:, None, None], samples, np.nan)
+        samples.sort(axis=2)
+        estimates = _center(samples, np.broadcast_to(c[:, None], (len(c), n_boot)), stat, trim)
+        valid = c > 0
+        if valid.any():
+            bounds = np.quantile(estimates[valid], [(1 - ci) / 2, (1 + ci) / 2], axis=1)
+            lo[start + np.flatnonzero(valid)] = bounds[0]
+            hi[start + np.flatnonzero(valid)] = bounds[1]
+    return lo, hi
+
+
+def summarize(df, keys, columns, stat="mean", trim=0.1, percentiles=(), ci=None, n_boot=1000,
+              outliers=None, seed=0):
+    """
+    Reduces the samples of every group of keys to one row: the keys, the
+    statistic stat (one of STATS) of every column, under the column name, its
+    percentiles as "<column>_p<q>" and, with a level ci (e.g. 0.95), the
+    bounds of its bootstrap confidence interval as "<column>_lo" and
+    "<column>_hi". trim is the fraction cut at each end by the trimmed mean.
+    With outliers (a threshold in scaled MADs, e.g. 3.5) the outliers of every
+    group are left out first (see reject_outliers). NaN samples are ignored.
+    """
+    if stat not in STATS:
+        raise ValueError(f"unknown statistic '{stat}', expected one of {', '.join(STATS)}")
+    if outliers is not None:
+        df = reject_outliers(df, keys, columns, outliers)
+
+    grouped = df.groupby(keys, observed=True, sort=True)
+    group = grouped.ngroup().to_numpy()
+    out = grouped.size().reset_index()[keys]
+    rng = np.random.default_rng(seed)
+
+    for c in columns:
+        packed, counts = _pack(df[c].to_numpy(dtype="float64"), group, len(out))
+        out[c] = _center(packed, counts, stat, trim)
+        for q in percentiles:
+            out[f"{c}_p{q:g}"] = _percentile(packed, counts, q)
+        if ci is not None:
+            out[f"{c}_lo"], out[f"{c}_hi"] = _bootstrap(packed, counts, stat, trim, ci, n_boot, rng)
+    return out
@@ -1,16 +1,25 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
-    # 1) Read MPI results from the CSV file
-    # Format: n_processes, n_matrix, iteration, checksym_time, transpose_time
-    df = pd.read_csv("mpi_results.csv")
+import metrics
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["mpi"]
 
-    # 2) Group data by (n_processes, n_matrix) and calculate the mean
-    grouped = df.groupby(["n_processes", "n_matrix"], as_index=False).mean()
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
 
-    # 3) Get the set of unique matrix dimensions (each considered a fixed "problem")
-    matrix_sizes = sorted(grouped["n_matrix"].unique())
+    # One row per (backend, workers, n_matrix): the best measured configuration
+    table = results.best(table)
+
+    # Compute speedup and efficiency of every (n_matrix, workers) of the table
+    # at once; each matrix dimension is considered a fixed "problem". With
+    # confidence intervals in the table they are drawn as bands
+    scaling = metrics.strong_scaling(table)
 
     # Prepare plots: Four separate ones will be created
     #  A) Speedup CheckSym
@@ -19,31 +28,12 @@ def main():
     #  D) Efficiency Transpose
 
     # =========== A) STRONG SCALING - SPEEDUP CHECKSYM =========== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_processes", inplace=True)
-
-        row_T1 = sub_df[sub_df["n_processes"] == 1]
-        if len(row_T1) == 0:
-            continue
-
-        T1_checksym = row_T1["checksym_time"].values[0]
-
-        speedups = []
-        procs = []
-        for _, row in sub_df.iterrows():
-            p = row["n_processes"]
-            Tp_checksym = row["checksym_time"]
-            if Tp_checksym > 0:
-                s = T1_checksym / Tp_checksym
-            else:
-                s = float("inf")
-            speedups.append(s)
-            procs.append(p)
+    fig = plt.figure(figsize=(8, 6))
 
-        plt.plot(procs, speedups, marker='o', label=f"n={n}")
+    for n, sub_df in metrics.select(scaling, "mpi", "checksym").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["speedup"], marker='o', label=f"n={n}")
+        if "speedup_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["speedup_lo"], sub_df["speedup_hi"], color=lines[0].get_color(), alpha=0.2)
 
     plt.xlabel("Number of Processes (p)")
     plt.ylabel("Speedup (CheckSym)")
@@ -51,34 +41,15 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("speedup_checksym", fig))
 
     # =========== B) STRONG SCALING - SPEEDUP TRANSPOSE =========== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_processes", inplace=True)
-
-        row_T1 = sub_df[sub_df["n_processes"] == 1]
-        if len(row_T1) == 0:
-            continue
+    fig = plt.figure(figsize=(8, 6))
 
-        T1_transpose = row_T1["transpose_time"].values[0]
-
-        speedups = []
-        procs = []
-        for _, row in sub_df.iterrows():
-            p = row["n_processes"]
-            Tp_transpose = row["transpose_time"]
-            if Tp_transpose > 0:
-                s = T1_transpose / Tp_transpose
-            else:
-                s = float("inf")
-            speedups.append(s)
-            procs.append(p)
-
-        plt.plot(procs, speedups, marker='o', label=f"n={n}")
+    for n, sub_df in metrics.select(scaling, "mpi", "transpose").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["speedup"], marker='o', label=f"n={n}")
+        if "speedup_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["speedup_lo"], sub_df["speedup_hi"], color=lines[0].get_color(), alpha=0.2)
 
     plt.xlabel("Number of Processes (p)")
     plt.ylabel("Speedup (Transpose)")
@@ -86,35 +57,15 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("speedup_transpose", fig))
 
     # =========== C) EFFICIENCY CHECKSYM =========== #
-    plt.figure(figsize=(8, 6))
+    fig = plt.figure(figsize=(8, 6))
 
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_processes", inplace=True)
-
-        row_T1 = sub_df[sub_df["n_processes"] == 1]
-        if len(row_T1) == 0:
-            continue
-
-        T1_checksym = row_T1["checksym_time"].values[0]
-
-        efficiencies = []
-        procs = []
-        for _, row in sub_df.iterrows():
-            p = row["n_processes"]
-            Tp_checksym = row["checksym_time"]
-            if Tp_checksym > 0:
-                speedup = T1_checksym / Tp_checksym
-                eff = (speedup / p) * 100
-            else:
-                eff = float("inf")
-            efficiencies.append(eff)
-            procs.append(p)
-
-        plt.plot(procs, efficiencies, marker='o', label=f"n={n}")
+    for n, sub_df in metrics.select(scaling, "mpi", "checksym").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["efficiency"], marker='o', label=f"n={n}")
+        if "efficiency_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["efficiency_lo"], sub_df["efficiency_hi"], color=lines[0].get_color(), alpha=0.2)
 
     plt.xlabel("Number of Processes (p)")
     plt.ylabel("Efficiency (%) - CheckSym")
@@ -122,35 +73,15 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("efficiency_checksym", fig))
 
     # =========== D) EFFICIENCY TRANSPOSE =========== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_processes", inplace=True)
+    fig = plt.figure(figsize=(8, 6))
 
-        row_T1 = sub_df[sub_df["n_processes"] == 1]
-        if len(row_T1) == 0:
-            continue
-
-        T1_transpose = row_T1["transpose_time"].values[0]
-
-        efficiencies = []
-        procs = []
-        for _, row in sub_df.iterrows():
-            p = row["n_processes"]
-            Tp_transpose = row["transpose_time"]
-            if Tp_transpose > 0:
-                speedup = T1_transpose / Tp_transpose
-                eff = (speedup / p) * 100
-            else:
-                eff = float("inf")
-            efficiencies.append(eff)
-            procs.append(p)
-
-        plt.plot(procs, efficiencies, marker='o', label=f"n={n}")
+    for n, sub_df in metrics.select(scaling, "mpi", "transpose").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["efficiency"], marker='o', label=f"n={n}")
+        if "efficiency_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["efficiency_lo"], sub_df["efficiency_hi"], color=lines[0].get_color(), alpha=0.2)
 
     plt.xlabel("Number of Processes (p)")
     plt.ylabel("Efficiency (%) - Transpose")
@@ -158,6 +89,12 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
+    figs.append(("efficiency_transpose", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
     plt.show()
 
 if __name__ == "__main__":
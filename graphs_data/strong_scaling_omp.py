@@ -1,44 +1,45 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def main():
-    # 1) Read OMP results from the CSV file
-    # Format: n_threads, n_matrix, iteration, checksym_time, transpose_time
-    df = pd.read_csv("omp_results.csv")
-
-    # 2) Group data by (n_threads, n_matrix) and calculate the mean
-    grouped = df.groupby(["n_threads", "n_matrix"], as_index=False).mean()
+import metrics
+import results
 
-    # 3) Get the set of matrix dimensions
-    matrix_sizes = sorted(grouped["n_matrix"].unique())
-
-    # ==================== STRONG SCALING - CHECKSYM ===================== #
-    plt.figure(figsize=(8, 6))
+# Backends whose results the figures need
+BACKENDS = ["omp"]
 
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_threads", inplace=True)
+def plot_python(scaling, kernel, column, colors):
+    """
+    Draws the metric column of the shared memory workers of pytranspose (the
+    shm backend), when they were measured, dashed and with the color of the
+    OpenMP line of the same n.
+    """
+    for n, sub_df in metrics.select(scaling, "shm", kernel).groupby("n_matrix"):
+        plt.plot(sub_df["workers"], sub_df[column], marker='s', ls="--", color=colors.get(n), label=f"n={n} (Python)")
 
-        row_T1 = sub_df[sub_df["n_threads"] == 1]
-        if len(row_T1) == 0:
-            continue
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
 
-        T1_checksym = row_T1["checksym_time"].values[0]
+    # One row per (backend, workers, n_matrix): the best measured configuration
+    table = results.best(table)
 
-        speedups = []
-        threads_list = []
+    # Compute speedup and efficiency of every (n_matrix, workers) of the table
+    # at once; each matrix dimension is considered a fixed "problem". With
+    # confidence intervals in the table they are drawn as bands
+    scaling = metrics.strong_scaling(table)
 
-        for _, row in sub_df.iterrows():
-            t = row["n_threads"]
-            Tp = row["checksym_time"]
-            if Tp > 0:
-                s = T1_checksym / Tp
-            else:
-                s = float("inf")
-            speedups.append(s)
-            threads_list.append(t)
+    # ==================== STRONG SCALING - CHECKSYM ===================== #
+    fig = plt.figure(figsize=(8, 6))
 
-        plt.plot(threads_list, speedups, marker='o', label=f"n={n}")
+    colors = {}
+    for n, sub_df in metrics.select(scaling, "omp", "checksym").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["speedup"], marker='o', label=f"n={n}")
+        colors[n] = lines[0].get_color()
+        if "speedup_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["speedup_lo"], sub_df["speedup_hi"], color=lines[0].get_color(), alpha=0.2)
+    plot_python(scaling, "checksym", "speedup", colors)
 
     plt.xlabel("Number of Threads (t)")
     plt.ylabel("Speedup (CheckSym)")
@@ -46,35 +47,18 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("speedup_checksym", fig))
 
     # ==================== STRONG SCALING - TRANSPOSE ===================== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_threads", inplace=True)
+    fig = plt.figure(figsize=(8, 6))
 
-        row_T1 = sub_df[sub_df["n_threads"] == 1]
-        if len(row_T1) == 0:
-            continue
-
-        T1_transpose = row_T1["transpose_time"].values[0]
-
-        speedups = []
-        threads_list = []
-
-        for _, row in sub_df.iterrows():
-            t = row["n_threads"]
-            Tp = row["transpose_time"]
-            if Tp > 0:
-                s = T1_transpose / Tp
-            else:
-                s = float("inf")
-            speedups.append(s)
-            threads_list.append(t)
-
-        plt.plot(threads_list, speedups, marker='o', label=f"n={n}")
+    colors = {}
+    for n, sub_df in metrics.select(scaling, "omp", "transpose").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["speedup"], marker='o', label=f"n={n}")
+        colors[n] = lines[0].get_color()
+        if "speedup_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["speedup_lo"], sub_df["speedup_hi"], color=lines[0].get_color(), alpha=0.2)
+    plot_python(scaling, "transpose", "speedup", colors)
 
     plt.xlabel("Number of Threads (t)")
     plt.ylabel("Speedup (Transpose)")
@@ -82,36 +66,18 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("speedup_transpose", fig))
 
     # ==================== EFFICIENCY - CHECKSYM ===================== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_threads", inplace=True)
+    fig = plt.figure(figsize=(8, 6))
 
-        row_T1 = sub_df[sub_df["n_threads"] == 1]
-        if len(row_T1) == 0:
-            continue
-
-        T1_checksym = row_T1["checksym_time"].values[0]
-
-        efficiencies = []
-        threads_list = []
-
-        for _, row in sub_df.iterrows():
-            t = row["n_threads"]
-            Tp = row["checksym_time"]
-            if Tp > 0:
-                speedup = T1_checksym / Tp
-                eff = (speedup / t) * 100
-            else:
-                eff = float("inf")
-            efficiencies.append(eff)
-            threads_list.append(t)
-
-        plt.plot(threads_list, efficiencies, marker='o', label=f"n={n}")
+    colors = {}
+    for n, sub_df in metrics.select(scaling, "omp", "checksym").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["efficiency"], marker='o', label=f"n={n}")
+        colors[n] = lines[0].get_color()
+        if "efficiency_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["efficiency_lo"], sub_df["efficiency_hi"], color=lines[0].get_color(), alpha=0.2)
+    plot_python(scaling, "checksym", "efficiency", colors)
 
     plt.xlabel("Number of Threads (t)")
     plt.ylabel("Efficiency (%) - CheckSym")
@@ -119,36 +85,18 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    figs.append(("efficiency_checksym", fig))
 
     # ==================== EFFICIENCY - TRANSPOSE ===================== #
-    plt.figure(figsize=(8, 6))
-
-    for n in matrix_sizes:
-        sub_df = grouped[grouped["n_matrix"] == n].copy()
-        sub_df.sort_values("n_threads", inplace=True)
-
-        row_T1 = sub_df[sub_df["n_threads"] == 1]
-        if len(row_T1) == 0:
-            continue
+    fig = plt.figure(figsize=(8, 6))
 
-        T1_transpose = row_T1["transpose_time"].values[0]
-
-        efficiencies = []
-        threads_list = []
-
-        for _, row in sub_df.iterrows():
-            t = row["n_threads"]
-            Tp = row["transpose_time"]
-            if Tp > 0:
-                speedup = T1_transpose / Tp
-                eff = (speedup / t) * 100
-            else:
-                eff = float("inf")
-            efficiencies.append(eff)
-            threads_list.append(t)
-
-        plt.plot(threads_list, efficiencies, marker='o', label=f"n={n}")
+    colors = {}
+    for n, sub_df in metrics.select(scaling, "omp", "transpose").groupby("n_matrix"):
+        lines = plt.plot(sub_df["workers"], sub_df["efficiency"], marker='o', label=f"n={n}")
+        colors[n] = lines[0].get_color()
+        if "efficiency_lo" in sub_df.columns:
+            plt.fill_between(sub_df["workers"], sub_df["efficiency_lo"], sub_df["efficiency_hi"], color=lines[0].get_color(), alpha=0.2)
+    plot_python(scaling, "transpose", "efficiency", colors)
 
     plt.xlabel("Number of Threads (t)")
     plt.ylabel("Efficiency (%) - Transpose")
@@ -156,6 +104,12 @@ def main():
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
+    figs.append(("efficiency_transpose", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
     plt.show()
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import matplotlib.pyplot as plt
+
+import results
+
+# Backends whose results the figures need (any backend with a tile column)
+BACKENDS = []
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+    if "tile" not in table.columns:
+        return figs
+
+    for backend, label in [("seq", "Sequential"), ("omp", "OpenMP"), ("numpy", "NumPy")]:
+        rows = table[(table["backend"] == backend) & table["tile"].notna()]
+        if len(rows) == 0:
+            continue
+
+        # For OpenMP, the tile sweep with the largest number of threads
+        workers = rows["workers"].max()
+        rows = rows[rows["workers"] == workers]
+        if backend == "omp":
+            label = f"{label} - {workers} threads"
+
+        # ========== Transpose Time vs. Tile Size, one line per n_matrix ========== #
+        fig = plt.figure(figsize=(8, 6))
+
+        # The transpose does not depend on the other configuration columns
+        rows = rows.groupby(["n_matrix", "tile"], as_index=False)["transpose_time"].min()
+
+        for n, sub_df in rows.groupby("n_matrix"):
+            blocked = sub_df[sub_df["tile"] > 0].sort_values("tile")
+            naive = sub_df[sub_df["tile"] == 0]
+            line, = plt.plot(blocked["tile"], blocked["transpose_time"], marker='o', label=f"n={n}")
+            # The element-wise transpose (tile 0) as a dashed reference line
+            if len(naive) > 0:
+                plt.axhline(naive["transpose_time"].values[0], color=line.get_color(), ls="--", linewidth=0.8)
+
+        plt.xscale("log", base=2)
+        plt.yscale("log")
+        plt.xlabel("Tile Size (dashed: element-wise transpose)")
+        plt.ylabel("Average Transpose Time (s)")
+        plt.title(f"Transpose Time vs. Tile Size ({label})")
+        plt.grid(True, which="both", ls="--", linewidth=0.5)
+        plt.legend()
+        plt.tight_layout()
+        figs.append((f"{backend}_transpose_time", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table())
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import matplotlib.pyplot as plt
+import numpy as np
+
+import results
+
+# Backends whose results the figures need
+BACKENDS = ["tune"]
+
+def figures(table):
+    """
+    Builds the figures of this script from the averaged results table of
+    results.py and returns them as a list of (name, figure).
+    """
+    figs = []
+
+    # Every configuration measured by tune.py, with the time it optimizes
+    rows = results.select(table, "tune").copy()
+    rows["total_time"] = rows["checksym_time"] + rows["transpose_time"]
+    rows = rows[~rows["sym"].isin(results.PARTIAL_WORK["sym"])]
+    sizes = sorted(rows["n_matrix"].unique())
+
+    # ========== Tile x schedule landscape of every size ========== #
+    # Best time over the thread counts of every (tile, schedule), relative to
+    # the best configuration of the size
+    fig, axes = plt.subplots(1, len(sizes), figsize=(5 * len(sizes), 5), squeeze=False)
+    for ax, n in zip(axes[0], sizes):
+        grid = rows[rows["n_matrix"] == n].pivot_table(index="tile", columns="schedule", values="total_time",
+                                                       aggfunc="min", observed=True)
+        values = grid.to_numpy() / np.nanmin(grid.to_numpy())
+
+        image = ax.imshow(values, origin="lower", cmap="viridis_r", aspect="auto")
+        for i in range(values.shape[0]):
+            for j in range(values.shape[1]):
+                if not np.isnan(values[i, j]):
+                    ax.text(j, i, f"{values[i, j]:.2f}", ha="center", va="center", color="white")
+        ax.set_xticks(range(len(grid.columns)))
+        ax.set_xticklabels(grid.columns, rotation=30)
+        ax.set_yticks(range(len(grid.index)))
+        ax.set_yticklabels([int(t) for t in grid.index])
+        ax.set_xlabel("OpenMP Schedule")
+        ax.set_ylabel("Tile Size (0 = element-wise)")
+        ax.set_title(f"n={n}")
+        fig.colorbar(image, ax=ax, label="Time / Best Time")
+    fig.suptitle("Tuning Landscape - CheckSym + Transpose")
+    fig.tight_layout()
+    figs.append(("landscape", fig))
+
+    # ========== Best configuration vs. threads ========== #
+    fig = plt.figure(figsize=(8, 6))
+    for n in sizes:
+        best = rows[rows["n_matrix"] == n].groupby("workers", observed=True)["total_time"].min()
+        plt.plot(best.index, best.to_numpy(), marker='o', label=f"n={n}")
+    plt.xscale("log", base=2)
+    plt.yscale("log")
+    plt.xlabel("Number of Threads (t)")
+    plt.ylabel("Best Time (s) - CheckSym + Transpose")
+    plt.title("Best Tuned Time vs. Threads")
+    plt.grid(True, which="both", ls="--", linewidth=0.5)
+    plt.legend()
+    plt.tight_layout()
+    figs.append(("threads", fig))
+
+    return figs
+
+def main():
+    figures(results.load_table(BACKENDS))
+    plt.show()
+
+if __name__ == "__main__":
+    main()